@@ -0,0 +1,254 @@
+"""Write-behind audit log of dispatched function calls.
+
+Every ``handle_function_call`` invocation is recorded (function, MCP tool,
+arguments, robot, status, latency, result size) without putting a database
+round-trip on the voice hot path: :meth:`AuditLog.record` only appends to a
+bounded in-memory queue, and a background thread writes the queue in
+batches of up to ``AUDIT_BATCH_SIZE`` rows with one multi-row ``INSERT``
+per batch, at least every ``AUDIT_FLUSH_INTERVAL`` seconds.  Result sizes
+are measured by the writer, not the caller.
+
+When the queue (``AUDIT_QUEUE_SIZE``) is full, ``AUDIT_OVERFLOW`` decides:
+
+* ``drop_oldest`` (default) – discard the oldest queued record,
+* ``drop_newest`` – discard the record being added,
+* ``block`` – wait up to ``AUDIT_BLOCK_TIMEOUT`` seconds for room, then drop it.
+
+Dropped records are counted in :meth:`AuditLog.stats`.  On PostgreSQL the
+``function_call_audit`` table is partitioned by month; the writer creates
+the partition for each month it sees before inserting.  A failed batch is
+put back at the front of the queue (space permitting) and retried.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import insert, text
+
+from .database import SessionLocal, engine
+from .models import FunctionCallAudit
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+AUDIT_ENABLED = os.getenv("AUDIT_LOG", "1") in {"1", "true", "yes"}
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "drop_oldest")
+AUDIT_BLOCK_TIMEOUT = float(os.getenv("AUDIT_BLOCK_TIMEOUT", 0.05))
+# Larger argument payloads are stored as a size marker only.
+AUDIT_ARGUMENTS_MAX_BYTES = int(os.getenv("AUDIT_ARGUMENTS_MAX_BYTES", 8192))
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode())
+
+
+class AuditLog:
+    """Bounded queue plus a batching writer thread."""
+
+    def __init__(self, *, engine=engine, session_factory=SessionLocal, queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 overflow: str = AUDIT_OVERFLOW):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"AUDIT_OVERFLOW must be one of {OVERFLOW_POLICIES}")
+        self._engine = engine
+        self._session_factory = session_factory
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue: collections.deque[dict[str, Any]] = collections.deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._partitions: set[tuple[int, int]] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "failed_batches": 0,
+                       "last_batch_rows": 0, "last_batch_ms": 0.0}
+
+    # ------------------------------------------------------------------
+    # Producer side – called on the request path
+    # ------------------------------------------------------------------
+
+    def record(self, *, name: str, arguments: dict[str, Any], status: str, latency_ms: float,
+               call_id: Optional[str] = None, robot: Optional[str] = None, result: Any = None,
+               error: Optional[str] = None) -> bool:
+        """Queue one record; returns False when the overflow policy dropped it."""
+        entry = {
+            "id": uuid.uuid4().hex, "created_at": datetime.utcnow(), "call_id": call_id, "name": name,
+            "tool_name": arguments.get("tool_name") if name == "mcp_call" else None,
+            "arguments": arguments, "robot": robot, "status": status, "latency_ms": latency_ms,
+            "result": result, "error": error,
+        }
+        with self._cond:
+            if len(self._queue) >= self.queue_size:
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self._stats["dropped"] += 1
+                elif self.overflow == "block":
+                    self._cond.wait_for(lambda: len(self._queue) < self.queue_size, AUDIT_BLOCK_TIMEOUT)
+                if len(self._queue) >= self.queue_size:
+                    self._stats["dropped"] += 1
+                    return False
+            self._queue.append(entry)
+            self._stats["recorded"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write what is queued, then stop the writer."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued record has been written (or *timeout* expires)."""
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or len(self._queue) >= self.batch_size,
+                                    self.flush_interval)
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                self._cond.notify_all()  # room for producers blocked by the "block" policy
+                stopping = self._stopping
+            if batch:
+                self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+                if stopping and not self._queue:
+                    return
+
+    def _rows(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        rows = []
+        for entry in batch:
+            row = dict(entry)
+            result = row.pop("result")
+            row["result_bytes"] = _size(result) if result is not None else None
+            arguments_bytes = _size(row["arguments"])
+            if arguments_bytes > AUDIT_ARGUMENTS_MAX_BYTES:
+                row["arguments"] = {"_truncated": True, "bytes": arguments_bytes}
+            rows.append(row)
+        return rows
+
+    def _ensure_partitions(self, conn, rows: list[dict[str, Any]]) -> None:
+        if self._engine.dialect.name != "postgresql":
+            return
+        table = FunctionCallAudit.__tablename__
+        for year, month in {(r["created_at"].year, r["created_at"].month) for r in rows} - self._partitions:
+            upper = (year + 1, 1) if month == 12 else (year, month + 1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {table}_y{year}m{month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{upper[0]}-{upper[1]:02d}-01')"
+            ))
+            self._partitions.add((year, month))
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            rows = self._rows(batch)
+            with self._engine.begin() as conn:
+                self._ensure_partitions(conn, rows)
+                # A list of parameter sets is sent as multi-row INSERT ... VALUES batches
+                conn.execute(insert(FunctionCallAudit.__table__), rows)
+        except Exception as exc:
+            print("Audit batch not written:", exc)
+            with self._cond:
+                self._stats["failed_batches"] += 1
+                room = self.queue_size - len(self._queue)
+                self._queue.extendleft(reversed(batch[:max(0, room)]))
+                self._stats["dropped"] += max(0, len(batch) - room)
+            if not self._stopping:
+                time.sleep(self.flush_interval)
+            return
+        with self._cond:
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_batch_rows"] = len(batch)
+            self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    # ------------------------------------------------------------------
+    # Query API
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {**self._stats, "queued": len(self._queue), "queue_size": self.queue_size,
+                    "overflow": self.overflow, "running": self._thread is not None}
+
+    def recent(self, *, limit: int = 50, name: Optional[str] = None, tool_name: Optional[str] = None,
+               robot: Optional[str] = None, status: Optional[str] = None,
+               since: Optional[datetime] = None) -> list[dict[str, Any]]:
+        """Newest calls first: records still queued (``"pending": true``), then written ones."""
+        if since is not None and since.tzinfo is not None:
+            # created_at is naive UTC
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        def matches(entry: dict[str, Any]) -> bool:
+            return ((name is None or entry["name"] == name)
+                    and (tool_name is None or entry["tool_name"] == tool_name)
+                    and (robot is None or entry["robot"] == robot)
+                    and (status is None or entry["status"] == status)
+                    and (since is None or entry["created_at"] >= since))
+
+        with self._cond:
+            queued = [e for e in reversed(self._queue) if matches(e)][:limit]
+        calls = [{**{k: v for k, v in e.items() if k != "result"}, "pending": True} for e in queued]
+
+        if len(calls) < limit:
+            with self._session_factory() as db:
+                query = db.query(FunctionCallAudit)
+                if name is not None:
+                    query = query.filter(FunctionCallAudit.name == name)
+                if tool_name is not None:
+                    query = query.filter(FunctionCallAudit.tool_name == tool_name)
+                if robot is not None:
+                    query = query.filter(FunctionCallAudit.robot == robot)
+                if status is not None:
+                    query = query.filter(FunctionCallAudit.status == status)
+                if since is not None:
+                    query = query.filter(FunctionCallAudit.created_at >= since)
+                rows = query.order_by(FunctionCallAudit.created_at.desc()).limit(limit - len(calls)).all()
+            calls.extend({
+                "id": r.id, "created_at": r.created_at, "call_id": r.call_id, "name": r.name,
+                "tool_name": r.tool_name, "arguments": r.arguments, "robot": r.robot, "status": r.status,
+                "latency_ms": r.latency_ms, "result_bytes": r.result_bytes, "error": r.error, "pending": False,
+            } for r in rows)
+        return calls
+
+
+audit_log = AuditLog()
@@ -0,0 +1,32 @@
+"""Cross-process cache shared by the backend's workers and the MCP server processes.
+
+The implementation is :mod:`opentrons_agent.shared_cache` (standard library
+only, SQLite in WAL mode on local disk).  It ships with the MCP server, so it
+is imported from the directory of ``MCP_SERVER_PATH``; when that tree is not
+deployed next to the backend, or ``SHARED_CACHE=0``, :func:`shared_cache`
+returns None and callers keep their per-process behaviour.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+SHARED_CACHE_ENABLED = os.getenv("SHARED_CACHE", "1") in {"1", "true", "yes"}
+
+_MCP_ROOT = str(Path(os.getenv("MCP_SERVER_PATH", "opentrons_mcp.py")).resolve().parent)
+if _MCP_ROOT not in sys.path:
+    sys.path.append(_MCP_ROOT)
+
+try:
+    from opentrons_agent.shared_cache import SharedCache
+except ImportError:  # MCP server tree not available
+    SharedCache = None
+
+
+def shared_cache(namespace: str, **kwargs: Any) -> Optional["SharedCache"]:
+    if not SHARED_CACHE_ENABLED or SharedCache is None:
+        return None
+    return SharedCache(namespace, **kwargs)
@@ -0,0 +1,254 @@
+"""Per-robot circuit breakers, background health probing and last-known state.
+
+While a robot reboots or drops off the network every request to it used to
+wait for its full timeout, holding a worker (and the voice session) for the
+whole outage.  Each robot base URL now gets a :class:`CircuitBreaker`:
+
+* **closed** – requests go through; ``BREAKER_FAILURE_THRESHOLD`` consecutive
+  failures (connection errors, timeouts, 5xx) open the circuit,
+* **open** – requests fail immediately with :class:`RobotUnavailable`,
+  which carries the robot's last known health so the caller can still say
+  something useful,
+* **half-open** – after ``BREAKER_RESET_TIMEOUT`` seconds one trial request
+  is let through; success closes the circuit, failure re-opens it.
+
+:class:`RobotHealth` also runs a background prober that polls ``GET /health``
+of every known robot every ``HEALTH_PROBE_INTERVAL`` seconds with a short
+timeout.  Probe results drive the breakers directly, so a robot that went
+down is detected before a user asks about it and one that came back is
+closed again without waiting for a trial request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import httpx
+
+from .tracing import span
+from .traffic import httpx_async_transport
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("ROBOT_BREAKER_FAILURES", 3))
+BREAKER_RESET_TIMEOUT = float(os.getenv("ROBOT_BREAKER_RESET_SECONDS", 15.0))
+HEALTH_PROBE_INTERVAL = float(os.getenv("ROBOT_HEALTH_INTERVAL", 5.0))  # 0 disables the prober
+HEALTH_PROBE_TIMEOUT = float(os.getenv("ROBOT_HEALTH_TIMEOUT", 2.0))
+ROBOT_REQUEST_TIMEOUT = float(os.getenv("ROBOT_REQUEST_TIMEOUT", 10.0))
+
+ROBOT_HEADERS = {"opentrons-version": "2"}
+
+# MCP tools that call the robot directly; they fail fast while its circuit is open.
+ROBOT_MCP_TOOLS = {"get_robot_health", "get_instruments", "list_protocols", "calibrate_timing_model",
+                   "run_pipelined_optimization_experiment"}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def robot_key(base_url: str) -> str:
+    """Normalise a robot address (``host:port`` or URL) to the breaker key."""
+    base_url = base_url.rstrip("/")
+    return base_url if "://" in base_url else f"http://{base_url}"
+
+
+def mcp_robot_url() -> str:
+    """Base URL of the robot the MCP server talks to (same default as the server)."""
+    return robot_key(os.getenv("OPENTRONS_ROBOT_HOST", "192.168.0.83:31950"))
+
+
+def describe_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}".rstrip(": ")
+
+
+class RobotUnavailable(Exception):
+    """Raised instead of calling a robot whose circuit is open."""
+
+    def __init__(self, robot: str, retry_in: float, last_known: Optional[dict[str, Any]] = None):
+        self.robot = robot
+        self.retry_in = retry_in
+        self.last_known = last_known
+        message = f"Robot {robot} is unavailable (circuit open, next check in {retry_in:.0f}s)"
+        if last_known:
+            if last_known.get("error"):
+                message += f"; last error: {last_known['error']}"
+            if last_known.get("healthy_at"):
+                seen = time.time() - last_known["healthy_at"]
+                message += f"; last healthy {seen:.0f}s ago"
+                health = last_known.get("health") or {}
+                if health.get("name"):
+                    message += f" as {health['name']}"
+        super().__init__(message)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one robot; safe to use from any thread."""
+
+    def __init__(self, robot: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.robot = robot
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a request may go out now; moves open -> half-open when the timeout expired."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.last_error = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a half-open trial slot whose request ended without a verdict on the robot."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "last_error": self.last_error,
+                "retry_in": round(self.retry_in(), 1) if self.state == OPEN else 0.0,
+            }
+
+
+class RobotHealth:
+    """Breakers and last-known ``/health`` payloads for every robot, plus the prober."""
+
+    def __init__(self, interval: float = HEALTH_PROBE_INTERVAL, probe_timeout: float = HEALTH_PROBE_TIMEOUT):
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._last_known: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Breakers
+    # ------------------------------------------------------------------
+
+    def breaker(self, robot: str) -> CircuitBreaker:
+        robot = robot_key(robot)
+        with self._lock:
+            breaker = self._breakers.get(robot)
+            if breaker is None:
+                breaker = self._breakers[robot] = CircuitBreaker(robot)
+            return breaker
+
+    def guard(self, robot: str) -> CircuitBreaker:
+        """Return the robot's breaker, or raise :class:`RobotUnavailable` without touching the network."""
+        breaker = self.breaker(robot)
+        if not breaker.allow():
+            raise RobotUnavailable(breaker.robot, breaker.retry_in(), self.last_known(breaker.robot))
+        return breaker
+
+    def record(self, robot: str, *, ok: bool, error: str = "", health: Optional[dict[str, Any]] = None) -> None:
+        breaker = self.breaker(robot)
+        entry = self._last_known.setdefault(breaker.robot, {})
+        entry["checked_at"] = time.time()
+        if ok:
+            breaker.record_success()
+            entry["healthy_at"] = entry["checked_at"]
+            entry["error"] = None
+            if health is not None:
+                entry["health"] = health
+        else:
+            breaker.record_failure(error)
+            entry["error"] = error
+
+    def last_known(self, robot: str) -> Optional[dict[str, Any]]:
+        entry = self._last_known.get(robot_key(robot))
+        return dict(entry) if entry else None
+
+    def robots(self) -> list[str]:
+        """Robots to probe: the configured ones plus any that were called."""
+        configured = [mcp_robot_url()]
+        if os.getenv("EXTERNAL_API_BASE_URL"):
+            configured.append(robot_key(os.environ["EXTERNAL_API_BASE_URL"]))
+        with self._lock:
+            return list(dict.fromkeys(configured + list(self._breakers)))
+
+    def status(self) -> dict[str, Any]:
+        return {
+            robot: {**self.breaker(robot).snapshot(), "last_known": self.last_known(robot)}
+            for robot in self.robots()
+        }
+
+    # ------------------------------------------------------------------
+    # Background prober
+    # ------------------------------------------------------------------
+
+    async def probe(self, client: httpx.AsyncClient, robot: str) -> None:
+        with span("robot.health_probe", robot=robot):
+            try:
+                resp = await client.get(f"{robot}/health", timeout=self.probe_timeout)
+            except httpx.HTTPError as exc:
+                self.record(robot, ok=False, error=describe_error(exc))
+                return
+        if resp.status_code >= 500:
+            self.record(robot, ok=False, error=f"HTTP {resp.status_code}")
+            return
+        try:
+            health = resp.json()
+        except ValueError:
+            health = None
+        self.record(robot, ok=True, health=health)
+
+    async def _run(self) -> None:
+        async with httpx.AsyncClient(headers=ROBOT_HEADERS, transport=httpx_async_transport("robot")) as client:
+            while True:
+                await asyncio.gather(*(self.probe(client, robot) for robot in self.robots()))
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+robot_health = RobotHealth()
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 
 from .auth import get_password_hash
 from .models import Move, Task, User
+from .schemas import MoveOut, TaskOut
+from .serialization import project
 
 
 # Users ----------------------------------------------------------------------
@@ -32,6 +34,11 @@ def get_moves(db: Session, user: User):
     return db.query(Move).filter(Move.user_id == user.id).all()
 
 
+def get_move_rows(db: Session, user: User) -> list[dict]:
+    """Like :func:`get_moves`, as ``MoveOut`` dicts straight from a column query."""
+    return project(db, MoveOut, Move, Move.user_id == user.id)
+
+
 # Tasks ----------------------------------------------------------------------
 
 
@@ -45,3 +52,8 @@ def create_task(db: Session, move: Move, **data) -> Task:
 
 def get_tasks(db: Session, move: Move):
     return db.query(Task).filter(Task.move_id == move.id).all()
+
+
+def get_task_rows(db: Session, move: Move) -> list[dict]:
+    """Like :func:`get_tasks`, as ``TaskOut`` dicts straight from a column query."""
+    return project(db, TaskOut, Task, Task.move_id == move.id)
@@ -1,10 +1,19 @@
 import os
 
 from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from .tracing import instrument_engine
 
 
 def get_database_url() -> str:
-    """Compose the database URL from environment variables."""
+    """Compose the database URL from environment variables.
+
+    ``DATABASE_URL`` wins when set, e.g. ``sqlite:///./bench.db`` for a
+    throwaway database in benchmarks.
+    """
+    if os.getenv("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
     user = os.getenv("DB_USER", "postgres")
     password = os.getenv("DB_PASSWORD", "postgres")
     host = os.getenv("DB_HOST", "db")
@@ -16,7 +25,17 @@ def get_database_url() -> str:
 # Create a global engine. For a real-world project we would use sessionmakers,
 # connection pools, and possibly async SQLAlchemy, but for a quick skeleton this
 # suffices.
-engine = create_engine(get_database_url(), pool_pre_ping=True)
+_url = get_database_url()
+engine = create_engine(
+    _url,
+    pool_pre_ping=True,
+    # SQLite connections are used from FastAPI's worker threads.
+    connect_args={"check_same_thread": False} if _url.startswith("sqlite") else {},
+)
+instrument_engine(engine)
+
+# Session factory for code running outside a request (background workers).
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
 def health_check() -> bool:
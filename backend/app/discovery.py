@@ -0,0 +1,227 @@
+"""Robot discovery on the local network and the robot registry.
+
+Instead of hard-coding a robot address, :class:`RobotDiscovery` sweeps the
+CIDR ranges in ``ROBOT_DISCOVERY_CIDRS`` (e.g. ``192.168.0.0/24``) on
+``ROBOT_DISCOVERY_PORTS`` (default 31950, the Opentrons HTTP API):
+
+* every address is first tried with a bare TCP connect bounded by
+  ``ROBOT_DISCOVERY_CONNECT_TIMEOUT``, ``ROBOT_DISCOVERY_CONCURRENCY`` at a
+  time, so a /24 of silent hosts costs about one timeout rather than 254,
+* hosts with the port open are asked for ``/health``; answers carrying a
+  ``robot_serial`` are robots,
+* robots are registered by serial in the ``robots`` table and in memory, so
+  a robot that comes back on another address is recognised as moved (the
+  old address is kept in ``previous_host``), and robots missing from a
+  sweep are marked unreachable rather than forgotten.
+
+Discovered robots are handed to the circuit breakers (and so to their
+health prober).  A background task repeats the sweep every
+``ROBOT_DISCOVERY_INTERVAL`` seconds; with no CIDRs configured discovery is
+off and the registry only holds what the database already knows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+import httpx
+
+from .circuit_breaker import ROBOT_HEADERS, robot_health, robot_key
+from .database import SessionLocal
+from .models import Robot
+from .tracing import span
+from .traffic import httpx_async_transport
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+ROBOT_DISCOVERY_CIDRS = [c.strip() for c in os.getenv("ROBOT_DISCOVERY_CIDRS", "").split(",") if c.strip()]
+ROBOT_DISCOVERY_PORTS = [int(p) for p in os.getenv("ROBOT_DISCOVERY_PORTS", "31950").split(",") if p.strip()]
+ROBOT_DISCOVERY_CONCURRENCY = int(os.getenv("ROBOT_DISCOVERY_CONCURRENCY", 256))
+ROBOT_DISCOVERY_CONNECT_TIMEOUT = float(os.getenv("ROBOT_DISCOVERY_CONNECT_TIMEOUT", 0.3))
+ROBOT_DISCOVERY_HEALTH_TIMEOUT = float(os.getenv("ROBOT_DISCOVERY_HEALTH_TIMEOUT", 1.0))
+ROBOT_DISCOVERY_INTERVAL = float(os.getenv("ROBOT_DISCOVERY_INTERVAL", 300.0))  # 0 disables re-scans
+# Refuse to sweep more addresses than this in one go (a mistyped /8)
+ROBOT_DISCOVERY_MAX_HOSTS = int(os.getenv("ROBOT_DISCOVERY_MAX_HOSTS", 4096))
+
+
+def expand_targets(cidrs: list[str], ports: list[int]) -> list[tuple[str, int]]:
+    """``(host, port)`` pairs to probe; raises ValueError for bad or oversized ranges."""
+    hosts: list[str] = []
+    for cidr in cidrs:
+        network = ipaddress.ip_network(cidr, strict=False)
+        if network.num_addresses > ROBOT_DISCOVERY_MAX_HOSTS:
+            raise ValueError(f"{cidr} has {network.num_addresses} addresses (limit {ROBOT_DISCOVERY_MAX_HOSTS})")
+        # hosts() leaves out network/broadcast addresses, except for /31 and /32
+        hosts.extend(str(ip) for ip in network.hosts())
+    return [(host, port) for host in dict.fromkeys(hosts) for port in ports]
+
+
+class RobotRegistry:
+    """Known robots by serial; mirrors the ``robots`` table."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._robots: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._session_factory() as db:
+            rows = db.query(Robot).all()
+        with self._lock:
+            self._robots = {row.serial: self._as_dict(row) for row in rows}
+
+    @staticmethod
+    def _as_dict(row: Robot) -> dict[str, Any]:
+        return {
+            "serial": row.serial, "name": row.name, "model": row.model, "host": row.host,
+            "url": robot_key(row.host), "previous_host": row.previous_host, "api_version": row.api_version,
+            "reachable": row.reachable, "first_seen_at": row.first_seen_at, "last_seen_at": row.last_seen_at,
+        }
+
+    def list(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return sorted((dict(r) for r in self._robots.values()), key=lambda r: (r["name"] or "", r["serial"]))
+
+    def default(self) -> Optional[dict[str, Any]]:
+        """The most recently seen reachable robot, for setups that configure none."""
+        with self._lock:
+            reachable = [r for r in self._robots.values() if r["reachable"]]
+        return dict(max(reachable, key=lambda r: r["last_seen_at"])) if reachable else None
+
+    def resolve(self, robot: str) -> Optional[dict[str, Any]]:
+        """Look a robot up by serial, name or address."""
+        with self._lock:
+            if robot in self._robots:
+                return dict(self._robots[robot])
+            for entry in self._robots.values():
+                if robot in {entry["name"], entry["host"], entry["url"]}:
+                    return dict(entry)
+        return None
+
+    def update(self, found: dict[str, dict[str, Any]], scanned: set[str]) -> list[dict[str, Any]]:
+        """Apply one sweep: *found* maps ``host:port`` to its ``/health``; *scanned* are the swept addresses.
+
+        Returns the robots that changed address.
+        """
+        now = datetime.utcnow()
+        moved = []
+        with self._session_factory() as db:
+            rows = {row.serial: row for row in db.query(Robot).all()}
+            seen = set()
+            for host, health in found.items():
+                serial = health["robot_serial"]
+                seen.add(serial)
+                row = rows.get(serial)
+                if row is None:
+                    row = rows[serial] = Robot(serial=serial, host=host, first_seen_at=now)
+                    db.add(row)
+                elif row.host != host:
+                    moved.append({"serial": serial, "name": health.get("name"), "from": row.host, "to": host})
+                    row.previous_host, row.host = row.host, host
+                row.name = health.get("name")
+                row.model = health.get("robot_model")
+                row.api_version = health.get("api_version")
+                row.health = health
+                row.reachable = True
+                row.last_seen_at = now
+            for serial, row in rows.items():
+                # Only a sweep that covered the robot's address can say it is gone
+                if serial not in seen and row.host in scanned:
+                    row.reachable = False
+            db.commit()
+            entries = {serial: self._as_dict(row) for serial, row in rows.items()}
+        with self._lock:
+            self._robots = entries
+        for change in moved:
+            print(f"Robot {change['name'] or change['serial']} moved from {change['from']} to {change['to']}")
+        return moved
+
+
+class RobotDiscovery:
+    """Concurrent sweeps of the configured ranges, once or in the background."""
+
+    def __init__(self, registry: RobotRegistry, cidrs: Optional[list[str]] = None, ports: Optional[list[int]] = None,
+                 interval: float = ROBOT_DISCOVERY_INTERVAL):
+        self.registry = registry
+        self.cidrs = ROBOT_DISCOVERY_CIDRS if cidrs is None else cidrs
+        self.ports = ports or ROBOT_DISCOVERY_PORTS
+        self.interval = interval
+        self.last_scan: Optional[dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._scan_lock: Optional[asyncio.Lock] = None
+
+    async def _probe(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                     host: str, port: int) -> Optional[dict[str, Any]]:
+        async with semaphore:
+            try:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(host, port),
+                                                   ROBOT_DISCOVERY_CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                return None
+            writer.close()
+            try:
+                resp = await client.get(f"http://{host}:{port}/health", timeout=ROBOT_DISCOVERY_HEALTH_TIMEOUT)
+                health = resp.json() if resp.status_code == 200 else None
+            except (httpx.HTTPError, ValueError):
+                return None
+        if not isinstance(health, dict) or not health.get("robot_serial"):
+            return None
+        return health
+
+    async def scan(self, cidrs: Optional[list[str]] = None, ports: Optional[list[int]] = None) -> dict[str, Any]:
+        """Sweep once and update the registry; concurrent callers share one sweep at a time."""
+        targets = expand_targets(cidrs or self.cidrs, ports or self.ports)
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+        async with self._scan_lock:
+            started = time.perf_counter()
+            semaphore = asyncio.Semaphore(ROBOT_DISCOVERY_CONCURRENCY)
+            with span("robot.discovery", targets=len(targets)):
+                async with httpx.AsyncClient(headers=ROBOT_HEADERS,
+                                             transport=httpx_async_transport("robot")) as client:
+                    results = await asyncio.gather(*(self._probe(client, semaphore, host, port)
+                                                     for host, port in targets))
+            found = {f"{host}:{port}": health for (host, port), health in zip(targets, results) if health}
+            for host, health in found.items():
+                robot_health.record(host, ok=True, health=health)
+            scanned = {f"{host}:{port}" for host, port in targets}
+            moved = await asyncio.to_thread(self.registry.update, found, scanned)
+            self.last_scan = {
+                "scanned": len(targets), "found": len(found), "moved": moved,
+                "elapsed_s": round(time.perf_counter() - started, 3), "finished_at": time.time(),
+            }
+        return {**self.last_scan, "robots": self.registry.list()}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.scan()
+            except Exception as exc:
+                print("Robot discovery failed:", exc)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None and self.cidrs and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+robot_registry = RobotRegistry()
+robot_discovery = RobotDiscovery(robot_registry)
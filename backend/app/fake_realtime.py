@@ -0,0 +1,132 @@
+"""Stand-in for the realtime API's server-side WebSocket, for tests and benchmarks.
+
+Accepts sideband connections at ``/v1/realtime?call_id=...`` like the real
+API and lets a test play the model's part over HTTP::
+
+    POST /v1/realtime/calls/{call_id}/responses
+         {"function_calls": [{"name": "mcp_call", "arguments": {...}}]}
+
+emits one ``response.function_call_arguments.done`` per call followed by
+``response.done``, waits until the sideband has posted a
+``function_call_output`` for each of them and a ``response.create``, and
+returns the outputs together with the round-trip time.  Every event the
+sideband sent is listed by ``GET /v1/realtime/calls/{call_id}/events``.
+Start it with::
+
+    uvicorn app.fake_realtime:app --port 8765
+
+and point the backend at it::
+
+    OPENAI_REALTIME_WS_URL=ws://localhost:8765/v1/realtime
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+
+
+RESPONSE_TIMEOUT = float(os.getenv("FAKE_REALTIME_RESPONSE_TIMEOUT", 30.0))
+
+
+class FakeCall:
+    def __init__(self, call_id: str, websocket: WebSocket):
+        self.call_id = call_id
+        self.websocket = websocket
+        self.events: list[dict[str, Any]] = []
+        self.changed = asyncio.Condition()
+
+    async def received(self, event: dict[str, Any]) -> None:
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Fake realtime API", version="0.1.0")
+    calls: dict[str, FakeCall] = {}
+    app.state.calls = calls
+
+    @app.websocket("/v1/realtime")
+    async def realtime(websocket: WebSocket, call_id: Optional[str] = None):
+        if not call_id:
+            await websocket.close(code=4400)
+            return
+        await websocket.accept()
+        call = calls[call_id] = FakeCall(call_id, websocket)
+        await websocket.send_text(json.dumps({"type": "session.updated", "session": {"id": f"sess_{call_id}"}}))
+        try:
+            while True:
+                await call.received(json.loads(await websocket.receive_text()))
+        except WebSocketDisconnect:
+            if calls.get(call_id) is call:
+                del calls[call_id]
+
+    def get_call(call_id: str) -> FakeCall:
+        call = calls.get(call_id)
+        if call is None:
+            raise HTTPException(status_code=404, detail=f"No sideband connected for {call_id}")
+        return call
+
+    @app.post("/v1/realtime/calls/{call_id}/responses")
+    async def model_response(call_id: str, body: dict):
+        call = get_call(call_id)
+        response_id = f"resp_{uuid.uuid4().hex[:12]}"
+        function_calls = [
+            {**fc, "call_id": fc.get("call_id") or f"call_{uuid.uuid4().hex[:12]}"}
+            for fc in body.get("function_calls") or []
+        ]
+        start = len(call.events)
+        started = time.perf_counter()
+        for fc in function_calls:
+            await call.websocket.send_text(json.dumps({
+                "type": "response.function_call_arguments.done", "response_id": response_id,
+                "call_id": fc["call_id"], "name": fc["name"], "arguments": json.dumps(fc.get("arguments") or {}),
+            }))
+        await call.websocket.send_text(json.dumps({"type": "response.done", "response": {"id": response_id}}))
+
+        wanted = {fc["call_id"] for fc in function_calls}
+
+        def answered() -> bool:
+            new = call.events[start:]
+            outputs = {e["item"]["call_id"] for e in new
+                       if e.get("type") == "conversation.item.create"
+                       and (e.get("item") or {}).get("type") == "function_call_output"}
+            return wanted <= outputs and any(e.get("type") == "response.create" for e in new)
+
+        try:
+            async with call.changed:
+                await asyncio.wait_for(call.changed.wait_for(answered), RESPONSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Sideband did not answer in time")
+        outputs = {
+            e["item"]["call_id"]: json.loads(e["item"]["output"]) for e in call.events[start:]
+            if e.get("type") == "conversation.item.create" and (e.get("item") or {}).get("type") == "function_call_output"
+        }
+        return {
+            "response_id": response_id,
+            "round_trip_ms": round((time.perf_counter() - started) * 1000, 2),
+            "outputs": [{"call_id": fc["call_id"], "name": fc["name"], "output": outputs[fc["call_id"]]}
+                        for fc in function_calls],
+        }
+
+    @app.get("/v1/realtime/calls/{call_id}/events")
+    def sideband_events(call_id: str):
+        return {"call_id": call_id, "events": get_call(call_id).events}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":  # pragma: no cover – manual use
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("FAKE_REALTIME_PORT", 8765)))
@@ -0,0 +1,332 @@
+"""Stand-in for the Opentrons Flex HTTP API, for benchmarks and load tests.
+
+Covers the endpoints listed in ``instructions.txt`` (health, instruments,
+pipettes, settings, protocols, runs, run actions and run commands) with
+in-memory state.  Runs advance on a virtual clock: once played, command *n*
+completes ``FAKE_ROBOT_COMMAND_SECONDS`` after command *n-1*, and pausing
+stops the clock, so command lists and statuses evolve like on a real robot.
+
+Latency, jitter, error rate and payload size are configurable through
+environment variables (see :class:`FakeRobotConfig`).  Start it with::
+
+    uvicorn app.fake_robot:app --port 31950
+
+and point the rest of the stack at it::
+
+    EXTERNAL_API_BASE_URL=http://localhost:31950      # external_api_call, run monitor
+    OPENTRONS_ROBOT_HOST=localhost:31950              # opentrons_mcp.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+@dataclass
+class FakeRobotConfig:
+    name: str = field(default_factory=lambda: os.getenv("FAKE_ROBOT_NAME", "fake-flex"))
+    serial: str = field(default_factory=lambda: os.getenv("FAKE_ROBOT_SERIAL", "FLXA1020240101001"))
+    # Added to every response: latency_ms ± uniform(jitter_ms).
+    latency_ms: float = field(default_factory=lambda: _env_float("FAKE_ROBOT_LATENCY_MS", 20.0))
+    jitter_ms: float = field(default_factory=lambda: _env_float("FAKE_ROBOT_JITTER_MS", 10.0))
+    # Fraction of requests answered with 503 instead of a real response.
+    error_rate: float = field(default_factory=lambda: _env_float("FAKE_ROBOT_ERROR_RATE", 0.0))
+    # Multiplies seeded protocols and commands per run to grow payloads.
+    payload_scale: float = field(default_factory=lambda: _env_float("FAKE_ROBOT_PAYLOAD_SCALE", 1.0))
+    command_seconds: float = field(default_factory=lambda: _env_float("FAKE_ROBOT_COMMAND_SECONDS", 0.5))
+    seed: Optional[int] = field(default_factory=lambda: int(os.environ["FAKE_ROBOT_SEED"]) if "FAKE_ROBOT_SEED" in os.environ else None)
+
+
+COMMAND_CYCLE = ("pickUpTip", "aspirate", "dispense", "mix", "dropTip")
+BASE_COMMANDS_PER_RUN = 40
+BASE_PROTOCOLS = 5
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+
+
+class FakeRun:
+    __slots__ = ("id", "protocol_id", "created_at", "status", "actions", "commands", "_elapsed", "_resumed_at")
+
+    def __init__(self, protocol_id: Optional[str], command_count: int, rng: random.Random):
+        self.id = str(uuid.uuid4())
+        self.protocol_id = protocol_id
+        self.created_at = time.time()
+        self.status = "idle"
+        self.actions: list[dict[str, Any]] = []
+        self.commands = [self._command(i, rng) for i in range(command_count)]
+        self._elapsed = 0.0  # virtual seconds the run has been playing
+        self._resumed_at: Optional[float] = None
+
+    @staticmethod
+    def _command(index: int, rng: random.Random) -> dict[str, Any]:
+        command_type = COMMAND_CYCLE[index % len(COMMAND_CYCLE)]
+        params: dict[str, Any] = {"pipetteId": "pipette-left", "labwareId": f"labware-{1 + index % 3}"}
+        if command_type in {"aspirate", "dispense", "mix"}:
+            params.update(volume=rng.choice([20, 50, 100, 200]), flowRate=rng.choice([20.0, 50.0, 100.0]))
+            params["wellName"] = f"{'ABCDEFGH'[index % 8]}{1 + (index // 8) % 12}"
+        return {"id": str(uuid.uuid4()), "key": f"cmd-{index}", "commandType": command_type, "params": params,
+                "intent": "protocol", "status": "queued"}
+
+    def action(self, action_type: str) -> dict[str, Any]:
+        now = time.time()
+        if action_type == "play":
+            if self.status in {"succeeded", "stopped"}:
+                raise HTTPException(status_code=409, detail=f"Run is {self.status}")
+            self._resumed_at = now
+            self.status = "running"
+        elif action_type == "pause":
+            self._advance(now)
+            self._resumed_at = None
+            self.status = "paused"
+        elif action_type == "stop":
+            self._advance(now)
+            self._resumed_at = None
+            self.status = "stopped"
+        else:
+            raise HTTPException(status_code=422, detail=f"Unknown actionType {action_type!r}")
+        entry = {"id": str(uuid.uuid4()), "actionType": action_type, "createdAt": _iso(now)}
+        self.actions.append(entry)
+        return entry
+
+    def _advance(self, now: float) -> None:
+        if self._resumed_at is not None:
+            self._elapsed += now - self._resumed_at
+            self._resumed_at = now
+
+    def refresh(self, command_seconds: float) -> None:
+        """Bring command statuses up to date with the virtual clock."""
+
+        now = time.time()
+        self._advance(now)
+        started_at = now - self._elapsed
+        for i, command in enumerate(self.commands):
+            start, end = i * command_seconds, (i + 1) * command_seconds
+            if self._elapsed >= end:
+                command.update(status="succeeded", startedAt=_iso(started_at + start), completedAt=_iso(started_at + end))
+            elif self._elapsed >= start and self.status == "running":
+                command.update(status="running", startedAt=_iso(started_at + start))
+            elif self.status == "stopped" and command["status"] in {"queued", "running"}:
+                command["status"] = "failed" if command["status"] == "running" else "queued"
+        if self.status == "running" and self.commands and self.commands[-1]["status"] == "succeeded":
+            self.status = "succeeded"
+            self._resumed_at = None
+
+    def as_dict(self) -> dict[str, Any]:
+        current = next((c["id"] for c in self.commands if c["status"] == "running"), None)
+        return {"id": self.id, "protocolId": self.protocol_id, "status": self.status, "createdAt": _iso(self.created_at),
+                "actions": self.actions, "current": current is not None}
+
+
+class FakeRobotState:
+    def __init__(self, config: FakeRobotConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.protocols: dict[str, dict[str, Any]] = {}
+        self.runs: dict[str, FakeRun] = {}
+        self.settings = {"disableHomeOnBoot": False, "enableDoorSafetySwitch": True}
+        for i in range(max(1, round(BASE_PROTOCOLS * config.payload_scale))):
+            self.add_protocol(f"seed_protocol_{i}.py")
+
+    def add_protocol(self, filename: str, protocol_name: Optional[str] = None) -> dict[str, Any]:
+        protocol_id = str(uuid.uuid4())
+        protocol = {
+            "id": protocol_id,
+            "createdAt": _iso(time.time()),
+            "protocolType": "python",
+            "protocolKind": "standard",
+            "robotType": "OT-3 Standard",
+            "metadata": {"protocolName": protocol_name or filename.rsplit(".", 1)[0], "author": "fake-robot"},
+            "files": [{"name": filename, "role": "main"}],
+            "analysisSummaries": [{"id": str(uuid.uuid4()), "status": "completed"}],
+        }
+        self.protocols[protocol_id] = protocol
+        return protocol
+
+    def commands_per_run(self) -> int:
+        return max(1, round(BASE_COMMANDS_PER_RUN * self.config.payload_scale))
+
+
+# ---------------------------------------------------------------------------
+# App factory
+# ---------------------------------------------------------------------------
+
+
+def create_app(config: Optional[FakeRobotConfig] = None) -> FastAPI:
+    config = config or FakeRobotConfig()
+    state = FakeRobotState(config)
+    app = FastAPI(title="Fake Opentrons Flex", version="0.1.0")
+    app.state.robot = state
+
+    @app.middleware("http")
+    async def inject_latency_and_errors(request: Request, call_next):
+        delay = config.latency_ms + state.rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and state.rng.random() < config.error_rate:
+            return JSONResponse({"errors": [{"detail": "Injected failure"}]}, status_code=503)
+        return await call_next(request)
+
+    def get_run(run_id: str) -> FakeRun:
+        run = state.runs.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+        run.refresh(config.command_seconds)
+        return run
+
+    # Identification / hardware ------------------------------------------------
+
+    @app.get("/health")
+    def health():
+        return {"name": config.name, "robot_model": "OT-3 Standard", "robot_serial": config.serial,
+                "api_version": "8.0.0", "fw_version": "v1.0.0", "system_version": "v1.0.0",
+                "links": {"apiLog": "/logs/api.log", "serialLog": "/logs/serial.log"}}
+
+    @app.get("/instruments")
+    def instruments():
+        return {"data": [
+            {"mount": "left", "instrumentType": "pipette", "instrumentName": "p1000_single_flex",
+             "instrumentModel": "p1000_single_v3.5", "serialNumber": "P1KSV3520240101", "ok": True,
+             "data": {"channels": 1, "min_volume": 5, "max_volume": 1000}},
+            {"mount": "right", "instrumentType": "pipette", "instrumentName": "p1000_multi_flex",
+             "instrumentModel": "p1000_multi_v3.5", "serialNumber": "P1KMV3520240101", "ok": True,
+             "data": {"channels": 8, "min_volume": 5, "max_volume": 1000}},
+        ], "meta": {"cursor": 0, "totalLength": 2}}
+
+    @app.get("/pipettes")
+    def pipettes():
+        return {"left": {"model": "p1000_single_v3.5", "id": "P1KSV3520240101"},
+                "right": {"model": "p1000_multi_v3.5", "id": "P1KMV3520240101"}}
+
+    @app.post("/blink")
+    def blink(seconds: int = 1):
+        return {"message": f"Blinking for {seconds}s"}
+
+    @app.post("/motors/disengage")
+    def disengage(body: dict):
+        return {"message": f"Disengaged axes {', '.join(body.get('axes', []))}"}
+
+    @app.get("/calibration/status")
+    def calibration_status():
+        return {"deckCalibration": {"status": "OK"}, "instrumentCalibration": {"left": "OK", "right": "OK"}}
+
+    # Settings ------------------------------------------------------------------
+
+    @app.get("/settings")
+    def get_settings():
+        return {"settings": [{"id": k, "value": v} for k, v in state.settings.items()]}
+
+    @app.post("/settings")
+    def change_setting(body: dict):
+        state.settings[body["id"]] = body.get("value")
+        return get_settings()
+
+    @app.get("/robot/settings")
+    def robot_settings():
+        return {"model": "OT-3 Standard", "name": config.name}
+
+    @app.get("/settings/pipettes")
+    def pipette_settings():
+        return {}
+
+    @app.patch("/settings/pipettes/{pipette_id}")
+    def patch_pipette_settings(pipette_id: str, body: dict):
+        return {"id": pipette_id, **body}
+
+    # Protocols -------------------------------------------------------------------
+
+    @app.get("/protocols")
+    def list_protocols():
+        data = list(state.protocols.values())
+        return {"data": data, "meta": {"cursor": 0, "totalLength": len(data)}}
+
+    @app.post("/protocols", status_code=201)
+    async def upload_protocol(request: Request):
+        filename = "protocol.py"
+        if request.headers.get("content-type", "").startswith("multipart/"):
+            form = await request.form()
+            uploads = form.getlist("files")
+            if not uploads:
+                raise HTTPException(status_code=422, detail="No files uploaded")
+            for upload in uploads:
+                await upload.read()  # consume like the robot would
+            filename = uploads[0].filename or filename
+        protocol = state.add_protocol(filename)
+        return {"data": protocol}
+
+    @app.get("/protocols/{protocol_id}")
+    def get_protocol(protocol_id: str):
+        if protocol_id not in state.protocols:
+            raise HTTPException(status_code=404, detail=f"Protocol {protocol_id} not found")
+        return {"data": state.protocols[protocol_id]}
+
+    # Runs ------------------------------------------------------------------------
+
+    @app.post("/runs", status_code=201)
+    def create_run(body: Optional[dict] = None):
+        protocol_id = ((body or {}).get("data") or {}).get("protocolId")
+        if protocol_id is not None and protocol_id not in state.protocols:
+            raise HTTPException(status_code=404, detail=f"Protocol {protocol_id} not found")
+        run = FakeRun(protocol_id, state.commands_per_run(), state.rng)
+        state.runs[run.id] = run
+        return {"data": run.as_dict()}
+
+    @app.get("/runs")
+    def list_runs():
+        for run in state.runs.values():
+            run.refresh(config.command_seconds)
+        data = [run.as_dict() for run in state.runs.values()]
+        return {"data": data, "meta": {"cursor": 0, "totalLength": len(data)}}
+
+    @app.get("/runs/{run_id}")
+    def read_run(run_id: str):
+        return {"data": get_run(run_id).as_dict()}
+
+    @app.post("/runs/{run_id}/actions", status_code=201)
+    def run_action(run_id: str, body: dict):
+        run = get_run(run_id)
+        return {"data": run.action((body.get("data") or {}).get("actionType", ""))}
+
+    @app.get("/runs/{run_id}/commands")
+    def run_commands(run_id: str, cursor: Optional[int] = None, pageLength: int = 20):
+        commands = get_run(run_id).commands
+        if cursor is None:
+            cursor = max(0, len(commands) - pageLength)
+        page = commands[cursor:cursor + pageLength]
+        return {"data": page, "meta": {"cursor": cursor, "totalLength": len(commands)}}
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":  # pragma: no cover – manual use
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("FAKE_ROBOT_PORT", 31950)))
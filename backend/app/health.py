@@ -0,0 +1,172 @@
+"""Background-probed health snapshot.
+
+``/api/health`` used to run ``SELECT 1`` on every hit, so load-balancer
+probes turned into a constant trickle of database work, and it said nothing
+about the other dependencies.  :class:`HealthMonitor` instead runs one
+background loop per dependency and keeps the latest result in memory:
+
+* ``database`` – ``SELECT 1`` every ``HEALTH_DB_INTERVAL`` seconds,
+* ``mcp`` – start an MCP server and complete the handshake every
+  ``HEALTH_MCP_INTERVAL`` seconds (every tool call pays this start-up),
+* ``reader`` – the read-only ``get_reader_status`` tool every
+  ``HEALTH_READER_INTERVAL`` seconds,
+* ``robots`` – read from the circuit breakers, whose own prober polls each
+  robot's ``/health`` (see :mod:`app.circuit_breaker`).
+
+Health endpoints only read the snapshot.  Every entry carries when it was
+checked and how old that is; a result older than ``HEALTH_STALE_AFTER``
+probe intervals is reported as ``stale``.  An interval of 0 disables a probe.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Optional
+
+from sqlalchemy import text
+
+from .circuit_breaker import CLOSED, robot_health
+from .database import engine
+from .mcp_client import MCPClient
+from .tracing import span
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+HEALTH_DB_INTERVAL = float(os.getenv("HEALTH_DB_INTERVAL", 10.0))
+HEALTH_MCP_INTERVAL = float(os.getenv("HEALTH_MCP_INTERVAL", 60.0))
+HEALTH_READER_INTERVAL = float(os.getenv("HEALTH_READER_INTERVAL", 120.0))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", 15.0))
+HEALTH_STALE_AFTER = 3  # probe intervals
+
+
+class ProbeResult:
+    __slots__ = ("status", "checked_at", "latency_ms", "detail")
+
+    def __init__(self, status: str, checked_at: float, latency_ms: float, detail: Any = None):
+        self.status = status
+        self.checked_at = checked_at
+        self.latency_ms = latency_ms
+        self.detail = detail
+
+
+class HealthMonitor:
+    """Runs registered probes on their own intervals and serves the latest results."""
+
+    def __init__(self):
+        self._probes: dict[str, tuple[Callable[[], Any], float]] = {}
+        self._results: dict[str, ProbeResult] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, name: str, probe: Callable[[], Any], interval: float) -> None:
+        """*probe* is a blocking callable; it raises on failure and may return detail."""
+        self._probes[name] = (probe, interval)
+
+    async def run_probe(self, name: str) -> ProbeResult:
+        probe, _ = self._probes[name]
+        started = time.perf_counter()
+        with span("health.probe", probe=name):
+            try:
+                detail = await asyncio.wait_for(asyncio.to_thread(probe), HEALTH_PROBE_TIMEOUT)
+                status = "ok"
+            except asyncio.TimeoutError:
+                status, detail = "error", f"Timed out after {HEALTH_PROBE_TIMEOUT:.0f}s"
+            except Exception as exc:
+                status, detail = "error", str(exc) or type(exc).__name__
+        result = ProbeResult(status, time.time(), (time.perf_counter() - started) * 1000, detail)
+        self._results[name] = result
+        return result
+
+    async def _loop(self, name: str, interval: float) -> None:
+        while True:
+            await self.run_probe(name)
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._loop(name, interval))
+                       for name, (_, interval) in self._probes.items() if interval > 0]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def probe(self, name: str, now: Optional[float] = None) -> dict[str, Any]:
+        now = now or time.time()
+        result = self._results.get(name)
+        interval = self._probes[name][1]
+        if result is None:
+            return {"status": "disabled" if interval <= 0 else "unknown", "checked_at": None, "age_s": None}
+        age = now - result.checked_at
+        status = result.status
+        if status == "ok" and interval > 0 and age > HEALTH_STALE_AFTER * interval:
+            status = "stale"
+        return {"status": status, "checked_at": result.checked_at, "age_s": round(age, 3),
+                "latency_ms": round(result.latency_ms, 2), "detail": result.detail}
+
+    def summary(self) -> dict[str, Any]:
+        """Cheap answer for load balancers: app and database status from the snapshot."""
+        db = self.probe("database")
+        return {"app": "ok", "db": db["status"], "db_age_s": db["age_s"]}
+
+    def full(self) -> dict[str, Any]:
+        now = time.time()
+        components = {name: self.probe(name, now) for name in self._probes}
+        robots = {}
+        for robot, state in robot_health.status().items():
+            last_known = state["last_known"] or {}
+            checked_at = last_known.get("checked_at")
+            robots[robot] = {
+                "status": "unknown" if checked_at is None else ("ok" if state["state"] == CLOSED else "error"),
+                "circuit": state["state"],
+                "checked_at": checked_at,
+                "age_s": round(now - checked_at, 3) if checked_at else None,
+                "last_healthy_at": last_known.get("healthy_at"),
+                "detail": state["last_error"],
+            }
+        components["robots"] = robots
+        statuses = [c["status"] for name, c in components.items() if name != "robots"]
+        statuses += [r["status"] for r in robots.values()]
+        overall = "ok" if all(s in {"ok", "disabled"} for s in statuses) else "degraded"
+        if components.get("database", {}).get("status") == "error":
+            overall = "error"
+        return {"status": overall, "generated_at": now, "components": components}
+
+
+# ---------------------------------------------------------------------------
+# Probes
+# ---------------------------------------------------------------------------
+
+
+def _check_database() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def _check_mcp() -> dict[str, Any]:
+    return {"handshake_s": round(MCPClient(timeout=HEALTH_PROBE_TIMEOUT).ping(), 3)}
+
+
+def _check_reader() -> str:
+    result = MCPClient(timeout=HEALTH_PROBE_TIMEOUT).call_tool("get_reader_status")
+    if not isinstance(result, str) or not result.startswith("Byonoy reader available"):
+        raise RuntimeError(str(result))
+    return result
+
+
+health_monitor = HealthMonitor()
+health_monitor.register("database", _check_database, HEALTH_DB_INTERVAL)
+health_monitor.register("mcp", _check_mcp, HEALTH_MCP_INTERVAL)
+health_monitor.register("reader", _check_reader, HEALTH_READER_INTERVAL)
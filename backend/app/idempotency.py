@@ -0,0 +1,146 @@
+"""Idempotent execution of realtime function calls.
+
+The browser can deliver the same function call more than once: data-channel
+reconnects replay events, and both ``function_call`` and
+``response.function_call_arguments.done`` describe the same call.  Without a
+guard every duplicate repeats a robot action.
+
+:class:`IdempotencyStore` keys each execution by the realtime ``call_id`` plus
+a hash of the function name and arguments:
+
+* the first request executes, concurrent duplicates block on it and share
+  its result (or its error),
+* later duplicates within ``IDEMPOTENCY_TTL`` seconds get the stored result,
+* failed executions are forgotten so a genuine retry can run again.
+
+Results live in process memory.  With the shared cache available (see
+:mod:`app.cache`) the first execution is also coordinated across uvicorn
+workers, so a duplicate delivered to another worker waits for and reuses
+the same result.  With ``IDEMPOTENCY_PERSIST=1`` results are also mirrored
+to the ``function_call_results`` table so they survive restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from .cache import shared_cache
+from .database import SessionLocal
+from .models import FunctionCallResult
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", 300))  # seconds
+IDEMPOTENCY_PERSIST = os.getenv("IDEMPOTENCY_PERSIST", "0") in {"1", "true", "yes"}
+
+
+class _Entry:
+    __slots__ = ("done", "result", "error", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """Short-lived result cache that coalesces duplicate function calls."""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, session_factory=None, shared=None):
+        self._ttl = ttl
+        self._session_factory = session_factory
+        self._shared = shared
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    @staticmethod
+    def make_key(call_id: str, name: str, args: dict[str, Any]) -> str:
+        canonical = json.dumps([name, args], sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(canonical.encode()).hexdigest()[:32]
+        return f"{call_id}:{digest}"
+
+    def run(self, call_id: str, name: str, args: dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """Execute *fn* at most once per (call_id, name, args) within the TTL."""
+
+        key = self.make_key(call_id, name, args)
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry(now + self._ttl)
+
+        if not owner:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result
+
+        try:
+            persisted = self._load(key)
+            if persisted is not None:
+                entry.result = persisted["result"]
+                return entry.result
+            if self._shared is not None:
+                entry.result = self._shared.get_or_compute(key, fn, ttl=self._ttl)
+            else:
+                entry.result = fn()
+            self._save(key, call_id, name, entry.result)
+            return entry.result
+        except BaseException as exc:
+            entry.error = exc
+            with self._lock:
+                self._entries.pop(key, None)
+            raise
+        finally:
+            entry.done.set()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _purge(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if e.done.is_set() and e.expires_at < now]
+        for key in expired:
+            del self._entries[key]
+
+    def _load(self, key: str) -> Optional[dict[str, Any]]:
+        if self._session_factory is None:
+            return None
+        cutoff = datetime.utcnow() - timedelta(seconds=self._ttl)
+        with self._session_factory() as db:
+            row = db.get(FunctionCallResult, key)
+            if row is None or row.created_at < cutoff:
+                return None
+            return {"result": row.result}
+
+    def _save(self, key: str, call_id: str, name: str, result: Any) -> None:
+        if self._session_factory is None:
+            return
+        cutoff = datetime.utcnow() - timedelta(seconds=self._ttl)
+        # The call already ran: a failing mirror must not turn it into an
+        # error that invites the client to repeat the mutation.
+        try:
+            with self._session_factory() as db:
+                db.query(FunctionCallResult).filter(FunctionCallResult.created_at < cutoff).delete()
+                db.merge(FunctionCallResult(key=key, call_id=call_id, name=name, result=result))
+                db.commit()
+        except Exception as exc:
+            print("Idempotency record not persisted:", exc)
+
+
+idempotency_store = IdempotencyStore(
+    session_factory=SessionLocal if IDEMPOTENCY_PERSIST else None,
+    shared=shared_cache("idempotency", ttl=IDEMPOTENCY_TTL),
+)
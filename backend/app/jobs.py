@@ -0,0 +1,261 @@
+"""Background execution of long-running MCP tools.
+
+Some tools (parameter sweeps, real-plate optimisations) easily outlive the
+30 s budget of a synchronous ``MCPClient.call_tool``.  The :class:`JobManager`
+accepts those calls, hands back a job id immediately and runs the work in a
+dedicated MCP server process per job.  Progress and partial top-k results are
+streamed back over MCP progress/log notifications and persisted to the
+``jobs`` table so that:
+
+* ``GET /api/jobs/{id}`` and the SSE stream can report live progress,
+* ``POST /api/jobs/{id}/cancel`` can terminate the worker process,
+* jobs interrupted by a backend restart are picked up again on startup
+  when their tool can resume (:data:`RESUMABLE_TOOLS`); other running jobs
+  are marked ``interrupted`` rather than repeated.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from .database import SessionLocal
+from .mcp_client import MCPClient
+from .models import Job
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# Tools that are always routed through the job manager by the dispatcher.
+LONG_RUNNING_TOOLS = {"run_parameter_optimization_experiment", "run_pipelined_optimization_experiment"}
+
+# Tools that accept a ``start_index`` argument and can continue a sweep from
+# the last persisted progress value instead of starting over.
+RESUMABLE_TOOLS = {"run_parameter_optimization_experiment"}
+
+JOB_TIMEOUT = float(os.getenv("MCP_JOB_TIMEOUT", 60 * 60))  # 1 hour default
+JOB_WORKERS = int(os.getenv("MCP_JOB_WORKERS", 2))
+TOP_K = 5
+
+ACTIVE_STATUSES = {"queued", "running"}
+
+
+class JobManager:
+    """Run MCP tool calls on a bounded pool of worker processes."""
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = JOB_WORKERS):
+        self._session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-job")
+        self._lock = threading.Lock()
+        # In-memory mirror of the persisted rows, used by the SSE stream so
+        # that polling clients never touch the database.
+        self._snapshots: dict[str, dict[str, Any]] = {}
+        self._processes: dict[str, subprocess.Popen] = {}
+        self._cancelled: set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, tool_name: str, arguments: Optional[dict[str, Any]] = None, *,
+               env: Optional[dict[str, str]] = None) -> str:
+        """Persist a new job and schedule it.  Returns the job id.
+
+        *env* is added to the worker's MCP server environment (and kept for a
+        resumed run), e.g. ``OPENTRONS_ROBOT_HOST`` of the robot to drive.
+        """
+
+        job_id = str(uuid.uuid4())
+        with self._session_factory() as db:
+            job = Job(id=job_id, tool_name=tool_name, arguments=arguments or {}, env=env, status="queued")
+            db.add(job)
+            db.commit()
+            self._remember(job)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Return the latest snapshot of *job_id*, loading it from the DB if needed."""
+
+        with self._lock:
+            snapshot = self._snapshots.get(job_id)
+        if snapshot is not None:
+            return dict(snapshot)
+        with self._session_factory() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return None
+            return self._remember(job)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.  Returns False if it already finished."""
+
+        snapshot = self.get(job_id)
+        if snapshot is None or snapshot["status"] not in ACTIVE_STATUSES:
+            return False
+        with self._lock:
+            self._cancelled.add(job_id)
+            process = self._processes.get(job_id)
+        if process is not None and process.poll() is None:
+            process.terminate()
+        if self._transition(job_id, ACTIVE_STATUSES, status="cancelled"):
+            return True
+        # Finished in the meantime
+        with self._lock:
+            self._cancelled.discard(job_id)
+        return False
+
+    def resume_pending(self) -> list[str]:
+        """Re-schedule jobs left queued/running by a previous process.
+
+        A running job whose tool cannot continue from ``start_index`` is marked
+        ``interrupted`` instead: starting it over would repeat work it already
+        did on the robot.
+        """
+
+        with self._session_factory() as db:
+            jobs = db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES)).all()
+            job_ids = []
+            for job in jobs:
+                if job.status == "running" and job.tool_name not in RESUMABLE_TOOLS:
+                    job.status = "interrupted"
+                    job.error = "Interrupted by a backend restart; not resumable, so it was not started again"
+                else:
+                    job.status = "queued"
+                    job_ids.append(job.id)
+                self._remember(job)
+            db.commit()
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+        return job_ids
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _run(self, job_id: str) -> None:
+        snapshot = self.get(job_id)
+        # A cancel may land at any point up to here; the transition below only
+        # succeeds while the job is still queued.
+        if (self._is_cancelled(job_id) or snapshot is None or snapshot["status"] != "queued"
+                or not self._transition(job_id, {"queued"}, status="running")):
+            with self._lock:
+                self._cancelled.discard(job_id)
+            return
+
+        arguments = dict(snapshot["arguments"] or {})
+        if snapshot["tool_name"] in RESUMABLE_TOOLS and snapshot["progress"]:
+            arguments["start_index"] = int(snapshot["progress"])
+            if snapshot["partial_results"]:
+                arguments["previous_top_k"] = json.dumps(snapshot["partial_results"])
+
+        def on_start(process: subprocess.Popen) -> None:
+            with self._lock:
+                self._processes[job_id] = process
+
+        def on_progress(progress: float, total: Optional[float]) -> None:
+            self._update(job_id, progress=progress, total=total)
+
+        def on_message(data: Any) -> None:
+            # ctx.info() log payloads arrive as JSON strings.
+            if isinstance(data, str):
+                try:
+                    data = json.loads(data)
+                except ValueError:
+                    return
+            if isinstance(data, dict) and "top_k" in data:
+                self._update(job_id, partial_results=self._merge_top_k(job_id, data["top_k"]))
+
+        try:
+            result = MCPClient(timeout=JOB_TIMEOUT, env=snapshot["env"]).call_tool_streaming(
+                snapshot["tool_name"],
+                arguments,
+                on_start=on_start,
+                on_progress=on_progress,
+                on_message=on_message,
+            )
+        except Exception as exc:
+            if not self._is_cancelled(job_id):
+                self._transition(job_id, {"running"}, status="failed", error=str(exc))
+        else:
+            if not self._is_cancelled(job_id):
+                if not isinstance(result, str):
+                    result = json.dumps(result)
+                failed = result.startswith(("MCP Error:", "Tool Error:"))
+                self._transition(
+                    job_id,
+                    {"running"},
+                    status="failed" if failed else "succeeded",
+                    result=None if failed else result,
+                    error=result if failed else None,
+                )
+        finally:
+            with self._lock:
+                self._processes.pop(job_id, None)
+                self._cancelled.discard(job_id)
+
+    # ------------------------------------------------------------------
+    # Persistence helpers
+    # ------------------------------------------------------------------
+
+    def _is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelled
+
+    def _merge_top_k(self, job_id: str, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # Merge with what an earlier (interrupted) attempt already found so a
+        # resumed sweep keeps its best results.
+        previous = (self.get(job_id) or {}).get("partial_results") or []
+        merged = {tuple(sorted((k, v) for k, v in e.items() if k != "score")): e for e in previous + entries}
+        ranked = sorted(merged.values(), key=lambda e: e.get("score", 0), reverse=True)
+        return ranked[:TOP_K]
+
+    def _transition(self, job_id: str, from_statuses: set[str], **fields: Any) -> bool:
+        """Apply *fields* only while the job's status is one of *from_statuses*; False otherwise."""
+        with self._session_factory() as db:
+            changed = db.query(Job).filter(Job.id == job_id, Job.status.in_(from_statuses)).update(
+                fields, synchronize_session=False
+            )
+            db.commit()
+            job = db.get(Job, job_id)
+            if job is not None:
+                self._remember(job)
+        return bool(changed)
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        with self._session_factory() as db:
+            job = db.get(Job, job_id)
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+            self._remember(job)
+
+    def _remember(self, job: Job) -> dict[str, Any]:
+        snapshot = {
+            "id": job.id,
+            "tool_name": job.tool_name,
+            "arguments": job.arguments,
+            "env": job.env,
+            "status": job.status,
+            "progress": job.progress or 0.0,
+            "total": job.total,
+            "partial_results": job.partial_results,
+            "result": job.result,
+            "error": job.error,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        }
+        with self._lock:
+            self._snapshots[job.id] = snapshot
+        return dict(snapshot)
+
+
+job_manager = JobManager()
@@ -1,5 +1,4 @@
 """Maps LLM function-call events to actual CRUD operations."""
-from .mcp_client import MCPClient
 from __future__ import annotations
 
 from datetime import date
@@ -7,11 +6,66 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
+from .audit import AUDIT_ENABLED, audit_log
+from .circuit_breaker import (
+    ROBOT_MCP_TOOLS,
+    ROBOT_REQUEST_TIMEOUT,
+    RobotUnavailable,
+    describe_error,
+    mcp_robot_url,
+    robot_health,
+)
 from .crud import create_move, create_task, get_moves, get_tasks
+from .discovery import robot_registry
+from .idempotency import idempotency_store
+from .jobs import LONG_RUNNING_TOOLS, job_manager
+from .mcp_client import MCPClient
 from .models import Move, Task, User
+from .protocol_upload import spool_dir, spool_text, upload_manager
+from .run_monitor import run_monitor
+from .schemas import MoveOut, TaskOut
+from .serialization import dump, dump_one
+from .tool_schemas import InvalidToolCall, tool_catalog
+from .tracing import FUNCTION_CALL_SECONDS, ROBOT_REQUEST_SECONDS, span
+from .traffic import httpx_transport
+import asyncio
+import time
 import os
+import re
+import anyio
 import httpx
 
+_RUN_COMMANDS_RE = re.compile(r"^/?runs/(?P<run_id>[^/?]+)/commands/?$")
+_PROTOCOLS_RE = re.compile(r"^/?protocols/?$")
+
+# MCP tools that only read robot state or compute locally.  They can run
+# concurrently with anything; every other tool is treated as a mutation.
+READ_ONLY_MCP_TOOLS = {
+    "get_robot_health",
+    "get_instruments",
+    "list_protocols",
+    "validate_labware_exists",
+    "find_labware_by_description",
+    "check_deck_layout",
+    "suggest_optimal_deck_layout",
+    "get_available_labware",
+    "create_tartrazine_assay_protocol",
+    "create_serial_dilution_protocol",
+    "create_standard_curve_protocol",
+    "create_plate_replication_protocol",
+    "simulate_protocol_execution",
+    "generate_optimized_protocol",
+    "calculate_assay_metrics",
+    "get_reader_status",
+    "get_timing_model_info",
+}
+READER_MCP_TOOLS = {"connect_byonoy_reader", "read_tartrazine_absorbance"}
+READ_ONLY_FUNCTIONS = {"get_job_status"}
+
+BATCH_CALL_TIMEOUT = float(os.getenv("BATCH_CALL_TIMEOUT", 30.0))
+# MCPClient.call_tool and the robot tools report failures as strings with these prefixes
+MCP_FAILURE_PREFIXES = ("Error", "MCP Error:", "Tool Error:")
+
 
 class FunctionCallError(Exception):
     """Raised when an LLM function-call event is invalid or unsupported."""
@@ -26,35 +80,326 @@ def _parse_date(val: str | None) -> date | None:
         raise FunctionCallError(f"Invalid date format: {val!r} – expected YYYY-MM-DD")
 
 
-def handle_function_call(name: str, args: dict[str, Any], *, db: Session) -> Any:
+def _run_commands_from_monitor(run_id: str, since: int) -> dict[str, Any] | None:
+    """Serve ``GET /runs/{id}/commands`` from the shared run monitor.
+
+    Returns None when the monitor can't be reached from this thread (e.g. not
+    running inside the FastAPI worker pool) or its latest poll failed, so the
+    caller falls back to a direct robot request and reports that outcome.
+    """
+    try:
+        feed = anyio.from_thread.run(run_monitor.ensure, run_id)
+    except RuntimeError:
+        return None
+    if feed.last_error is not None:
+        return None
+    snap = feed.snapshot(since)
+    return {
+        "status_code": 200,
+        "body": {
+            "data": snap["commands"],
+            "meta": {"cursor": snap["cursor"], "totalLength": snap["cursor"], "runStatus": snap["run_status"]},
+        },
+    }
+
+
+def serialize_result(result: Any) -> Any:
+    """Convert ORM instances returned by a handler into JSON-ready dicts."""
+    if isinstance(result, Move):
+        return dump_one(MoveOut, result)
+    if isinstance(result, Task):
+        return dump_one(TaskOut, result)
+    if isinstance(result, list) and result and isinstance(result[0], (Move, Task)):
+        return dump(MoveOut if isinstance(result[0], Move) else TaskOut, result)
+    return result
+
+
+def mutation_key(name: str, args: dict[str, Any]) -> str | None:
+    """Return the resource a call mutates, or None for read-only calls.
+
+    Calls sharing a key must run in order; everything else may overlap.
+    """
+    if name in READ_ONLY_FUNCTIONS:
+        return None
+    if name == "mcp_call":
+        tool_name = args.get("tool_name")
+        if tool_name in READ_ONLY_MCP_TOOLS:
+            return None
+        if tool_name in READER_MCP_TOOLS:
+            return "reader"
+        return f"robot:{args['robot']}" if args.get("robot") else "robot"
+    if name == "external_api_call":
+        if (args.get("method") or "GET").upper() == "GET":
+            return None
+        return f"robot:{args.get('robot') or os.getenv('EXTERNAL_API_BASE_URL', '')}"
+    return name
+
+
+def _as_mcp_call(name: str, args: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """Per-tool realtime functions are ``mcp_call`` under the tool's name."""
+    if name in tool_catalog:
+        return "mcp_call", tool_catalog.as_mcp_call(name, args)
+    return name, args
+
+
+def _audit_robot(name: str, args: dict[str, Any]) -> str | None:
+    """The robot (or reader) a call talked to, for the audit log."""
+    if name == "external_api_call":
+        return args.get("robot") or os.getenv("EXTERNAL_API_BASE_URL")
+    if name == "mcp_call":
+        tool_name = args.get("tool_name")
+        if tool_name in READER_MCP_TOOLS or tool_name == "get_reader_status":
+            return "reader"
+        if tool_name in ROBOT_MCP_TOOLS or (mutation_key(name, args) or "").startswith("robot"):
+            return args.get("robot") or mcp_robot_url()
+    return None
+
+
+def _target_robot(args: dict[str, Any], configured_by: str, *, read_only: bool) -> dict[str, Any] | None:
+    """Registry entry of ``args["robot"]`` (serial, name or address).
+
+    Without one, the most recently discovered robot stands in when the
+    *configured_by* environment variable is unset; None means use that variable.
+    A mutation never guesses: with several robots registered it must name one.
+    """
+    robot = args.get("robot")
+    if robot:
+        entry = robot_registry.resolve(robot)
+        if entry is None:
+            raise FunctionCallError(f"Unknown robot: {robot!r}")
+        return entry
+    if os.getenv(configured_by):
+        return None
+    if not read_only:
+        robots = robot_registry.list()
+        if len(robots) > 1:
+            names = ", ".join(r["name"] or r["serial"] for r in robots)
+            raise FunctionCallError(f"Several robots are registered ({names}); pass \"robot\" to choose one")
+    return robot_registry.default()
+
+
+async def handle_function_calls(
+    calls: list[dict[str, Any]],
+    *,
+    session_factory,
+    timeout: float = BATCH_CALL_TIMEOUT,
+) -> list[dict[str, Any]]:
+    """Execute several function calls emitted in one model response.
+
+    Read-only calls run concurrently; mutations of the same resource run one
+    after another in the order received.  Each call gets its own DB session
+    and *timeout*, so the batch takes about as long as its slowest chain.
+    A mutation that times out is reported as such, but the next mutation of
+    its chain only starts once the timed-out one has really finished.
+    Failures are reported per call.  Results are returned in input order.
+    """
+
+    results: list[dict[str, Any] | None] = [None] * len(calls)
+
+    def execute(call: dict[str, Any]) -> Any:
+        with session_factory() as db:
+            return handle_function_call(call["name"], call.get("arguments") or {}, db=db, call_id=call.get("call_id"))
+
+    async def run_one(index: int) -> asyncio.Task:
+        """Record the call's entry; returns its worker, which may still be running after a timeout."""
+        call = calls[index]
+        entry = {"call_id": call.get("call_id"), "name": call["name"]}
+        worker = asyncio.ensure_future(anyio.to_thread.run_sync(execute, call))
+        # Retrieve the outcome even when nobody awaits a timed-out worker
+        worker.add_done_callback(lambda task: task.cancelled() or task.exception())
+        done, _ = await asyncio.wait({worker}, timeout=timeout)
+        if not done:
+            entry.update(status="error", error=f"Timed out after {timeout}s")
+        else:
+            try:
+                entry["result"] = worker.result()
+                entry["status"] = "ok"
+            except FunctionCallError as exc:
+                entry.update(status="error", error=str(exc))
+            except Exception as exc:
+                entry.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        results[index] = entry
+        return worker
+
+    async def run_chain(indices: list[int]) -> None:
+        for index in indices:
+            worker = await run_one(index)
+            # Never overlap two mutations of the same resource
+            await asyncio.wait({worker})
+
+    chains: dict[str, list[int]] = {}
+    tasks = []
+    for index, call in enumerate(calls):
+        key = mutation_key(*_as_mcp_call(call["name"], call.get("arguments") or {}))
+        if key is None:
+            tasks.append(run_one(index))
+        else:
+            chains.setdefault(key, []).append(index)
+    tasks.extend(run_chain(indices) for indices in chains.values())
+    await asyncio.gather(*tasks)
+    return results
+
+
+def handle_function_call(name: str, args: dict[str, Any], *, db: Session, call_id: str | None = None) -> Any:
+    """Dispatch an LLM function call, executing it at most once per realtime *call_id*.
+
+    Without a call id every invocation executes.  With one, duplicates
+    (replayed or concurrent) share the first execution's result.  The result
+    is serialized once, here, and returned JSON-ready.
+    """
+    name, args = _as_mcp_call(name, args)
+    started = time.perf_counter()
+    outcome = "error"
+    result = error = None
+    with span("function_call", function=name, call_id=call_id, tool=args.get("tool_name")):
+        try:
+            if call_id is None:
+                result = serialize_result(_dispatch(name, args, db=db))
+            else:
+                result = idempotency_store.run(
+                    call_id, name, args, lambda: serialize_result(_dispatch(name, args, db=db))
+                )
+            outcome = "ok"
+            return result
+        except Exception as exc:
+            error = str(exc)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            FUNCTION_CALL_SECONDS.observe(elapsed, function=name, status=outcome)
+            if AUDIT_ENABLED:
+                # Queued only; the audit writer measures the result and inserts in batches.
+                # A failure here must not replace the call's own outcome.
+                try:
+                    audit_log.record(name=name, arguments=args, status=outcome, latency_ms=elapsed * 1000,
+                                     call_id=call_id, robot=_audit_robot(name, args), result=result, error=error)
+                except Exception as exc:
+                    print("Audit record failed:", exc)
+
+
+def _upload_protocol(body: dict[str, Any], robots: list[str]) -> dict[str, Any]:
+    """Upload ``body["protocol"]`` (or ``body["files"]``: ``[{"filename", "content"}]``, protocol first)."""
+    files = body.get("files") or (
+        [{"filename": body.get("filename") or "protocol.py", "content": body["protocol"]}] if "protocol" in body else []
+    )
+    if not files:
+        raise FunctionCallError("Protocol upload needs body.protocol or body.files")
+    directory = spool_dir()
+    try:
+        spooled = [spool_text(directory, f.get("filename") or "protocol.py", f.get("content") or "") for f in files]
+        snapshot = upload_manager.upload(spooled, robots, directory)
+    except ValueError as exc:
+        raise FunctionCallError(str(exc))
+    return {"status_code": 201 if snapshot["status"] == "done" else 502, "body": snapshot}
+
+
+def _dispatch(name: str, args: dict[str, Any], *, db: Session) -> Any:
     """Dispatch an LLM function call to MCP server or other handlers."""
     
     if name == "mcp_call":
         tool_name = args.get("tool_name")
-        tool_args = args.get("arguments", {})
+        tool_args = args.get("arguments") or {}
         
         if not tool_name:
             raise FunctionCallError("tool_name is required for mcp_call")
-        
-        # Initialize MCP client
-        mcp_client = MCPClient()
+        # Checked against the tool's schema before anything is spawned
+        try:
+            tool_catalog.validate(tool_name, tool_args)
+        except InvalidToolCall as exc:
+            raise FunctionCallError(str(exc))
+
+        robot = _target_robot(args, "OPENTRONS_ROBOT_HOST", read_only=mutation_key(name, args) in (None, "reader"))
+        breaker = None
+        if tool_name in ROBOT_MCP_TOOLS:
+            try:
+                breaker = robot_health.guard(robot["url"] if robot else mcp_robot_url())
+            except RobotUnavailable as exc:
+                raise FunctionCallError(str(exc))
+        env = {"OPENTRONS_ROBOT_HOST": robot["host"]} if robot else None
+
+        # Long-running tools go to the background job manager; the model
+        # gets a job id right away and can poll with get_job_status.
+        if tool_name in LONG_RUNNING_TOOLS or args.get("background"):
+            if breaker is not None:
+                breaker.release()  # the job's outcome comes too late to judge the robot by
+            job_id = job_manager.submit(tool_name, tool_args, env=env)
+            return {"tool": tool_name, "job_id": job_id, "status": "queued"}
+
+        # Initialize MCP client, pointed at the chosen robot
+        mcp_client = MCPClient(env=env)
         
         # Call the MCP tool
-        result = mcp_client.call_tool(tool_name, tool_args)
+        try:
+            result = mcp_client.call_tool(tool_name, tool_args)
+        except BaseException:
+            if breaker is not None:
+                breaker.release()
+            raise
+        if breaker is not None:
+            # The outcome feeds the breaker, so a half-open circuit closes (or re-opens)
+            # even when the health prober is disabled
+            summary = result.get("summary") if isinstance(result, dict) else result
+            failed = isinstance(summary, str) and summary.startswith(MCP_FAILURE_PREFIXES)
+            robot_health.record(breaker.robot, ok=not failed, error=summary[:200] if failed else "")
         
         return {"tool": tool_name, "result": result}
     
+    elif name == "get_job_status":
+        job = job_manager.get(args.get("job_id", ""))
+        if job is None:
+            raise FunctionCallError(f"Unknown job id: {args.get('job_id')!r}")
+        return job
+
+    elif name == "cancel_job":
+        job_id = args.get("job_id", "")
+        if job_manager.get(job_id) is None:
+            raise FunctionCallError(f"Unknown job id: {job_id!r}")
+        return {"job_id": job_id, "cancelled": job_manager.cancel(job_id)}
+
     # Keep external_api_call as fallback if needed
     elif name == "external_api_call":
         endpoint = args.get("endpoint")
         method = args.get("method", "GET").upper()
         body = args.get("body") or {}
-        base_url = os.getenv("EXTERNAL_API_BASE_URL")
+        robot = _target_robot(args, "EXTERNAL_API_BASE_URL", read_only=mutation_key(name, args) is None)
+        base_url = robot["url"] if robot else os.getenv("EXTERNAL_API_BASE_URL")
         if not base_url:
             raise FunctionCallError("External API base URL not configured")
+        if method == "POST" and _PROTOCOLS_RE.match(endpoint or ""):
+            # Sent as multipart, streamed from disk, to every robot in "robots"
+            robots = [(robot_registry.resolve(r) or {"url": r})["url"] for r in args.get("robots") or []]
+            return _upload_protocol(body, robots or [base_url])
+        match = _RUN_COMMANDS_RE.match(endpoint or "")
+        if method == "GET" and match and robot is None:
+            # Followers of the same run share one incremental robot poll;
+            # pass "since" to receive only commands after that position.
+            shared = _run_commands_from_monitor(match["run_id"], int(args.get("since") or 0))
+            if shared is not None:
+                return shared
         url = f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        robot = httpx.URL(base_url).host
+        try:
+            breaker = robot_health.guard(base_url)
+        except RobotUnavailable as exc:
+            raise FunctionCallError(str(exc))
+        started = time.perf_counter()
+        status_label = "error"
         try:
-            resp = httpx.request(method, url, json=body)
+            with span("robot.request", robot=robot, method=method, endpoint=endpoint):
+                try:
+                    with httpx.Client(transport=httpx_transport("robot")) as client:
+                        resp = client.request(method, url, json=body, timeout=ROBOT_REQUEST_TIMEOUT)
+                except httpx.TransportError as exc:
+                    robot_health.record(breaker.robot, ok=False, error=describe_error(exc))
+                    raise
+                except BaseException:
+                    breaker.release()
+                    raise
+            status_label = str(resp.status_code)
+            if resp.status_code >= 500:
+                robot_health.record(breaker.robot, ok=False, error=f"HTTP {resp.status_code}")
+            else:
+                robot_health.record(breaker.robot, ok=True)
             resp.raise_for_status()
             try:
                 data = resp.json()
@@ -63,5 +408,7 @@ def handle_function_call(name: str, args: dict[str, Any], *, db: Session) -> Any
             return {"status_code": resp.status_code, "body": data}
         except Exception as exc:
             raise FunctionCallError(f"External API request failed: {exc}")
+        finally:
+            ROBOT_REQUEST_SECONDS.observe(time.perf_counter() - started, robot=robot, method=method, status=status_label)
     else:
         raise FunctionCallError(f"Unsupported function name: {name}")
\ No newline at end of file
@@ -1,9 +1,16 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+import functools
+import json
+import os
+from datetime import datetime
+
+from fastapi import FastAPI, Depends, File, Form, HTTPException, Response, UploadFile, status
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from .auth import CurrentUser, authenticate_user, create_access_token, get_db
-from .crud import create_move, create_task, get_moves, get_tasks, create_user
+from .crud import create_move, create_task, get_move_rows, get_task_rows, create_user
 from .models import Base, Move
 from .schemas import (
     MoveCreate,
@@ -20,10 +27,23 @@ from .schemas import (
 from pydantic import BaseModel
 
 from .openai_realtime import create_ephemeral_session
-from .llm_dispatcher import FunctionCallError, handle_function_call
+from .realtime_sideband import SIDEBAND_ENABLED, SidebandError, sideband_manager
+from .llm_dispatcher import FunctionCallError, handle_function_call, handle_function_calls
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import health_check
+from .audit import AUDIT_ENABLED, audit_log
+from .circuit_breaker import robot_health
+from .database import SessionLocal
+from .discovery import robot_discovery, robot_registry
+from .health import health_monitor
+from .jobs import job_manager
+from . import profiling
+from .profiling import PROFILING_AVAILABLE, ProfiledRoute, route_target
+from .protocol_upload import UPLOAD_CHUNK_SIZE, spool_dir, spool_file, upload_manager
+from .run_monitor import run_monitor
+from .serialization import FastJSONResponse
+from .tool_schemas import REALTIME_TOOL_SCHEMAS, tool_catalog
+from .tracing import render_metrics, span
 
 # Create tables on startup (replace with Alembic in prod)
 from .database import engine as _engine
@@ -32,6 +52,8 @@ Base.metadata.create_all(bind=_engine)
 
 
 app = FastAPI(title="pippin Backend", version="0.1.0")
+# Every route below can be profiled on demand (see /api/admin/profiles)
+app.router.route_class = ProfiledRoute
 
 # Allow all CORS origins for skeleton. Adjust in production.
 app.add_middleware(
@@ -43,11 +65,131 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def resume_background_jobs():
+    """Pick up MCP jobs interrupted by the previous backend process."""
+    job_manager.resume_pending()
+
+
+@app.on_event("startup")
+async def load_realtime_tool_schemas():
+    """Publish every MCP tool as its own realtime function (cached across workers and restarts)."""
+    if not REALTIME_TOOL_SCHEMAS:
+        return
+    try:
+        await asyncio.to_thread(tool_catalog.load)
+    except Exception as exc:
+        print("MCP tool schemas not loaded, offering mcp_call only:", exc)
+
+
+@app.on_event("startup")
+def start_audit_writer():
+    """Write the function-call audit log behind the request path."""
+    if AUDIT_ENABLED:
+        audit_log.start()
+
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    audit_log.stop()
+
+
+@app.on_event("startup")
+async def start_robot_discovery():
+    robot_registry.load()
+    robot_discovery.start()
+
+
+@app.on_event("shutdown")
+async def stop_robot_discovery():
+    await robot_discovery.stop()
+
+
+@app.on_event("startup")
+async def start_robot_health_prober():
+    """Probe robot ``/health`` in the background so open circuits fail fast."""
+    robot_health.start()
+
+
+@app.on_event("shutdown")
+async def stop_robot_health_prober():
+    await robot_health.stop()
+
+
+@app.on_event("startup")
+async def start_health_probes():
+    """Probe the database, MCP server and reader in the background for the health endpoints."""
+    health_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_health_probes():
+    await health_monitor.stop()
+
+
+@app.on_event("shutdown")
+async def close_realtime_sidebands():
+    await sideband_manager.close_all()
+
+
+@app.on_event("shutdown")
+async def stop_protocol_uploads():
+    await upload_manager.stop()
+
+
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint with per-function, per-tool and per-robot latency histograms."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/health", tags=["Health"], status_code=status.HTTP_200_OK)
-def health():
-    """Return application & database health status."""
-    db_ok = health_check()
-    return {"app": "ok", "db": "ok" if db_ok else "error"}
+def health(response: Response):
+    """Return application & database health status from the background probe snapshot."""
+    summary = health_monitor.summary()
+    if summary["db"] == "error":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return summary
+
+
+@app.get("/api/health/full", tags=["Health"])
+def health_full():
+    """Every probed component (database, MCP server, reader, robots) with the age of its last check."""
+    return health_monitor.full()
+
+
+# ---------------------------------------------------------------------------
+# Robots – health, registry and discovery
+# ---------------------------------------------------------------------------
+
+
+@app.get("/api/robots/status", tags=["Health"])
+def robots_status(current_user: CurrentUser):
+    """Circuit breaker state and last-known health of every known robot."""
+    return robot_health.status()
+
+
+@app.get("/api/robots", tags=["Robots"])
+def list_robots(current_user: CurrentUser):
+    """Robots in the registry (discovered or remembered), with the last discovery sweep."""
+    return {"robots": robot_registry.list(), "last_scan": robot_discovery.last_scan}
+
+
+class DiscoveryIn(BaseModel):
+    cidrs: list[str] | None = None
+    ports: list[int] | None = None
+
+
+@app.post("/api/robots/discover", tags=["Robots"])
+async def discover_robots(current_user: CurrentUser, payload: DiscoveryIn | None = None):
+    """Sweep ``ROBOT_DISCOVERY_CIDRS`` (or the given ranges) now and return the registry."""
+    payload = payload or DiscoveryIn()
+    if not (payload.cidrs or robot_discovery.cidrs):
+        raise HTTPException(status_code=400, detail="No CIDR ranges configured (ROBOT_DISCOVERY_CIDRS)")
+    try:
+        return await robot_discovery.scan(payload.cidrs, payload.ports)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
 
 # ---------------------------------------------------------------------------
@@ -89,13 +231,14 @@ def read_me(current_user: CurrentUser):
 
 @app.post("/api/moves", response_model=MoveOut, status_code=status.HTTP_201_CREATED)
 def create_move_route(move_in: MoveCreate, user: CurrentUser, db: Session = Depends(get_db)):
-    move = create_move(db, user=user, **move_in.dict())
+    move = create_move(db, user=user, **move_in.model_dump())
     return move
 
 
-@app.get("/api/moves", response_model=list[MoveOut])
+# List routes return FastJSONResponse directly; response_model only documents them
+@app.get("/api/moves", response_model=list[MoveOut], response_class=FastJSONResponse)
 def list_moves(user: CurrentUser, db: Session = Depends(get_db)):
-    return get_moves(db, user)
+    return FastJSONResponse(get_move_rows(db, user))
 
 
 @app.post("/api/moves/{move_id}/tasks", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
@@ -103,16 +246,16 @@ def create_task_route(move_id: int, task_in: TaskCreate, user: CurrentUser, db:
     move: Move | None = db.query(Move).filter(Move.id == move_id, Move.user_id == user.id).first()
     if not move:
         raise HTTPException(status_code=404, detail="Move not found")
-    task = create_task(db, move, **task_in.dict())
+    task = create_task(db, move, **task_in.model_dump())
     return task
 
 
-@app.get("/api/moves/{move_id}/tasks", response_model=list[TaskOut])
+@app.get("/api/moves/{move_id}/tasks", response_model=list[TaskOut], response_class=FastJSONResponse)
 def list_tasks_route(move_id: int, user: CurrentUser, db: Session = Depends(get_db)):
     move: Move | None = db.query(Move).filter(Move.id == move_id, Move.user_id == user.id).first()
     if not move:
         raise HTTPException(status_code=404, detail="Move not found")
-    return get_tasks(db, move)
+    return FastJSONResponse(get_task_rows(db, move))
 
 
 # ---------------------------------------------------------------------------
@@ -136,12 +279,78 @@ async def create_realtime_session(payload: RealtimeSessionIn):
     """
 
     try:
-        data = await create_ephemeral_session(voice=payload.voice)
+        with span("realtime_session"):
+            data = await create_ephemeral_session(voice=payload.voice)
+        # Tells the browser to hand the call id to /api/realtime/sideband
+        # and leave function calls to the backend.
+        data["sideband"] = SIDEBAND_ENABLED
+        # Version of the per-tool functions in the session, None when only mcp_call is offered
+        data["tools_version"] = tool_catalog.version if REALTIME_TOOL_SCHEMAS else None
         return data
     except RuntimeError as exc:
         raise HTTPException(status_code=502, detail=str(exc))
 
 
+@app.get("/api/realtime/tools", tags=["Realtime"])
+def list_realtime_tools():
+    """The per-tool functions published to realtime sessions and their version hash."""
+    return tool_catalog.info()
+
+
+@app.post("/api/realtime/tools/reload", tags=["Realtime"])
+async def reload_realtime_tools(user: CurrentUser):
+    """Re-read the MCP tool list, e.g. after deploying new tools without a restart."""
+    try:
+        await asyncio.to_thread(tool_catalog.load)
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Could not read MCP tools: {exc}")
+    info = tool_catalog.info()
+    return {"version": info["version"], "count": info["count"], "loaded_at": info["loaded_at"]}
+
+
+class SidebandIn(BaseModel):
+    call_id: str
+
+
+@app.post("/api/realtime/sideband", tags=["Realtime"])
+async def attach_realtime_sideband(payload: SidebandIn):
+    """Open the backend's own control connection to a live realtime call.
+
+    From then on the backend receives the call's function-call events,
+    executes them and posts the results back itself; the browser only
+    carries audio.
+    """
+    if not SIDEBAND_ENABLED:
+        raise HTTPException(status_code=404, detail="Realtime sideband disabled")
+    try:
+        with span("realtime_sideband", call_id=payload.call_id):
+            session = await sideband_manager.attach(payload.call_id)
+    except SidebandError as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+    return session.snapshot()
+
+
+@app.get("/api/realtime/sideband", tags=["Realtime"])
+def list_realtime_sidebands():
+    return {"sidebands": sideband_manager.status()}
+
+
+@app.get("/api/realtime/sideband/{call_id}", tags=["Realtime"])
+def get_realtime_sideband(call_id: str):
+    """Status of one sideband; 404 once it has closed, so the browser takes function calls back."""
+    session = sideband_manager.get(call_id)
+    if session is None or not session.snapshot()["open"]:
+        raise HTTPException(status_code=404, detail="No sideband for this call")
+    return session.snapshot()
+
+
+@app.delete("/api/realtime/sideband/{call_id}", tags=["Realtime"])
+async def detach_realtime_sideband(call_id: str):
+    if not await sideband_manager.detach(call_id):
+        raise HTTPException(status_code=404, detail="No sideband for this call")
+    return {"call_id": call_id, "closed": True}
+
+
 # ---------------------------------------------------------------------------
 # Function-call dispatcher
 # ---------------------------------------------------------------------------
@@ -150,9 +359,10 @@ async def create_realtime_session(payload: RealtimeSessionIn):
 class FunctionCallIn(BaseModel):
     name: str
     arguments: dict
+    call_id: str | None = None
 
 
-@app.post("/api/realtime/function-call", tags=["Realtime"])
+@app.post("/api/realtime/function-call", tags=["Realtime"], response_class=FastJSONResponse)
 def realtime_function_call(
     data: FunctionCallIn,
     db: Session = Depends(get_db),
@@ -161,20 +371,276 @@ def realtime_function_call(
     # Log the function call for debugging
     
     try:
-        result = handle_function_call(data.name, data.arguments, db=db)
-        # Serialize model instances or return raw result
-        from .models import Move, Task
-        from .schemas import MoveOut, TaskOut
-
-        if isinstance(result, Move):
-            payload = MoveOut.from_orm(result).dict()
-        elif isinstance(result, Task):
-            payload = TaskOut.from_orm(result).dict()
-        else:
-            payload = result
-
-        return {"status": "ok", "result": payload}
+        with span("realtime_function_call", function=data.name):
+            result = handle_function_call(data.name, data.arguments, db=db, call_id=data.call_id)
+        return FastJSONResponse({"status": "ok", "result": result})
     except FunctionCallError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+class BatchFunctionCallIn(BaseModel):
+    call_id: str | None = None
+    name: str
+    arguments: dict = {}
+
+
+class BatchFunctionCallsIn(BaseModel):
+    calls: list[BatchFunctionCallIn]
+    timeout: float | None = None
+
+
+@app.post("/api/realtime/function-calls", tags=["Realtime"], response_class=FastJSONResponse)
+async def realtime_function_calls(data: BatchFunctionCallsIn):
+    """Execute all function calls of one model response and return every result together.
+
+    Independent read-only calls run concurrently; mutations of the same
+    robot keep their order.  Failures are reported per call.
+    """
+    with span("realtime_function_calls", count=len(data.calls)):
+        results = await handle_function_calls(
+            [call.model_dump() for call in data.calls],
+            session_factory=SessionLocal,
+            **({"timeout": data.timeout} if data.timeout else {}),
+        )
+    return FastJSONResponse({"status": "ok", "results": results})
+
+
+# ---------------------------------------------------------------------------
+# Background MCP jobs
+# ---------------------------------------------------------------------------
+
+
+class JobIn(BaseModel):
+    tool_name: str
+    arguments: dict = {}
+
+
+@app.post("/api/jobs", tags=["Jobs"], status_code=status.HTTP_202_ACCEPTED)
+def create_job(payload: JobIn):
+    """Start a long-running MCP tool call and return its job id immediately."""
+    job_id = job_manager.submit(payload.tool_name, payload.arguments)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/api/jobs/{job_id}", tags=["Jobs"])
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/cancel", tags=["Jobs"])
+def cancel_job(job_id: str):
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "cancelled": job_manager.cancel(job_id)}
+
+
+@app.get("/api/jobs/{job_id}/events", tags=["Jobs"])
+async def stream_job_events(job_id: str):
+    """Server-sent events with the job snapshot whenever it changes."""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            job = job_manager.get(job_id)
+            if job != last:
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+                last = job
+            if job["status"] not in {"queued", "running"}:
+                yield f"event: done\ndata: {json.dumps(job)}\n\n"
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ---------------------------------------------------------------------------
+# Run command monitor – one shared robot poll per run
+# ---------------------------------------------------------------------------
+
+
+@app.get("/api/runs/{run_id}/commands", tags=["Runs"])
+async def get_run_commands(run_id: str, since: int = 0):
+    """Return commands of *run_id* from the local index, starting at position *since*."""
+    try:
+        feed = await run_monitor.ensure(run_id)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if feed.polled_at is None and feed.last_error is not None:
+        # Never reached the robot: an empty command list would hide that
+        raise HTTPException(status_code=502, detail=feed.last_error)
+    return feed.snapshot(since)
+
+
+@app.get("/api/runs/{run_id}/commands/stream", tags=["Runs"])
+async def stream_run_commands(run_id: str, since: int = 0):
+    """Server-sent events: backlog from *since*, then every new/updated command."""
+    try:
+        feed, queue = await run_monitor.subscribe(run_id)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    async def events():
+        try:
+            backlog = feed.snapshot(since)
+            for offset, command in enumerate(backlog["commands"]):
+                yield f"event: command\ndata: {json.dumps({'seq': since + offset, 'command': command})}\n\n"
+            if feed.finished:
+                yield f"event: done\ndata: {json.dumps({'run_status': feed.run_status})}\n\n"
+                return
+            while True:
+                event = await queue.get()
+                if event.get("done"):
+                    yield f"event: done\ndata: {json.dumps(event)}\n\n"
+                    return
+                kind = "error" if "error" in event else "command"
+                yield f"event: {kind}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            run_monitor.unsubscribe(feed, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ---------------------------------------------------------------------------
+# Protocol uploads – streamed multipart, distributed to several robots
+# ---------------------------------------------------------------------------
+
+
+@app.post("/api/protocols/uploads", tags=["Protocols"], status_code=status.HTTP_202_ACCEPTED)
+async def upload_protocol(
+    current_user: CurrentUser,
+    files: list[UploadFile] = File(..., description="Protocol first, then CSV/labware attachments"),
+    robots: list[str] = Form(default=[]),
+):
+    """Validate the protocol and start uploading it to every robot in *robots*.
+
+    Defaults to ``EXTERNAL_API_BASE_URL``.  Poll ``GET /api/protocols/uploads/{id}``
+    or stream ``/events`` for per-robot progress.
+    """
+    robots = robots or ([os.environ["EXTERNAL_API_BASE_URL"]] if os.getenv("EXTERNAL_API_BASE_URL") else [])
+    directory = spool_dir()
+    spooled = []
+    for upload in files:
+        # Starlette already spooled large parts to a temp file; copy it over in chunks
+        chunks = iter(functools.partial(upload.file.read, UPLOAD_CHUNK_SIZE), b"")
+        spooled.append(await asyncio.to_thread(spool_file, directory, upload.filename or "protocol.py", chunks))
+    try:
+        distribution = await asyncio.to_thread(upload_manager.prepare, spooled, robots, directory)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    upload_manager.start(distribution)
+    return distribution.snapshot()
+
+
+@app.get("/api/protocols/uploads/{upload_id}", tags=["Protocols"])
+def get_protocol_upload(upload_id: str, current_user: CurrentUser):
+    upload = upload_manager.get(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@app.get("/api/protocols/uploads/{upload_id}/events", tags=["Protocols"])
+async def stream_protocol_upload(upload_id: str, current_user: CurrentUser):
+    """Server-sent events with the per-robot progress whenever it changes."""
+    if upload_manager.get(upload_id) is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    async def events():
+        last = None
+        while True:
+            upload = upload_manager.get(upload_id)
+            if upload != last:
+                yield f"event: progress\ndata: {json.dumps(upload)}\n\n"
+                last = upload
+            if upload["status"] == "running":
+                await asyncio.sleep(0.25)
+                continue
+            yield f"event: done\ndata: {json.dumps(upload)}\n\n"
+            return
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# ---------------------------------------------------------------------------
+# Function-call audit log
+# ---------------------------------------------------------------------------
+
+
+@app.get("/api/audit/calls", tags=["Audit"])
+def list_audited_calls(
+    current_user: CurrentUser,
+    limit: int = 50,
+    name: str | None = None,
+    tool_name: str | None = None,
+    robot: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+):
+    """Most recent function calls, newest first; records not yet written are marked pending."""
+    return {"calls": audit_log.recent(limit=min(limit, 1000), name=name, tool_name=tool_name,
+                                      robot=robot, status=status, since=since)}
+
+
+@app.get("/api/audit/stats", tags=["Audit"])
+def audit_stats(current_user: CurrentUser):
+    """Queue depth, written/dropped counts and last batch timing of the audit writer."""
+    return audit_log.stats()
+
+
+# ---------------------------------------------------------------------------
+# On-demand profiling of routes and MCP tools
+# ---------------------------------------------------------------------------
+
+
+class ProfileArmIn(BaseModel):
+    target: str  # "tool:<name>" or "route:<METHODS> <path>"
+    calls: int = 1
+    mode: str = "cprofile"  # or "sampling"
+    interval_ms: float | None = None  # sampling interval
+
+
+def _require_profiling() -> None:
+    if not PROFILING_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Profiling is not available (MCP server tree not found)")
+
+
+@app.get("/api/admin/profiles", tags=["Admin"])
+def list_profile_files(current_user: CurrentUser):
+    """Written profiles (newest first), armed targets and the route targets that can be armed."""
+    _require_profiling()
+    routes = sorted(route_target(r.path, r.methods) for r in app.routes if isinstance(r, ProfiledRoute))
+    return {"armed": profiling.armed(), "profiles": profiling.list_profiles(), "route_targets": routes}
+
+
+@app.post("/api/admin/profiles/arm", tags=["Admin"], status_code=status.HTTP_201_CREATED)
+def arm_profile(payload: ProfileArmIn, current_user: CurrentUser):
+    """Profile the next *calls* invocations of a tool or route."""
+    _require_profiling()
+    if not payload.target.startswith(("tool:", "route:")):
+        raise HTTPException(status_code=422, detail="target must start with 'tool:' or 'route:'")
+    kwargs = {"interval": payload.interval_ms / 1000} if payload.interval_ms else {}
+    try:
+        return profiling.arm(payload.target, payload.calls, payload.mode, **kwargs)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@app.delete("/api/admin/profiles/arm", tags=["Admin"])
+def disarm_profile(target: str, current_user: CurrentUser):
+    _require_profiling()
+    return {"target": target, "disarmed": profiling.disarm(target)}
+
+
+@app.get("/api/admin/profiles/{name}", tags=["Admin"])
+def download_profile(name: str, current_user: CurrentUser):
+    _require_profiling()
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
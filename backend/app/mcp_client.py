@@ -1,43 +1,258 @@
-import subprocess
 import json
-from typing import Dict, Any, Optional
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # optional speed-up
+    _loads = json.loads
+
+from .tracing import MCP_TOOL_SECONDS, current_traceparent, span
+
+# Protocol version we announce during the MCP initialize handshake.
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+
+class MCPServerExited(RuntimeError):
+    """The MCP server closed stdout before answering; the message is its stderr."""
+
 
 class MCPClient:
-    def __init__(self, server_path: str = "opentrons_mcp.py"):
-        self.server_path = server_path
-    
-    def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> str:
+    def __init__(self, server_path: Optional[str] = None, timeout: float = 30.0,
+                 env: Optional[Dict[str, str]] = None):
+        self.server_path = server_path or os.getenv("MCP_SERVER_PATH", "opentrons_mcp.py")
+        self.timeout = timeout
+        # Extra environment for the server process, e.g. OPENTRONS_ROBOT_HOST of the target robot
+        self.env = env or {}
+
+    def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Union[str, Dict[str, Any]]:
         """Call an MCP tool and return the result"""
         try:
-            # Prepare the MCP call
-            mcp_input = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments or {}
-                }
-            }
-            
-            # Execute MCP server
-            process = subprocess.run(
-                ["python", self.server_path],
-                input=json.dumps(mcp_input),
-                capture_output=True,
-                text=True,
-                timeout=30
+            return self.call_tool_streaming(tool_name, arguments)
+        except Exception as e:
+            return f"Error calling MCP tool: {str(e)}"
+
+    def call_tool_streaming(
+        self,
+        tool_name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+        on_start: Optional[Callable[[subprocess.Popen], None]] = None,
+        on_progress: Optional[Callable[[float, Optional[float]], None]] = None,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        """Call an MCP tool over a stdio session, forwarding notifications as they arrive.
+
+        ``on_progress`` receives ``notifications/progress`` updates and
+        ``on_message`` the ``data`` field of ``notifications/message`` log
+        events.  ``on_start`` is handed the server process so callers can
+        terminate it (cancellation).  Raises ``TimeoutError`` when the call
+        does not finish within ``timeout`` seconds.
+        """
+        with span("mcp.call_tool", tool=tool_name):
+            return self._call_tool_streaming(
+                tool_name, arguments, timeout=timeout, on_start=on_start, on_progress=on_progress, on_message=on_message
             )
-            
-            if process.returncode != 0:
-                return f"MCP Error: {process.stderr}"
-            
-            # Parse response
-            response = json.loads(process.stdout)
+
+    def _call_tool_streaming(self, tool_name, arguments, *, timeout, on_start, on_progress, on_message):
+        try:
+            with self._start_session(timeout, tool=tool_name, on_start=on_start) as process:
+                initialized = time.perf_counter()
+                self._send(process, {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "tools/call",
+                    "params": {
+                        "name": tool_name,
+                        "arguments": arguments or {},
+                        "_meta": {"progressToken": 1},
+                    },
+                })
+                with span("mcp.execute", tool=tool_name):
+                    response = self._read_response(process, 1, on_progress=on_progress, on_message=on_message)
+                MCP_TOOL_SECONDS.observe(time.perf_counter() - initialized, tool=tool_name, phase="execute")
+        except MCPServerExited as exc:
+            return f"MCP Error: {exc}"
+
+        if "error" in response:
+            return f"Tool Error: {response['error']}"
+
+        return self._extract_result(response.get("result", {}).get("content") or [{}])
+
+    def ping(self, timeout: Optional[float] = None) -> float:
+        """Start a server, complete the initialize handshake and a ``ping``; return the seconds it took.
+
+        Raises on failure (server does not start, times out or answers with an error).
+        """
+        started = time.perf_counter()
+        with self._start_session(timeout) as process:
+            self._send(process, {"jsonrpc": "2.0", "id": 1, "method": "ping"})
+            response = self._read_response(process, 1)
             if "error" in response:
-                return f"Tool Error: {response['error']}"
-            
-            return response.get("result", {}).get("content", [{}])[0].get("text", "No result")
-            
-        except Exception as e:
-            return f"Error calling MCP tool: {str(e)}"
\ No newline at end of file
+                raise RuntimeError(f"MCP ping failed: {response['error']}")
+            return time.perf_counter() - started
+
+    def list_tools(self, timeout: Optional[float] = None) -> list[Dict[str, Any]]:
+        """Return the server's ``tools/list`` entries (``name``, ``description``, ``inputSchema``)."""
+        tools: list[Dict[str, Any]] = []
+        with self._start_session(timeout) as process:
+            cursor = None
+            for request_id in range(1, 1000):
+                self._send(process, {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": "tools/list",
+                    "params": {"cursor": cursor} if cursor else {},
+                })
+                response = self._read_response(process, request_id)
+                if "error" in response:
+                    raise RuntimeError(f"MCP tools/list failed: {response['error']}")
+                tools.extend(response["result"].get("tools") or [])
+                cursor = response["result"].get("nextCursor")
+                if not cursor:
+                    break
+        return tools
+
+    @staticmethod
+    def _extract_result(content: list) -> Union[str, Dict[str, Any]]:
+        """Plain tools return one text item; shaped tools return ``[summary, json]``.
+
+        For the latter the structured part is decoded so it travels on as
+        data instead of a string-within-a-string.
+        """
+        summary = content[0].get("text", "No result")
+        if len(content) < 2:
+            return summary
+        try:
+            structured = _loads(content[1].get("text", ""))
+        except ValueError:
+            return summary
+        return {"summary": summary, **structured}
+
+    # ------------------------------------------------------------------
+    # Server sessions
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _start_session(
+        self,
+        timeout: Optional[float] = None,
+        *,
+        tool: Optional[str] = None,
+        on_start: Optional[Callable[[subprocess.Popen], None]] = None,
+    ) -> Iterator[subprocess.Popen]:
+        """Spawn the server, complete the initialize handshake and yield the process.
+
+        The process is killed after ``timeout`` seconds.  When it closes
+        stdout early the block raises ``TimeoutError`` if it was killed, else
+        :class:`MCPServerExited` with its stderr.  *tool* labels the spawn
+        span and metric.
+        """
+        timeout = timeout or self.timeout
+        # The server process continues our trace: TRACEPARENT tells it which
+        # span to parent its tool and robot spans under.
+        env = {**os.environ, **self.env}
+        traceparent = current_traceparent()
+        if traceparent:
+            env["TRACEPARENT"] = traceparent
+
+        # stderr goes to a temp file so chatty server logging can never fill
+        # the pipe and stall a long-running tool.
+        with tempfile.TemporaryFile(mode="w+") as stderr_file:
+            started = time.perf_counter()
+            process = subprocess.Popen(
+                [sys.executable, self.server_path],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                bufsize=1,
+                env=env,
+            )
+            if on_start is not None:
+                on_start(process)
+
+            timed_out = threading.Event()
+
+            def _kill() -> None:
+                timed_out.set()
+                process.kill()
+
+            timer = threading.Timer(timeout, _kill)
+            timer.daemon = True
+            timer.start()
+            try:
+                self._send(process, {
+                    "jsonrpc": "2.0",
+                    "id": 0,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": MCP_PROTOCOL_VERSION,
+                        "capabilities": {},
+                        "clientInfo": {"name": "pippin-backend", "version": "0.1.0"},
+                    },
+                })
+                with span("mcp.spawn", tool=tool):
+                    self._read_response(process, 0)
+                if tool is not None:
+                    MCP_TOOL_SECONDS.observe(time.perf_counter() - started, tool=tool, phase="spawn")
+                self._send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+                yield process
+            except EOFError:
+                if timed_out.is_set():
+                    what = f"tool {tool!r}" if tool else "server"
+                    raise TimeoutError(f"MCP {what} timed out after {timeout}s")
+                stderr_file.seek(0)
+                raise MCPServerExited(stderr_file.read())
+            finally:
+                timer.cancel()
+                if process.stdin and not process.stdin.closed:
+                    process.stdin.close()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    # ------------------------------------------------------------------
+    # stdio framing helpers – MCP uses newline-delimited JSON-RPC messages
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _send(process: subprocess.Popen, message: Dict[str, Any]) -> None:
+        process.stdin.write(json.dumps(message) + "\n")
+        process.stdin.flush()
+
+    @staticmethod
+    def _read_response(
+        process: subprocess.Popen,
+        request_id: int,
+        *,
+        on_progress: Optional[Callable[[float, Optional[float]], None]] = None,
+        on_message: Optional[Callable[[Any], None]] = None,
+    ) -> Dict[str, Any]:
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == request_id and "method" not in message:
+                return message
+            method = message.get("method")
+            params = message.get("params") or {}
+            if method == "notifications/progress" and on_progress is not None:
+                on_progress(params.get("progress", 0), params.get("total"))
+            elif method == "notifications/message" and on_message is not None:
+                on_message(params.get("data"))
+        raise EOFError("MCP server closed stdout before responding")
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -48,3 +48,76 @@ class Task(Base):
     created_at: datetime = Column(DateTime, default=datetime.utcnow)
 
     move = relationship("Move", back_populates="tasks")
+
+
+class Job(Base):
+    """A long-running MCP tool call executed in the background (see jobs.py)."""
+
+    __tablename__ = "jobs"
+
+    id: str = Column(String(36), primary_key=True)
+    tool_name: str = Column(String(128), nullable=False)
+    arguments: dict = Column(JSON, nullable=False, default=dict)
+    # Extra environment for the worker's MCP server, e.g. OPENTRONS_ROBOT_HOST of the target robot
+    env: Optional[dict] = Column(JSON)
+    status: str = Column(String(32), default="queued", index=True)
+    progress: float = Column(Float, default=0.0)
+    total: Optional[float] = Column(Float)
+    partial_results: Optional[list] = Column(JSON)
+    result: Optional[str] = Column(Text)
+    error: Optional[str] = Column(Text)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow)
+    updated_at: datetime = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class FunctionCallResult(Base):
+    """Mirror of idempotency records for realtime function calls (see idempotency.py)."""
+
+    __tablename__ = "function_call_results"
+
+    key: str = Column(String(192), primary_key=True)
+    call_id: str = Column(String(128), nullable=False)
+    name: str = Column(String(128), nullable=False)
+    result: Optional[dict] = Column(JSON)
+    created_at: datetime = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class FunctionCallAudit(Base):
+    """Audit record of one dispatched function call, written behind by audit.py.
+
+    On PostgreSQL the table is range-partitioned by month on ``created_at``;
+    audit.py creates each month's partition before writing to it.
+    """
+
+    __tablename__ = "function_call_audit"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    id: str = Column(String(32), primary_key=True)
+    # Part of the key because PostgreSQL requires the partition column in it
+    created_at: datetime = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
+    call_id: Optional[str] = Column(String(128))
+    name: str = Column(String(128), nullable=False, index=True)
+    tool_name: Optional[str] = Column(String(128))
+    arguments: Optional[dict] = Column(JSON)
+    robot: Optional[str] = Column(String(256))
+    status: str = Column(String(16), nullable=False)
+    latency_ms: float = Column(Float, nullable=False)
+    result_bytes: Optional[int] = Column(Integer)
+    error: Optional[str] = Column(Text)
+
+
+class Robot(Base):
+    """A robot found by discovery.py, keyed by serial so it survives IP changes."""
+
+    __tablename__ = "robots"
+
+    serial: str = Column(String(64), primary_key=True)
+    name: Optional[str] = Column(String(128), index=True)
+    model: Optional[str] = Column(String(64))
+    host: str = Column(String(256), nullable=False)  # host:port
+    previous_host: Optional[str] = Column(String(256))
+    api_version: Optional[str] = Column(String(32))
+    health: Optional[dict] = Column(JSON)
+    reachable: bool = Column(Boolean, default=True)
+    first_seen_at: datetime = Column(DateTime, default=datetime.utcnow)
+    last_seen_at: datetime = Column(DateTime, default=datetime.utcnow)
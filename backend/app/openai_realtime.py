@@ -12,12 +12,17 @@ stay agnostic of the OpenAI HTTP contract.
 from __future__ import annotations
 
 import os
+import time
 from pathlib import Path
 from typing import Any, Optional
 
 import httpx
 from typing import Any, Optional, Dict, List
 
+from .tool_schemas import REALTIME_TOOL_SCHEMAS, tool_catalog
+from .tracing import OPENAI_SESSION_SECONDS, span
+from .traffic import httpx_async_transport
+
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -68,7 +73,7 @@ _CACHED_INSTRUCTIONS: Optional[str] = _load_instructions()
 TOOLS: List[Dict[str, Any]] = [
     {
         "name": "mcp_call",
-        "description": "Execute an OpenTrons operation via MCP server. Can handle both simple API calls and complex workflows like protocol optimization.",
+        "description": "Execute an OpenTrons operation via MCP server by tool name. Prefer a tool's own function when one is listed; use this for anything else. Can handle both simple API calls and complex workflows like protocol optimization.",
         "type": "function",
         "parameters": {
             "type": "object",
@@ -81,14 +86,51 @@ TOOLS: List[Dict[str, Any]] = [
                     "type": "object",
                     "description": "Arguments to pass to the MCP tool",
                     "nullable": True
+                },
+                "robot": {
+                    "type": "string",
+                    "description": "Name or serial of a discovered robot to target (default: the configured robot)",
+                    "nullable": True
                 }
             },
             "required": ["tool_name"]
         }
+    },
+    {
+        "name": "get_job_status",
+        "description": "Check progress and partial results of a background MCP job started by mcp_call (long tools return a job_id instead of a result).",
+        "type": "function",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id returned by mcp_call"}
+            },
+            "required": ["job_id"]
+        }
+    },
+    {
+        "name": "cancel_job",
+        "description": "Cancel a running background MCP job.",
+        "type": "function",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job id returned by mcp_call"}
+            },
+            "required": ["job_id"]
+        }
     }
 ]
 
 
+
+def session_tools() -> List[Dict[str, Any]]:
+    """Functions offered to the model: one per MCP tool (once loaded), then the generic ones."""
+    if not REALTIME_TOOL_SCHEMAS:
+        return TOOLS
+    return tool_catalog.functions + TOOLS
+
+
 # ---------------------------------------------------------------------------
 # Public helpers
 # ---------------------------------------------------------------------------
@@ -135,7 +177,7 @@ async def create_ephemeral_session(*, voice: str | None = None, model: str | Non
     payload: Dict[str, Any] = {
         "model": model or OPENAI_MODEL,
         # Include available tools for function calling
-        "tools": TOOLS,
+        "tools": session_tools(),
         "tool_choice": "auto",
         # Allow both audio and text responses
         "modalities": ["audio", "text"],
@@ -152,8 +194,11 @@ async def create_ephemeral_session(*, voice: str | None = None, model: str | Non
         "Content-Type": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(url, json=payload, headers=headers)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30.0, transport=httpx_async_transport("openai")) as client:
+        with span("openai.session_mint", model=payload["model"]):
+            resp = await client.post(url, json=payload, headers=headers)
+        OPENAI_SESSION_SECONDS.observe(time.perf_counter() - started)
         try:
             resp.raise_for_status()
         except httpx.HTTPStatusError as exc:  # pragma: no cover
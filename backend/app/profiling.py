@@ -0,0 +1,36 @@
+"""On-demand profiling of backend routes.
+
+The implementation is :mod:`opentrons_agent.profiling`, shared with the MCP
+server so one admin endpoint arms and collects profiles of routes and tools
+alike.  :class:`ProfiledRoute` wraps every route's endpoint as
+``route:<METHODS> <path>``; without the MCP server tree routes run unwrapped
+and the admin endpoints answer 503.
+"""
+
+from __future__ import annotations
+
+from fastapi.routing import APIRoute
+
+from . import cache  # noqa: F401  (puts the MCP server tree on sys.path)
+
+try:
+    from opentrons_agent.profiling import MODES, arm, armed, disarm, list_profiles, profile_path, profiled
+
+    PROFILING_AVAILABLE = True
+except ImportError:  # MCP server tree not available
+    PROFILING_AVAILABLE = False
+    MODES = {}
+
+    def profiled(target: str):
+        return lambda fn: fn
+
+
+def route_target(path: str, methods) -> str:
+    return f"route:{','.join(sorted(methods or ['GET']))} {path}"
+
+
+class ProfiledRoute(APIRoute):
+    """Route class whose endpoint can be profiled on demand."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, profiled(route_target(path, kwargs.get("methods")))(endpoint), **kwargs)
@@ -0,0 +1,359 @@
+"""Streaming protocol upload and parallel distribution across robots.
+
+``POST /protocols`` on a Flex takes ``multipart/form-data`` with one or more
+``files`` parts: the protocol plus any CSV or custom labware it needs.  This
+module sends those bodies without holding them in memory and pushes one
+upload to several robots at once:
+
+* files are spooled to ``PROTOCOL_UPLOAD_DIR`` in ``UPLOAD_CHUNK_SIZE`` pieces
+  (hashing as they are written) and streamed from disk by httpx, one file
+  handle per robot,
+* the Python syntax of the protocol is checked once per SHA-256 content hash;
+  verdicts are kept in memory and in the cross-process cache, so re-sending
+  the same protocol (or sending it from another worker) is not parsed again,
+* every robot gets its own task, bounded by ``UPLOAD_CONCURRENCY``, with
+  progress (bytes sent, attempt, status) and up to ``UPLOAD_RETRIES`` attempts
+  on connection errors and 5xx/429 answers, backing off exponentially.
+  Robots whose circuit is open (see :mod:`app.circuit_breaker`) fail at once.
+
+Distributions started through :meth:`UploadManager.submit` (or ``prepare``
+then ``start``) run in the background and are polled with
+:meth:`UploadManager.get`; the dispatcher uses the blocking
+:meth:`UploadManager.upload`.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Optional
+
+import httpx
+
+from .cache import shared_cache
+from .circuit_breaker import (
+    ROBOT_HEADERS,
+    ROBOT_REQUEST_TIMEOUT,
+    RobotUnavailable,
+    describe_error,
+    robot_health,
+    robot_key,
+)
+from .tracing import ROBOT_REQUEST_SECONDS, span
+from .traffic import httpx_async_transport
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROTOCOL_UPLOAD_DIR = Path(os.getenv("PROTOCOL_UPLOAD_DIR", Path(tempfile.gettempdir()) / "pippin-uploads"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", 8))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", 3))  # attempts per robot
+UPLOAD_RETRY_BACKOFF = float(os.getenv("UPLOAD_RETRY_BACKOFF", 0.5))  # seconds, doubled per attempt
+# Sending a large body may take longer than an ordinary robot request
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", 120.0))
+UPLOAD_HISTORY = 100  # finished distributions kept for polling
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+ACTIVE_STATUSES = {"queued", "uploading", "retrying"}
+
+CONTENT_TYPES = {".py": "text/x-python", ".csv": "text/csv", ".json": "application/json"}
+
+
+class ProtocolSyntaxError(ValueError):
+    """The protocol file is not valid Python; nothing was uploaded."""
+
+
+class ProtocolFile:
+    """One spooled file of an upload."""
+
+    __slots__ = ("path", "filename", "size", "sha256")
+
+    def __init__(self, path: Path, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES.get(Path(self.filename).suffix.lower(), "application/octet-stream")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"filename": self.filename, "bytes": self.size, "sha256": self.sha256}
+
+
+# ---------------------------------------------------------------------------
+# Spooling and validation
+# ---------------------------------------------------------------------------
+
+
+def spool_dir() -> Path:
+    """A fresh directory for one upload's files."""
+    directory = PROTOCOL_UPLOAD_DIR / uuid.uuid4().hex
+    directory.mkdir(parents=True)
+    return directory
+
+
+def spool_file(directory: Path, filename: str, chunks: Iterable[bytes]) -> ProtocolFile:
+    """Write *chunks* to ``directory/filename`` and hash them on the way."""
+    name = Path(filename).name or "protocol.py"
+    path = directory / name
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as fh:
+        for chunk in chunks:
+            digest.update(chunk)
+            fh.write(chunk)
+            size += len(chunk)
+    return ProtocolFile(path, name, size, digest.hexdigest())
+
+
+def spool_text(directory: Path, filename: str, text: str) -> ProtocolFile:
+    data = text.encode()
+    chunks = (data[i:i + UPLOAD_CHUNK_SIZE] for i in range(0, len(data), UPLOAD_CHUNK_SIZE))
+    return spool_file(directory, filename, chunks)
+
+
+_syntax_verdicts: dict[str, Optional[str]] = {}
+_syntax_lock = threading.Lock()
+_syntax_cache = shared_cache("protocol_syntax", ttl=7 * 24 * 3600)
+_SYNTAX_OK = "ok"
+
+
+def _check_syntax(file: ProtocolFile) -> Optional[str]:
+    try:
+        ast.parse(file.path.read_bytes(), filename=file.filename)
+    except SyntaxError as exc:
+        return f"{file.filename} line {exc.lineno}: {exc.msg}"
+    return None
+
+
+def validate_protocol(file: ProtocolFile) -> None:
+    """Raise :class:`ProtocolSyntaxError` if *file* does not parse; parsed once per content hash."""
+    if Path(file.filename).suffix.lower() != ".py":
+        return
+    with _syntax_lock:
+        known = file.sha256 in _syntax_verdicts
+        error = _syntax_verdicts.get(file.sha256)
+    if not known:
+        with span("protocol.validate", sha256=file.sha256[:12], bytes=file.size):
+            if _syntax_cache is not None:
+                verdict = _syntax_cache.get_or_compute(file.sha256, lambda: _check_syntax(file) or _SYNTAX_OK)
+                error = None if verdict == _SYNTAX_OK else verdict
+            else:
+                error = _check_syntax(file)
+        with _syntax_lock:
+            _syntax_verdicts[file.sha256] = error
+    if error:
+        raise ProtocolSyntaxError(f"Protocol has a syntax error: {error}")
+
+
+# ---------------------------------------------------------------------------
+# Distribution
+# ---------------------------------------------------------------------------
+
+
+class _ProgressReader:
+    """File wrapper that counts the bytes httpx reads from it."""
+
+    def __init__(self, fh: BinaryIO, progress: dict[str, Any]):
+        self._fh = fh
+        self._progress = progress
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._fh.read(size)
+        self._progress["bytes_sent"] += len(chunk)
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._fh.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._fh.tell()
+
+    def fileno(self) -> int:
+        return self._fh.fileno()
+
+
+class Distribution:
+    """One set of files going to one or more robots."""
+
+    def __init__(self, files: list[ProtocolFile], robots: list[str], directory: Optional[Path] = None):
+        self.id = str(uuid.uuid4())
+        self.files = files
+        self.directory = directory
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        total = sum(f.size for f in files)
+        self.robots = {
+            robot: {"robot": robot, "status": "queued", "attempts": 0, "bytes_sent": 0, "total_bytes": total,
+                    "protocol_id": None, "error": None, "elapsed_ms": None}
+            for robot in dict.fromkeys(robot_key(r) for r in robots)
+        }
+
+    @property
+    def status(self) -> str:
+        states = [p["status"] for p in self.robots.values()]
+        if any(s in ACTIVE_STATUSES for s in states):
+            return "running"
+        if all(s == "done" for s in states):
+            return "done"
+        return "failed" if all(s == "failed" for s in states) else "partial"
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "upload_id": self.id, "status": self.status, "files": [f.as_dict() for f in self.files],
+            "created_at": self.created_at, "finished_at": self.finished_at,
+            "robots": [dict(p) for p in self.robots.values()],
+        }
+
+
+class UploadManager:
+    """Validates, distributes and tracks protocol uploads."""
+
+    def __init__(self, concurrency: int = UPLOAD_CONCURRENCY, retries: int = UPLOAD_RETRIES,
+                 backoff: float = UPLOAD_RETRY_BACKOFF):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._distributions: dict[str, Distribution] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def prepare(self, files: list[ProtocolFile], robots: list[str], directory: Optional[Path] = None) -> Distribution:
+        """Validate *files* (the first is the protocol) and register a distribution.
+
+        On a validation error the spool *directory* is removed.
+        """
+        try:
+            if not files:
+                raise ValueError("No files to upload")
+            if not robots:
+                raise ValueError("No target robots")
+            validate_protocol(files[0])
+        except ValueError:
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+            raise
+        distribution = Distribution(files, robots, directory)
+        with self._lock:
+            self._distributions[distribution.id] = distribution
+            finished = [d for d in self._distributions.values() if d.finished_at is not None]
+            for old in sorted(finished, key=lambda d: d.finished_at)[:max(0, len(finished) - UPLOAD_HISTORY)]:
+                del self._distributions[old.id]
+        return distribution
+
+    def start(self, distribution: Distribution) -> None:
+        """Distribute a prepared upload in the background on the running event loop."""
+        task = asyncio.get_running_loop().create_task(self.distribute(distribution))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def submit(self, files: list[ProtocolFile], robots: list[str], directory: Optional[Path] = None) -> Distribution:
+        distribution = self.prepare(files, robots, directory)
+        self.start(distribution)
+        return distribution
+
+    def upload(self, files: list[ProtocolFile], robots: list[str], directory: Optional[Path] = None) -> dict[str, Any]:
+        """Blocking variant for worker threads: distribute and return the final snapshot."""
+        distribution = self.prepare(files, robots, directory)
+        asyncio.run(self.distribute(distribution))
+        return distribution.snapshot()
+
+    def get(self, upload_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            distribution = self._distributions.get(upload_id)
+        return distribution.snapshot() if distribution else None
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Transfer
+    # ------------------------------------------------------------------
+
+    async def distribute(self, distribution: Distribution) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = httpx.Timeout(UPLOAD_TIMEOUT, connect=ROBOT_REQUEST_TIMEOUT)
+        try:
+            async with httpx.AsyncClient(headers=ROBOT_HEADERS, timeout=timeout,
+                                         transport=httpx_async_transport("robot")) as client:
+                await asyncio.gather(*(self._upload_to(client, semaphore, distribution, robot)
+                                       for robot in distribution.robots))
+        finally:
+            distribution.finished_at = time.time()
+            if distribution.directory is not None:
+                shutil.rmtree(distribution.directory, ignore_errors=True)
+
+    async def _upload_to(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                         distribution: Distribution, robot: str) -> None:
+        progress = distribution.robots[robot]
+        started = time.perf_counter()
+        async with semaphore:
+            for attempt in range(1, self.retries + 1):
+                progress.update(status="uploading" if attempt == 1 else "retrying", attempts=attempt, bytes_sent=0)
+                try:
+                    breaker = robot_health.guard(robot)
+                except RobotUnavailable as exc:
+                    progress.update(status="failed", error=str(exc))
+                    break
+                retry, error = await self._attempt(client, breaker.robot, distribution.files, progress)
+                if error is None:
+                    progress.update(status="done", error=None)
+                    break
+                progress["error"] = error
+                if not retry or attempt == self.retries:
+                    progress["status"] = "failed"
+                    break
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+        progress["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _attempt(self, client: httpx.AsyncClient, robot: str, files: list[ProtocolFile],
+                       progress: dict[str, Any]) -> tuple[bool, Optional[str]]:
+        """One multipart POST; returns ``(retryable, error)`` with error None on success."""
+        handles = [open(f.path, "rb") for f in files]
+        started = time.perf_counter()
+        status_label = "error"
+        try:
+            parts = [("files", (f.filename, _ProgressReader(fh, progress), f.content_type))
+                     for f, fh in zip(files, handles)]
+            with span("robot.upload", robot=robot, files=len(files), bytes=progress["total_bytes"]):
+                try:
+                    resp = await client.post(f"{robot}/protocols", files=parts)
+                except httpx.TransportError as exc:
+                    robot_health.record(robot, ok=False, error=describe_error(exc))
+                    return True, describe_error(exc)
+            status_label = str(resp.status_code)
+            robot_health.record(robot, ok=resp.status_code < 500, error=f"HTTP {resp.status_code}")
+            if resp.status_code >= 400:
+                return resp.status_code in RETRY_STATUSES, f"HTTP {resp.status_code}: {resp.text[:200]}"
+            try:
+                progress["protocol_id"] = (resp.json().get("data") or {}).get("id")
+            except (ValueError, AttributeError):
+                pass
+            return False, None
+        finally:
+            for fh in handles:
+                fh.close()
+            ROBOT_REQUEST_SECONDS.observe(time.perf_counter() - started, robot=httpx.URL(robot).host, method="POST",
+                                          status=status_label)
+
+
+upload_manager = UploadManager()
@@ -0,0 +1,215 @@
+"""Server-side control connection ("sideband") for realtime voice sessions.
+
+Without it every function call takes the long way round: model -> browser
+data channel -> ``POST /api/realtime/function-call`` -> backend -> browser ->
+``conversation.item.create`` -> model.  With a sideband the backend opens
+its own WebSocket to the same realtime call::
+
+    wss://api.openai.com/v1/realtime?call_id=<rtc call id>
+
+receives the model's events directly, executes the function calls of each
+response with :func:`~app.llm_dispatcher.handle_function_calls` (read-only
+calls concurrently, mutations in order) and posts ``function_call_output``
+items plus a ``response.create`` back on the same socket.  The browser only
+carries audio.
+
+The call id is known once the browser has finished the WebRTC SDP exchange
+(the ``Location`` header of the answer), so the browser hands it to
+``POST /api/realtime/sideband`` right after connecting.  Point
+``OPENAI_REALTIME_WS_URL`` at ``app.fake_realtime`` to run against a local
+stand-in.  Every flushed call gets an output (an error one if execution
+failed), so the model is never left waiting; the browser polls
+``GET /api/realtime/sideband/{call_id}`` and goes back to executing calls
+itself once the sideband is gone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Optional
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed
+
+from .database import SessionLocal
+from .llm_dispatcher import handle_function_calls
+from .openai_realtime import OPENAI_API_KEY
+from .tracing import FUNCTION_CALL_SECONDS, span
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+OPENAI_REALTIME_WS_URL = os.getenv("OPENAI_REALTIME_WS_URL", "wss://api.openai.com/v1/realtime")
+SIDEBAND_ENABLED = os.getenv("REALTIME_SIDEBAND", "1") in {"1", "true", "yes"}
+SIDEBAND_CONNECT_TIMEOUT = float(os.getenv("REALTIME_SIDEBAND_CONNECT_TIMEOUT", 10.0))
+
+FUNCTION_CALL_EVENTS = {"response.function_call_arguments.done", "function_call"}
+
+
+class SidebandError(Exception):
+    """Raised when a sideband connection cannot be established."""
+
+
+class SidebandSession:
+    """One control connection: collects a response's function calls and answers them."""
+
+    def __init__(self, call_id: str, websocket: ClientConnection):
+        self.call_id = call_id
+        self.websocket = websocket
+        self.pending: list[dict[str, Any]] = []
+        self.connected_at = time.time()
+        self.calls_executed = 0
+        self.last_error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def send(self, event: dict[str, Any]) -> None:
+        await self.websocket.send(json.dumps(event, default=str))
+
+    async def run(self) -> None:
+        try:
+            async for message in self.websocket:
+                try:
+                    event = json.loads(message)
+                except ValueError:
+                    continue
+                try:
+                    await self.handle(event)
+                except ConnectionClosed:
+                    raise
+                except Exception as exc:
+                    # One bad event must not end the session
+                    print(f"Sideband {self.call_id} event {event.get('type')!r} failed: {exc}")
+                    self.last_error = str(exc)
+        except ConnectionClosed:
+            pass
+
+    async def handle(self, event: dict[str, Any]) -> None:
+        kind = event.get("type")
+        if kind in FUNCTION_CALL_EVENTS and event.get("name"):
+            self.pending.append(event)
+            # Legacy single events have no response.done marker
+            if kind == "function_call":
+                await self.flush()
+        elif kind == "response.done":
+            await self.flush()
+        elif kind == "error":
+            self.last_error = (event.get("error") or {}).get("message") or json.dumps(event)
+
+    async def flush(self) -> None:
+        """Execute the collected calls together and hand every result back to the model."""
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        calls, outputs = [], {}
+        for event in events:
+            arguments = event.get("arguments") or {}
+            if isinstance(arguments, str):
+                try:
+                    arguments = json.loads(arguments) if arguments else {}
+                except ValueError:
+                    outputs[event.get("call_id")] = {"status": "error", "error": "Invalid function arguments JSON"}
+                    continue
+            calls.append({"call_id": event.get("call_id"), "name": event["name"], "arguments": arguments})
+
+        started = time.perf_counter()
+        outcome = "ok"
+        with span("realtime_sideband.calls", call_id=self.call_id, count=len(calls)):
+            if calls:
+                try:
+                    entries = await handle_function_calls(calls, session_factory=SessionLocal)
+                except Exception as exc:
+                    outcome = "error"
+                    self.last_error = f"Function calls failed: {exc}"
+                    entries = [{"call_id": call["call_id"], "status": "error", "error": str(exc) or type(exc).__name__}
+                               for call in calls]
+                for entry in entries:
+                    outputs[entry["call_id"]] = entry
+        FUNCTION_CALL_SECONDS.observe(time.perf_counter() - started, function="sideband_batch", status=outcome)
+        self.calls_executed += len(calls)
+
+        for event in events:
+            entry = outputs.get(event.get("call_id")) or {"status": "error", "error": "No result"}
+            output = entry.get("result") if entry.get("status") == "ok" else {"error": entry.get("error")}
+            await self.send({
+                "type": "conversation.item.create",
+                "item": {"type": "function_call_output", "call_id": event.get("call_id"),
+                         "output": json.dumps(output, default=str)},
+            })
+        await self.send({"type": "response.create"})
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "connected_at": self.connected_at,
+            "open": self.task is not None and not self.task.done(),
+            "calls_executed": self.calls_executed,
+            "last_error": self.last_error,
+        }
+
+
+class SidebandManager:
+    """Owns the sideband connection (and its reader task) of every live call."""
+
+    def __init__(self, url: Optional[str] = None):
+        self._url = url
+        self._sessions: dict[str, SidebandSession] = {}
+
+    @property
+    def url(self) -> str:
+        return self._url or OPENAI_REALTIME_WS_URL
+
+    async def attach(self, call_id: str) -> SidebandSession:
+        """Open the control connection for *call_id*; a no-op when it is already open."""
+        session = self._sessions.get(call_id)
+        if session is not None and session.task is not None and not session.task.done():
+            return session
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"} if OPENAI_API_KEY else {}
+        try:
+            with span("realtime_sideband.connect", call_id=call_id):
+                websocket = await asyncio.wait_for(
+                    connect(f"{self.url}?call_id={call_id}", additional_headers=headers),
+                    SIDEBAND_CONNECT_TIMEOUT,
+                )
+        except (OSError, asyncio.TimeoutError, ConnectionClosed, ValueError) as exc:
+            raise SidebandError(f"Sideband connection for {call_id} failed: {exc}") from exc
+        session = SidebandSession(call_id, websocket)
+        session.task = asyncio.create_task(self._run(session))
+        self._sessions[call_id] = session
+        return session
+
+    async def _run(self, session: SidebandSession) -> None:
+        try:
+            await session.run()
+        except Exception as exc:
+            print(f"Sideband {session.call_id} stopped: {exc}")
+            session.last_error = str(exc)
+        finally:
+            if self._sessions.get(session.call_id) is session:
+                del self._sessions[session.call_id]
+
+    async def detach(self, call_id: str) -> bool:
+        session = self._sessions.pop(call_id, None)
+        if session is None:
+            return False
+        await session.websocket.close()
+        if session.task is not None:
+            await asyncio.gather(session.task, return_exceptions=True)
+        return True
+
+    async def close_all(self) -> None:
+        for call_id in list(self._sessions):
+            await self.detach(call_id)
+
+    def get(self, call_id: str) -> Optional[SidebandSession]:
+        return self._sessions.get(call_id)
+
+    def status(self) -> list[dict[str, Any]]:
+        return [session.snapshot() for session in self._sessions.values()]
+
+
+sideband_manager = SidebandManager()
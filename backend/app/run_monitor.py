@@ -0,0 +1,264 @@
+"""Shared, incremental polling of robot run commands.
+
+Following a run used to mean re-downloading ``GET /runs/{runId}/commands`` in
+full on every check, once per interested client.  :class:`RunMonitor` keeps a
+single polling task per active run that walks the command list with the
+robot's ``cursor``/``pageLength`` pagination, maintains a local index of the
+commands seen so far and fans new or updated commands out to any number of
+subscribers (SSE streams, the function-call dispatcher, ...).
+
+Only the tail of the list is re-fetched: polling restarts from the first
+command that has not reached a terminal status, so status transitions of the
+running command are picked up without paging through history again.  A run
+is finished once a poll succeeds after the robot reported a terminal run
+status, whatever its commands say (a stopped run leaves them queued).
+
+A failed poll is kept in :attr:`RunFeed.last_error` (and published to
+subscribers) until the next successful one, so readers can tell an
+unreachable robot from a run without commands.  Finished runs stay indexed
+for ``RUN_MONITOR_FINISHED_TTL`` seconds after their last read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import httpx
+
+from .tracing import ROBOT_REQUEST_SECONDS
+from .traffic import httpx_async_transport
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+POLL_INTERVAL = float(os.getenv("RUN_MONITOR_INTERVAL", 1.0))
+PAGE_LENGTH = int(os.getenv("RUN_MONITOR_PAGE_LENGTH", 100))
+# Keep a feed alive this long after its last subscriber/reader went away.
+IDLE_TIMEOUT = float(os.getenv("RUN_MONITOR_IDLE_TIMEOUT", 30.0))
+# Finished runs are served from the index until unread for this long.
+FINISHED_TTL = float(os.getenv("RUN_MONITOR_FINISHED_TTL", 600.0))
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+ROBOT_HEADERS = {"opentrons-version": "2"}
+TERMINAL_COMMAND_STATUSES = {"succeeded", "failed"}
+TERMINAL_RUN_STATUSES = {"succeeded", "failed", "stopped"}
+
+
+class RunFeed:
+    """Local index of one run's commands plus its subscribers."""
+
+    def __init__(self, run_id: str, base_url: str):
+        self.run_id = run_id
+        self.base_url = base_url.rstrip("/")
+        self.commands: list[dict[str, Any]] = []
+        self.positions: dict[str, int] = {}
+        self.run_status: Optional[str] = None
+        self.subscribers: set[asyncio.Queue] = set()
+        self.last_access = time.monotonic()
+        # Error of the latest poll (None after a successful one) and when a poll last succeeded
+        self.last_error: Optional[str] = None
+        self.polled_at: Optional[float] = None
+        # Set once the commands were fetched after the run reached a terminal status
+        self.settled = False
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        # Guards ``commands`` for readers on worker threads (the dispatcher).
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        # A stopped run leaves its remaining commands queued for good, so
+        # command statuses cannot tell whether the run is over.
+        return self.settled
+
+    def snapshot(self, since: int = 0) -> dict[str, Any]:
+        self.last_access = time.monotonic()
+        with self.lock:
+            return {
+                "run_id": self.run_id,
+                "run_status": self.run_status,
+                "error": self.last_error,
+                "cursor": len(self.commands),
+                "commands": self.commands[since:],
+            }
+
+    def _resume_cursor(self) -> int:
+        for position, command in enumerate(self.commands):
+            if command.get("status") not in TERMINAL_COMMAND_STATUSES:
+                return position
+        return len(self.commands)
+
+    def apply(self, page: list[dict[str, Any]], cursor: int) -> list[dict[str, Any]]:
+        """Merge a fetched page into the index and return the changed commands."""
+
+        changed = []
+        with self.lock:
+            for offset, command in enumerate(page):
+                command_id = command.get("id") or f"{cursor + offset}"
+                position = self.positions.get(command_id)
+                if position is None:
+                    self.positions[command_id] = len(self.commands)
+                    self.commands.append(command)
+                    changed.append({"seq": len(self.commands) - 1, "command": command})
+                elif self.commands[position] != command:
+                    self.commands[position] = command
+                    changed.append({"seq": position, "command": command})
+        return changed
+
+    def publish(self, events: list[dict[str, Any]]) -> None:
+        for queue in list(self.subscribers):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Slow consumer – it can catch up with ?since=<seq>.
+                    break
+
+
+class RunMonitor:
+    """Owns one :class:`RunFeed` (and one polling task) per followed run."""
+
+    def __init__(self, base_url: Optional[str] = None):
+        self._base_url = base_url
+        self._feeds: dict[str, RunFeed] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def base_url(self) -> Optional[str]:
+        return self._base_url or os.getenv("EXTERNAL_API_BASE_URL")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def ensure(self, run_id: str) -> RunFeed:
+        """Start following *run_id* if needed and wait for the first poll."""
+
+        self._evict_finished()
+        feed = self._feeds.get(run_id)
+        if feed is None:
+            if not self.base_url:
+                raise RuntimeError("External API base URL not configured")
+            feed = RunFeed(run_id, self.base_url)
+            self._feeds[run_id] = feed
+            feed.task = asyncio.create_task(self._poll(feed))
+        feed.last_access = time.monotonic()
+        await feed.ready.wait()
+        return feed
+
+    async def subscribe(self, run_id: str) -> tuple[RunFeed, asyncio.Queue]:
+        feed = await self.ensure(run_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        feed.subscribers.add(queue)
+        return feed, queue
+
+    def unsubscribe(self, feed: RunFeed, queue: asyncio.Queue) -> None:
+        feed.subscribers.discard(queue)
+        feed.last_access = time.monotonic()
+
+    def snapshot(self, run_id: str, since: int = 0) -> Optional[dict[str, Any]]:
+        """Thread-safe read of an already-followed run, or None."""
+
+        feed = self._feeds.get(run_id)
+        if feed is None or not feed.ready.is_set():
+            return None
+        return feed.snapshot(since)
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    def _evict_finished(self) -> None:
+        now = time.monotonic()
+        for run_id, feed in list(self._feeds.items()):
+            if feed.task is not None and feed.task.done() and now - feed.last_access > FINISHED_TTL:
+                self._feeds.pop(run_id, None)
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=ROBOT_HEADERS,
+                timeout=10.0,
+                transport=httpx_async_transport("robot"),
+                event_hooks={"request": [_mark_start], "response": [_record_latency]},
+            )
+        return self._client
+
+    async def _fetch_tail(self, feed: RunFeed) -> list[dict[str, Any]]:
+        client = self._http()
+        cursor = feed._resume_cursor()
+        changed: list[dict[str, Any]] = []
+        while True:
+            resp = await client.get(
+                f"{feed.base_url}/runs/{feed.run_id}/commands",
+                params={"cursor": cursor, "pageLength": PAGE_LENGTH},
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            page = body.get("data") or []
+            changed.extend(feed.apply(page, cursor))
+            total = (body.get("meta") or {}).get("totalLength", cursor + len(page))
+            cursor += len(page)
+            if not page or cursor >= total:
+                return changed
+
+    async def _fetch_status(self, feed: RunFeed) -> None:
+        resp = await self._http().get(f"{feed.base_url}/runs/{feed.run_id}")
+        resp.raise_for_status()
+        feed.run_status = (resp.json().get("data") or {}).get("status")
+
+    async def _poll(self, feed: RunFeed) -> None:
+        try:
+            while True:
+                try:
+                    await self._fetch_status(feed)
+                    changed = await self._fetch_tail(feed)
+                except (httpx.HTTPError, ValueError) as exc:
+                    feed.last_error = f"{type(exc).__name__}: {exc}"
+                    feed.publish([{"error": feed.last_error}])
+                else:
+                    feed.last_error = None
+                    feed.polled_at = time.time()
+                    # The status was read before the commands, so they are final now
+                    feed.settled = feed.run_status in TERMINAL_RUN_STATUSES
+                    if changed:
+                        feed.publish(changed)
+                feed.ready.set()
+
+                idle = time.monotonic() - feed.last_access > IDLE_TIMEOUT
+                if feed.finished or (idle and not feed.subscribers):
+                    feed.publish([{"run_status": feed.run_status, "done": True}])
+                    return
+                await asyncio.sleep(POLL_INTERVAL)
+        except Exception as exc:
+            print(f"Run monitor for {feed.run_id} stopped: {exc!r}")
+            feed.last_error = f"Run monitor stopped: {type(exc).__name__}: {exc}"
+            feed.publish([{"error": feed.last_error}, {"run_status": feed.run_status, "done": True}])
+        finally:
+            feed.ready.set()
+            # Finished runs stay indexed so late readers don't re-download
+            # the whole history; anything else is forgotten.
+            if not feed.finished:
+                self._feeds.pop(feed.run_id, None)
+
+
+async def _mark_start(request: httpx.Request) -> None:
+    request.extensions["pippin_started"] = time.perf_counter()
+
+
+async def _record_latency(response: httpx.Response) -> None:
+    request = response.request
+    started = request.extensions.get("pippin_started")
+    if started is not None:
+        ROBOT_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, robot=request.url.host, method=request.method, status=response.status_code
+        )
+
+
+run_monitor = RunMonitor()
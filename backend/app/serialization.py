@@ -0,0 +1,73 @@
+"""Fast serialization for list endpoints and function-call responses.
+
+FastAPI's default path validates every ORM row through ``response_model``
+one object at a time, then walks the result again with
+``jsonable_encoder`` before ``json.dumps``.  For the hot list routes and the
+function-call dispatcher this module offers two shortcuts:
+
+* :func:`project` selects exactly the columns of an output schema and turns
+  the rows into dicts – no ORM instances, no per-row validation.  The
+  schema's fields must map 1:1 onto model columns (``MoveOut``/``TaskOut``
+  do), so the database already guarantees their types.
+* :func:`dump` converts ORM instances through a cached pydantic
+  ``TypeAdapter`` – one batch validation for a whole list.
+
+Routes return :class:`FastJSONResponse`, which renders with orjson (dates
+and datetimes natively) and falls back to ``jsonable_encoder`` + ``json``
+when orjson is not installed.  A returned ``Response`` skips FastAPI's
+``response_model`` pass, so routes keep ``response_model`` for the OpenAPI
+schema only.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for types it does not know (pydantic models, sets, Decimal, ...)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def dump(schema: type[BaseModel], objects: Sequence[Any]) -> list[dict[str, Any]]:
+    """Validate ORM *objects* against *schema* in one batch and return JSON-ready dicts."""
+    adapter = list_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+
+
+def dump_one(schema: type[BaseModel], obj: Any) -> dict[str, Any]:
+    return schema.model_validate(obj, from_attributes=True).model_dump(mode="json")
+
+
+def project(db: Session, schema: type[BaseModel], model: type, *criteria: Any) -> list[dict[str, Any]]:
+    """Rows of *model* matching *criteria* as dicts holding exactly the fields of *schema*."""
+    columns = [getattr(model, field) for field in schema.model_fields]
+    return [dict(row) for row in db.execute(select(*columns).where(*criteria)).mappings()]
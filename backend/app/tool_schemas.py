@@ -0,0 +1,183 @@
+"""Per-tool realtime function schemas generated from the MCP server.
+
+The generic ``mcp_call`` function leaves the model to guess tool names and
+argument shapes, and every wrong guess costs a round-trip plus a retry.
+:class:`ToolCatalog` instead reads the MCP server's ``tools/list`` once at
+startup and publishes every tool as its own typed realtime function:
+
+* the tool's ``inputSchema`` becomes the function's ``parameters``
+  (pydantic ``title`` noise removed, unknown properties rejected); tools
+  that talk to the robot also get an optional ``robot`` property for
+  targeting a discovered robot,
+* the tool list is cached in the shared cache under a fingerprint of the
+  MCP server sources, so workers and restarts only spawn the server when
+  the code changed; :attr:`ToolCatalog.version` is a hash of the published
+  functions, reported with every realtime session,
+* one ``jsonschema`` validator per tool is built (and its schema checked)
+  at load time; :meth:`ToolCatalog.validate` runs it before a call is
+  dispatched, so bad arguments come back as a function-call error without
+  spawning the MCP server.
+
+``mcp_call`` stays available as a fallback, and its ``tool_name`` and
+``arguments`` are checked against the same catalog.  Set
+``REALTIME_TOOL_SCHEMAS=0`` to publish only the generic functions.
+"""
+
+from __future__ import annotations
+
+import copy
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from jsonschema.validators import validator_for
+
+from .cache import shared_cache
+from .circuit_breaker import ROBOT_MCP_TOOLS
+from .mcp_client import MCPClient
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+REALTIME_TOOL_SCHEMAS = os.getenv("REALTIME_TOOL_SCHEMAS", "1") in {"1", "true", "yes"}
+TOOL_SCHEMA_TIMEOUT = float(os.getenv("TOOL_SCHEMA_TIMEOUT", 30.0))
+TOOL_SCHEMA_CACHE_TTL = float(os.getenv("TOOL_SCHEMA_CACHE_TTL", 24 * 3600))
+
+# Functions the dispatcher handles itself; MCP tools of the same name are not published.
+RESERVED_NAMES = {"mcp_call", "get_job_status", "cancel_job", "external_api_call"}
+# Realtime function descriptions are capped by the API
+MAX_DESCRIPTION = 1024
+ROBOT_PROPERTY = {
+    "type": "string",
+    "description": "Name or serial of a discovered robot to target (default: the configured robot; "
+                   "required for robot actions when several robots are discovered)",
+}
+
+_tools_cache = shared_cache("mcp_tools", ttl=TOOL_SCHEMA_CACHE_TTL)
+
+
+class InvalidToolCall(ValueError):
+    """Unknown tool or arguments that do not match its schema."""
+
+
+def server_fingerprint(server_path: str) -> str:
+    """Hash of the MCP server's sources (path, size, mtime); changes whenever a tool can have changed."""
+    server = Path(server_path).resolve()
+    if not server.is_file():
+        raise FileNotFoundError(f"MCP server not found: {server}")
+    # Tool signatures live in opentrons_agent/tools/, so walk the whole package
+    files = [server, *sorted((server.parent / "opentrons_agent").rglob("*.py"))]
+    digest = hashlib.sha256()
+    for path in files:
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _strip_titles(schema: Any) -> Any:
+    """Drop pydantic's ``title`` keywords (not properties named "title")."""
+    if isinstance(schema, list):
+        return [_strip_titles(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    out = {}
+    for key, value in schema.items():
+        if key == "title" and isinstance(value, str):
+            continue
+        if key in {"properties", "patternProperties", "$defs", "definitions"} and isinstance(value, dict):
+            out[key] = {name: _strip_titles(sub) for name, sub in value.items()}
+        elif key in {"default", "enum", "const", "examples"}:
+            out[key] = value
+        else:
+            out[key] = _strip_titles(value)
+    return out
+
+
+class ToolCatalog:
+    """MCP tools as realtime functions, with a compiled validator per tool."""
+
+    def __init__(self, server_path: Optional[str] = None):
+        self.server_path = server_path or os.getenv("MCP_SERVER_PATH", "opentrons_mcp.py")
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.functions: list[dict[str, Any]] = []
+        self._validators: dict[str, Any] = {}
+        self._robot_property: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> list[dict[str, Any]]:
+        return MCPClient(self.server_path).list_tools(timeout=TOOL_SCHEMA_TIMEOUT)
+
+    def load(self) -> None:
+        """Read (or reuse the cached) tool list and rebuild functions and validators."""
+        key = server_fingerprint(self.server_path)
+        tools = _tools_cache.get_or_compute(key, self._fetch) if _tools_cache is not None else self._fetch()
+        functions, validators, robot_property = [], {}, set()
+        for tool in sorted(tools, key=lambda t: t["name"]):
+            name = tool["name"]
+            if name in RESERVED_NAMES:
+                print(f"MCP tool {name!r} shadows a built-in function; reachable through mcp_call only")
+                continue
+            parameters = _strip_titles(copy.deepcopy(tool.get("inputSchema") or {}))
+            parameters.setdefault("type", "object")
+            parameters.setdefault("properties", {})
+            parameters.setdefault("additionalProperties", False)
+            cls = validator_for(parameters)
+            cls.check_schema(parameters)
+            validators[name] = cls(parameters)
+            published = copy.deepcopy(parameters)
+            if name in ROBOT_MCP_TOOLS and "robot" not in published["properties"]:
+                published["properties"]["robot"] = ROBOT_PROPERTY
+                robot_property.add(name)
+            functions.append({
+                "type": "function",
+                "name": name,
+                "description": (tool.get("description") or name)[:MAX_DESCRIPTION],
+                "parameters": published,
+            })
+        version = hashlib.sha256(json.dumps(functions, sort_keys=True).encode()).hexdigest()[:16]
+        with self._lock:
+            self.functions, self._validators, self._robot_property = functions, validators, robot_property
+            self.version, self.loaded_at = version, time.time()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._validators
+
+    def validate(self, tool_name: str, arguments: dict[str, Any]) -> None:
+        """Raise :class:`InvalidToolCall` for unknown tools or mismatching arguments.
+
+        Before the catalog is loaded every call passes, as it did with ``mcp_call`` alone.
+        """
+        if self.version is None:
+            return
+        validator = self._validators.get(tool_name)
+        if validator is None:
+            close = difflib.get_close_matches(tool_name or "", self._validators, n=3)
+            hint = f"; did you mean {', '.join(close)}?" if close else ""
+            raise InvalidToolCall(f"Unknown MCP tool {tool_name!r}{hint}")
+        errors = sorted(validator.iter_errors(arguments), key=lambda e: list(e.absolute_path))
+        if errors:
+            details = "; ".join(
+                f"{'.'.join(map(str, e.absolute_path)) or 'arguments'}: {e.message}" for e in errors[:3]
+            )
+            raise InvalidToolCall(f"Invalid arguments for {tool_name}: {details}")
+
+    def as_mcp_call(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        """``mcp_call`` arguments for a call of the per-tool function *name*."""
+        arguments = dict(arguments)
+        robot = arguments.pop("robot", None) if name in self._robot_property else None
+        return {"tool_name": name, "arguments": arguments, **({"robot": robot} if robot else {})}
+
+    def info(self) -> dict[str, Any]:
+        return {"version": self.version, "loaded_at": self.loaded_at, "count": len(self.functions),
+                "functions": self.functions}
+
+
+tool_catalog = ToolCatalog()
@@ -0,0 +1,190 @@
+"""Minimal tracing and Prometheus metrics for the function-call path.
+
+Spans are plain context managers.  The active span lives in a context
+variable, so nested spans – route → dispatcher → MCP client → robot request –
+share one trace id, including across ``anyio.to_thread`` hops.  The MCP
+server process receives the trace context through the W3C ``TRACEPARENT``
+environment variable and writes its own spans to the same export file.
+
+* ``TRACE_EXPORT_PATH=/tmp/pippin-traces.jsonl`` appends every finished span
+  as one JSON line for offline analysis.
+* ``GET /metrics`` renders the latency histograms in Prometheus text format.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in Prometheus exposition format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, series in items:
+            labels = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key))
+            sep = "," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {int(count)}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {int(series[-2])}')
+            lines.append(f"{self.name}_count{{{labels}}} {int(series[-2])}")
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+FUNCTION_CALL_SECONDS = Histogram(
+    "pippin_function_call_seconds", "Latency of realtime function calls", ("function", "status")
+)
+MCP_TOOL_SECONDS = Histogram(
+    "pippin_mcp_tool_seconds", "Latency of MCP tool calls including process spawn", ("tool", "phase")
+)
+ROBOT_REQUEST_SECONDS = Histogram(
+    "pippin_robot_request_seconds", "Latency of HTTP requests to robots", ("robot", "method", "status")
+)
+DB_QUERY_SECONDS = Histogram("pippin_db_query_seconds", "Latency of database statements", ())
+OPENAI_SESSION_SECONDS = Histogram("pippin_openai_session_seconds", "Latency of realtime session minting", ())
+
+METRICS = [FUNCTION_CALL_SECONDS, MCP_TOOL_SECONDS, ROBOT_REQUEST_SECONDS, DB_QUERY_SECONDS, OPENAI_SESSION_SECONDS]
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "duration")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration = 0.0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("pippin_current_span", default=None)
+_export_lock = threading.Lock()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a block as a child of the current span (or start a new trace)."""
+
+    parent = _current_span.get()
+    current = Span(
+        name,
+        parent.trace_id if parent else secrets.token_hex(16),
+        parent.span_id if parent else None,
+        attributes,
+    )
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as exc:
+        current.attributes.setdefault("error", type(exc).__name__)
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        _export(current)
+
+
+def current_traceparent() -> Optional[str]:
+    """W3C ``traceparent`` for the active span, for handing to subprocesses."""
+
+    current = _current_span.get()
+    return current.traceparent if current else None
+
+
+def _export(finished: Span) -> None:
+    if not TRACE_EXPORT_PATH:
+        return
+    record = {
+        "trace_id": finished.trace_id,
+        "span_id": finished.span_id,
+        "parent_id": finished.parent_id,
+        "name": finished.name,
+        "start": finished.start,
+        "duration_ms": round(finished.duration * 1000, 3),
+        "process": "backend",
+        "attributes": finished.attributes,
+    }
+    line = json.dumps(record, default=str)
+    with _export_lock, open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+
+
+def instrument_engine(engine) -> None:
+    """Record every SQL statement run through *engine* as a DB latency sample."""
+
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("pippin_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["pippin_query_start"].pop()
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started)
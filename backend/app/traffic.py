@@ -0,0 +1,20 @@
+"""Record/replay of the backend's robot and OpenAI HTTP traffic.
+
+The implementation is :mod:`opentrons_agent.traffic` (``TRAFFIC_MODE``,
+``TRAFFIC_FILE``), shared with the MCP server processes so one recording
+covers a whole session.  It is imported from the MCP server tree like
+:mod:`app.cache`; without that tree clients keep httpx's default transport.
+"""
+
+from __future__ import annotations
+
+from . import cache  # noqa: F401  (puts the MCP server tree on sys.path)
+
+try:
+    from opentrons_agent.traffic import httpx_async_transport, httpx_transport
+except ImportError:  # MCP server tree not available
+    def httpx_transport(channel: str):
+        return None
+
+    def httpx_async_transport(channel: str):
+        return None
@@ -0,0 +1,69 @@
+"""Microbenchmarks for the function-call hot path and its neighbours."""
+
+from app.idempotency import IdempotencyStore
+from app.tracing import Histogram
+
+
+def bench_function_call_external_api(benchmark, client):
+    payload = {"name": "external_api_call", "arguments": {"endpoint": "/health", "method": "GET"}}
+
+    def call():
+        resp = client.post("/api/realtime/function-call", json=payload)
+        assert resp.status_code == 200
+
+    benchmark(call)
+
+
+def bench_function_call_batch(benchmark, client):
+    calls = [
+        {"call_id": None, "name": "external_api_call", "arguments": {"endpoint": path, "method": "GET"}}
+        for path in ("/health", "/instruments", "/protocols")
+    ]
+
+    def call():
+        resp = client.post("/api/realtime/function-calls", json={"calls": calls})
+        assert resp.status_code == 200
+
+    benchmark(call)
+
+
+def bench_login(benchmark, client, auth_headers):
+    form = {"username": "bench@example.com", "password": "bench-password"}
+    benchmark(lambda: client.post("/api/auth/login", data=form).raise_for_status())
+
+
+def bench_list_moves(benchmark, client, auth_headers):
+    for i in range(50 - len(client.get("/api/moves", headers=auth_headers).json())):
+        client.post(
+            "/api/moves",
+            json={"origin_country": "DE", "destination_country": f"C{i}", "start_date": None},
+            headers=auth_headers,
+        )
+    benchmark(lambda: client.get("/api/moves", headers=auth_headers).raise_for_status())
+
+
+def bench_list_tasks(benchmark, client, auth_headers):
+    move = client.post(
+        "/api/moves", json={"origin_country": "DE", "destination_country": "NL", "start_date": None}, headers=auth_headers
+    ).json()
+    for i in range(500):
+        client.post(
+            f"/api/moves/{move['id']}/tasks",
+            json={"title": f"Task {i}", "description": "Book movers", "category": "logistics", "due_date": "2026-03-01"},
+            headers=auth_headers,
+        )
+    benchmark(lambda: client.get(f"/api/moves/{move['id']}/tasks", headers=auth_headers).raise_for_status())
+
+
+def bench_realtime_session_offline(benchmark, client):
+    benchmark(lambda: client.post("/api/realtime/session", json={}).raise_for_status())
+
+
+def bench_idempotency_key(benchmark):
+    args = {"tool_name": "get_instruments", "arguments": {"cursor": 0, "limit": 20}}
+    benchmark(IdempotencyStore.make_key, "call_123", "mcp_call", args)
+
+
+def bench_histogram_observe(benchmark):
+    histogram = Histogram("bench_seconds", "bench", ("tool",))
+    benchmark(histogram.observe, 0.042, tool="get_instruments")
@@ -0,0 +1,45 @@
+"""Fixtures for the pytest-benchmark microbenchmarks.
+
+Run from ``backend/``::
+
+    pytest benchmarks --benchmark-autosave
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:20%
+
+The second form fails when any benchmark's mean regressed by more than 20 %
+against the last saved run.
+"""
+
+import os
+
+import pytest
+
+from .harness import BENCH_USER, FakeRobotServer, configure_environment
+
+configure_environment()
+
+
+@pytest.fixture(scope="session")
+def fake_robot():
+    with FakeRobotServer() as server:
+        os.environ["EXTERNAL_API_BASE_URL"] = server.url
+        yield server
+
+
+@pytest.fixture(scope="session")
+def client(fake_robot):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    client.post("/api/auth/register", json=BENCH_USER)
+    resp = client.post(
+        "/api/auth/login", data={"username": BENCH_USER["email"], "password": BENCH_USER["password"]}
+    )
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
@@ -0,0 +1,70 @@
+"""Shared setup for the benchmark suite.
+
+Everything runs locally: a throwaway SQLite database (or ``DATABASE_URL`` if
+you want Postgres), ``OPENAI_OFFLINE=1`` for session minting and the fake
+robot from ``app.fake_robot`` served by uvicorn on a background thread.
+
+:func:`configure_environment` must run before ``app.main`` is imported
+because the backend reads its configuration at import time.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import tempfile
+import threading
+import time
+
+BENCH_USER = {"email": "bench@example.com", "password": "bench-password", "full_name": "Bench"}
+
+
+def configure_environment() -> None:
+    os.environ.setdefault("OPENAI_OFFLINE", "1")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='pippin-bench-')}/bench.db")
+    # Keep the fake robot fast and deterministic unless the caller asks otherwise.
+    os.environ.setdefault("FAKE_ROBOT_LATENCY_MS", "5")
+    os.environ.setdefault("FAKE_ROBOT_JITTER_MS", "0")
+    os.environ.setdefault("FAKE_ROBOT_SEED", "1")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeRobotServer:
+    """Run ``app.fake_robot`` with uvicorn on a daemon thread."""
+
+    def __init__(self, port: int | None = None, config=None):
+        import uvicorn
+
+        from app.fake_robot import create_app
+
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(config), host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "FakeRobotServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake robot did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
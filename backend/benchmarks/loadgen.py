@@ -0,0 +1,187 @@
+"""Async load generator for the backend's hot endpoints.
+
+Drives ``/api/realtime/function-call``, ``/api/auth/login``, ``/api/moves``
+and ``/api/realtime/session`` at fixed concurrency levels and reports
+p50/p95/p99 latency and throughput per scenario.  Results are written as
+JSON; pass a previous result file as ``--baseline`` to fail (exit code 1)
+when p95 latency or throughput regress by more than ``--max-regression``.
+
+Run from ``backend/``::
+
+    # in-process app + fake robot + throwaway SQLite
+    python -m benchmarks.loadgen --out bench.json
+    # against a running deployment
+    python -m benchmarks.loadgen --base-url http://localhost:8000 --out bench.json
+    # regression gate
+    python -m benchmarks.loadgen --baseline baseline.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import httpx
+
+from .harness import BENCH_USER, FakeRobotServer, configure_environment, percentile
+
+SCENARIOS = ("function_call", "login", "moves", "session")
+
+
+def _requests(scenario: str, token: str) -> Callable[[httpx.AsyncClient], Any]:
+    auth = {"Authorization": f"Bearer {token}"}
+    if scenario == "function_call":
+        body = {"name": "external_api_call", "arguments": {"endpoint": "/health", "method": "GET"}}
+        return lambda c: c.post("/api/realtime/function-call", json=body)
+    if scenario == "login":
+        form = {"username": BENCH_USER["email"], "password": BENCH_USER["password"]}
+        return lambda c: c.post("/api/auth/login", data=form)
+    if scenario == "moves":
+        return lambda c: c.get("/api/moves", headers=auth)
+    if scenario == "session":
+        return lambda c: c.post("/api/realtime/session", json={})
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+async def _run_level(client: httpx.AsyncClient, send, concurrency: int, total: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                resp = await send(client)
+                if resp.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def _prepare(client: httpx.AsyncClient, seed_moves: int) -> str:
+    await client.post("/api/auth/register", json=BENCH_USER)
+    resp = await client.post(
+        "/api/auth/login", data={"username": BENCH_USER["email"], "password": BENCH_USER["password"]}
+    )
+    resp.raise_for_status()
+    token = resp.json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    existing = len((await client.get("/api/moves", headers=auth)).json())
+    for i in range(max(0, seed_moves - existing)):
+        await client.post(
+            "/api/moves", json={"origin_country": "DE", "destination_country": f"C{i}", "start_date": None}, headers=auth
+        )
+    return token
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    with contextlib.ExitStack() as stack:
+        if args.base_url:
+            transport = None
+            base_url = args.base_url
+        else:
+            configure_environment()
+            robot = stack.enter_context(FakeRobotServer())
+            os.environ["EXTERNAL_API_BASE_URL"] = robot.url
+            from app.main import app  # imported late: reads the env configured above
+
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://bench"
+
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60.0) as client:
+            token = await _prepare(client, args.seed_moves)
+            results: dict[str, list[dict[str, Any]]] = {}
+            for scenario in args.scenarios:
+                send = _requests(scenario, token)
+                await _run_level(client, send, 1, min(5, args.requests))  # warm-up
+                results[scenario] = [
+                    await _run_level(client, send, level, args.requests) for level in args.concurrency
+                ]
+                for row in results[scenario]:
+                    print(
+                        f"{scenario:14s} c={row['concurrency']:<4d} p50={row['p50_ms']:8.2f}ms "
+                        f"p95={row['p95_ms']:8.2f}ms p99={row['p99_ms']:8.2f}ms "
+                        f"{row['throughput_rps']:8.1f} req/s errors={row['errors']}"
+                    )
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "python": platform.python_version(),
+        "requests_per_level": args.requests,
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Return human-readable regressions of *current* against *baseline*."""
+
+    problems = []
+    for scenario, rows in current["results"].items():
+        base_rows = {row["concurrency"]: row for row in baseline.get("results", {}).get(scenario, [])}
+        for row in rows:
+            base = base_rows.get(row["concurrency"])
+            if base is None:
+                continue
+            label = f"{scenario} c={row['concurrency']}"
+            if base["p95_ms"] and row["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+                problems.append(f"{label}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+            if base["throughput_rps"] and row["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+                problems.append(f"{label}: throughput {base['throughput_rps']} -> {row['throughput_rps']} req/s")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", help="Benchmark a running backend instead of the in-process app")
+    parser.add_argument("--scenarios", type=lambda v: v.split(","), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--seed-moves", type=int, default=100, help="Moves to create for the list benchmark")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="Previous result file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            problems = compare(report, json.load(fh), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
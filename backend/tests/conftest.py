@@ -0,0 +1,13 @@
+"""Run from ``backend/``: ``PYTHONPATH=. pytest tests``."""
+
+import pytest
+
+from benchmarks.harness import FakeRobotServer, configure_environment
+
+configure_environment()
+
+
+@pytest.fixture(scope="session")
+def fake_robot():
+    with FakeRobotServer() as server:
+        yield server
@@ -0,0 +1,40 @@
+"""RunMonitor against the fake robot."""
+
+import asyncio
+
+import httpx
+
+from app import run_monitor as run_monitor_module
+from app.run_monitor import RunMonitor
+
+
+async def _next_event(queue: asyncio.Queue) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout=5)
+
+
+def test_run_stopped_mid_run_finishes(fake_robot, monkeypatch):
+    monkeypatch.setattr(run_monitor_module, "POLL_INTERVAL", 0.05)
+    headers = {"opentrons-version": "2"}
+
+    async def scenario():
+        async with httpx.AsyncClient(base_url=fake_robot.url, headers=headers) as robot:
+            run_id = (await robot.post("/runs")).json()["data"]["id"]
+            await robot.post(f"/runs/{run_id}/actions", json={"data": {"actionType": "play"}})
+            monitor = RunMonitor(fake_robot.url)
+            feed, queue = await monitor.subscribe(run_id)
+            assert not feed.finished
+
+            await robot.post(f"/runs/{run_id}/actions", json={"data": {"actionType": "stop"}})
+            event = await _next_event(queue)
+            while not event.get("done"):
+                event = await _next_event(queue)
+
+            assert event["run_status"] == "stopped"
+            assert feed.finished
+            assert any(command["status"] == "queued" for command in feed.commands)
+            await asyncio.wait_for(feed.task, timeout=5)
+            # Kept indexed for late readers
+            assert monitor.snapshot(run_id)["run_status"] == "stopped"
+            monitor.unsubscribe(feed, queue)
+
+    asyncio.run(scenario())
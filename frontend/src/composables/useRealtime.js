@@ -13,6 +13,82 @@ export function useRealtime() {
   const activity = ref('none');
   const pcRef = ref(null);
   const dcRef = ref(null);
+  // Function calls of the current model response, executed as one batch.
+  let pendingCalls = [];
+  // Once the backend holds a sideband connection it executes function calls
+  // itself and the browser only carries audio.
+  let sidebandActive = false;
+  let sidebandTimer = null;
+  const SIDEBAND_POLL_MS = 5000;
+
+  function stopSidebandWatch() {
+    if (sidebandTimer) clearInterval(sidebandTimer);
+    sidebandTimer = null;
+  }
+
+  // The sideband can close mid-session (network, backend restart); take
+  // function calls back into the browser as soon as it is gone.
+  function watchSideband(callId) {
+    stopSidebandWatch();
+    sidebandTimer = setInterval(async () => {
+      try {
+        const res = await apiFetch(`/realtime/sideband/${encodeURIComponent(callId)}`);
+        if (res.ok) return;
+      } catch (err) {
+        console.error("Sideband status check failed:", err);
+      }
+      console.warn("Sideband closed, handling function calls in the browser");
+      sidebandActive = false;
+      stopSidebandWatch();
+    }, SIDEBAND_POLL_MS);
+  }
+
+  function reportResult(call, entry) {
+    if (!dcRef.value || entry.status !== 'ok') return;
+    let summaryText;
+    if (call.name === 'create_move') {
+      const { id, origin_country, destination_country, start_date } = entry.result;
+      summaryText = `Your move has been created: ID ${id}, from ${origin_country} to ${destination_country}, start date ${start_date}.`;
+    } else if (call.name === 'create_task') {
+      const { id, title } = entry.result;
+      summaryText = `Your task has been created: ID ${id}, title ${title}.`;
+    } else if (call.name === 'external_api_call') {
+      const { status_code, body } = entry.result;
+      summaryText = `External API ${call.arguments.method} ${call.arguments.endpoint} returned status ${status_code}. Response: ${JSON.stringify(body)}`;
+    }
+    if (summaryText) {
+      const convEvent = {
+        type: 'conversation.item.create',
+        item: {
+          type: 'message',
+          role: 'assistant',
+          content: [{ type: 'text', text: summaryText }]
+        }
+      };
+      const convJson = JSON.stringify(convEvent);
+      console.log('[RTC_EVENT_JSON]', convJson);
+      dcRef.value.send(convJson);
+    }
+  }
+
+  async function flushFunctionCalls() {
+    if (!pendingCalls.length) return;
+    const calls = pendingCalls;
+    pendingCalls = [];
+    try {
+      // Backend runs independent calls concurrently and answers once.
+      const res = await apiFetch("/realtime/function-calls", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ calls }),
+      });
+      const json = await res.json();
+      console.log("[FunctionCall] executed batch:", json);
+      json.results.forEach((entry, i) => reportResult(calls[i], entry));
+    } catch (err) {
+      console.error("Failed to execute/log function calls:", err);
+    }
+  }
 
   async function connect({ voice } = {}) {
     try {
@@ -67,6 +143,7 @@ export function useRealtime() {
           messages.value.push(e.data);
           return;
         }
+        if (sidebandActive) return;
         // Detect completed function_call events from the Realtime API
         // Support both legacy 'function_call' and the newer 'response.function_call_arguments.done'
         const isFunctionDone = (parsed.type === 'function_call')
@@ -83,44 +160,12 @@ export function useRealtime() {
               return;
             }
           }
-          try {
-            // Call backend to execute function and get result
-            const res = await apiFetch("/realtime/function-call", {
-              method: "POST",
-              headers: { "Content-Type": "application/json" },
-              body: JSON.stringify({ name: parsed.name, arguments: funcArgs }),
-            });
-            const json = await res.json();
-            console.log("[FunctionCall] executed:", parsed.name, json);
-            if (dcRef.value && json.status === 'ok') {
-              let summaryText;
-              if (parsed.name === 'create_move') {
-                const { id, origin_country, destination_country, start_date } = json.result;
-                summaryText = `Your move has been created: ID ${id}, from ${origin_country} to ${destination_country}, start date ${start_date}.`;
-              } else if (parsed.name === 'create_task') {
-                const { id, title } = json.result;
-                summaryText = `Your task has been created: ID ${id}, title ${title}.`;
-              } else if (parsed.name === 'external_api_call') {
-                const { status_code, body } = json.result;
-                summaryText = `External API ${parsed.arguments.method} ${parsed.arguments.endpoint} returned status ${status_code}. Response: ${JSON.stringify(body)}`;
-              }
-              if (summaryText) {
-                const convEvent = {
-                  type: 'conversation.item.create',
-                  item: {
-                    type: 'message',
-                    role: 'assistant',
-                    content: [{ type: 'text', text: summaryText }]
-                  }
-                };
-                const convJson = JSON.stringify(convEvent);
-                console.log('[RTC_EVENT_JSON]', convJson);
-                dcRef.value.send(convJson);
-              }
-            }
-          } catch (err) {
-            console.error("Failed to execute/log function call:", err);
-          }
+          pendingCalls.push({ call_id: parsed.call_id, name: parsed.name, arguments: funcArgs });
+          // Calls of one response are flushed together on 'response.done';
+          // legacy single events have no such marker.
+          if (parsed.type === 'function_call') await flushFunctionCalls();
+        } else if (parsed.type === 'response.done') {
+          await flushFunctionCalls();
         }
       });
 
@@ -145,6 +190,23 @@ export function useRealtime() {
       const answer = { type: "answer", sdp: await sdpRes.text() };
       await pc.setRemoteDescription(answer);
 
+      // The answer's Location header ends in the call id the backend needs
+      // to attach its sideband; fall back to browser-side calls without it.
+      const callId = (sdpRes.headers.get("Location") || "").split("/").pop();
+      if (session.sideband && callId) {
+        try {
+          const res = await apiFetch("/realtime/sideband", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ call_id: callId }),
+          });
+          sidebandActive = res.ok;
+          if (sidebandActive) watchSideband(callId);
+        } catch (err) {
+          console.error("Sideband attach failed, handling function calls in the browser:", err);
+        }
+      }
+
       status.value = "live";
     } catch (err) {
       console.error(err);
@@ -153,6 +215,8 @@ export function useRealtime() {
   }
 
   function disconnect() {
+    sidebandActive = false;
+    stopSidebandWatch();
     if (pcRef.value) {
       pcRef.value.close();
     }
@@ -0,0 +1,6 @@
+"""Opentrons lab agent: MCP server internals and lab automation helpers.
+
+``opentrons_mcp.py`` at the repository root is the entry point; the server
+instance and tool registration live in :mod:`opentrons_agent.server` and the
+tools themselves in :mod:`opentrons_agent.tools`.
+"""
@@ -0,0 +1,270 @@
+"""
+Array-backed deck and liquid state for protocol simulation.
+
+Every loaded labware keeps its well volumes in one flat NumPy array (8×12
+plates are 96 floats, 1×12 reservoirs 12 floats).  Well names are resolved
+to flat indices through tables precomputed once per labware geometry, so a
+protocol step – a transfer between lists of wells or a mix – is applied as a
+handful of vectorized array operations instead of a Python loop over wells.
+
+Each step is checked for reservoir/well underflow and well overflow and for
+running out of tips.  A violation raises :class:`DeckStateError` naming the
+offending wells; the state is left as it was before the failing step.
+
+Within a single transfer step all aspirations happen before all dispenses.
+Steps that read from a well filled earlier in the same protocol (serial
+dilutions) must therefore be issued as one step per column.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# load name -> (rows, columns, max volume per well in µL).  Tip racks hold
+# tips, not liquid, and are tracked separately by :class:`DeckState`.
+LABWARE_GEOMETRY = {
+    # Plates
+    "corning_96_wellplate_360ul_flat": (8, 12, 360.0),
+    "nest_96_wellplate_200ul_flat": (8, 12, 200.0),
+    "biorad_96_wellplate_200ul_pcr": (8, 12, 200.0),
+    # Reservoirs
+    "nest_12_reservoir_15ml": (1, 12, 15000.0),
+    "nest_1_reservoir_195ml": (1, 1, 195000.0),
+    "agilent_1_reservoir_290ml": (1, 1, 290000.0),
+    # Tube racks
+    "opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap": (4, 6, 1500.0),
+    "nest_15_tuberack_15000ul": (3, 5, 15000.0),
+    # Tip racks
+    "opentrons_flex_96_tiprack_1000ul": (8, 12, 0.0),
+    "opentrons_flex_96_tiprack_200ul": (8, 12, 0.0),
+    "opentrons_flex_96_tiprack_50ul": (8, 12, 0.0),
+}
+
+ROW_NAMES = "ABCDEFGHIJKLMNOP"
+
+# Volumes are floats; ignore rounding noise when checking limits.
+_EPSILON = 1e-6
+
+
+class DeckStateError(ValueError):
+    """A protocol step would underflow or overflow a well, or run out of tips."""
+
+
+@lru_cache(maxsize=None)
+def well_index(rows: int, columns: int) -> dict[str, int]:
+    """Well name -> flat index for a rows×columns labware, row-major."""
+    return {
+        f"{ROW_NAMES[r]}{c + 1}": r * columns + c
+        for r in range(rows)
+        for c in range(columns)
+    }
+
+
+@lru_cache(maxsize=None)
+def well_names(rows: int, columns: int) -> tuple[str, ...]:
+    """Flat index -> well name, the inverse of :func:`well_index`."""
+    return tuple(well_index(rows, columns))
+
+
+class Labware:
+    """One piece of labware on the deck and the liquid in its wells."""
+
+    __slots__ = ("load_name", "slot", "rows", "columns", "max_volume", "volumes", "_index", "_names")
+
+    def __init__(self, load_name: str, slot: int):
+        try:
+            rows, columns, max_volume = LABWARE_GEOMETRY[load_name]
+        except KeyError:
+            raise DeckStateError(f"Unknown labware: {load_name}") from None
+        self.load_name = load_name
+        self.slot = slot
+        self.rows = rows
+        self.columns = columns
+        self.max_volume = max_volume
+        self.volumes = np.zeros(rows * columns)
+        self._index = well_index(rows, columns)
+        self._names = well_names(rows, columns)
+
+    @property
+    def is_tip_rack(self) -> bool:
+        return self.max_volume == 0.0
+
+    def indices(self, wells: str | Iterable[str] | np.ndarray) -> np.ndarray:
+        """Flat indices for well names ("A1", ["A1", "B1"]) or pass through an index array."""
+        if isinstance(wells, np.ndarray):
+            return wells
+        if isinstance(wells, str):
+            wells = (wells,)
+        try:
+            return np.fromiter((self._index[w] for w in wells), dtype=np.intp)
+        except KeyError as exc:
+            raise DeckStateError(f"No well {exc.args[0]} in {self.load_name} (slot {self.slot})") from None
+
+    def column(self, number: int) -> np.ndarray:
+        """Flat indices of every well in column *number* (1-based)."""
+        return np.arange(number - 1, self.rows * self.columns, self.columns, dtype=np.intp)
+
+    def names(self, indices: np.ndarray) -> list[str]:
+        return [self._names[i] for i in indices]
+
+    def volume(self, well: str) -> float:
+        return float(self.volumes[self._index[well]])
+
+
+class DeckState:
+    """Labware by deck slot, the liquid in it, and tip usage."""
+
+    __slots__ = ("labware", "tips_used", "aspirated", "steps")
+
+    def __init__(self):
+        self.labware: dict[int, Labware] = {}
+        self.tips_used = 0
+        self.aspirated = 0.0  # total µL moved by transfers
+        self.steps = 0
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def load(self, slot: int, load_name: str) -> Labware:
+        if not (1 <= slot <= 12):
+            raise DeckStateError(f"Invalid deck position: {slot}. Must be 1-12")
+        if slot in self.labware:
+            raise DeckStateError(f"Position conflict: Position {slot} used twice")
+        labware = self.labware[slot] = Labware(load_name, slot)
+        return labware
+
+    def fill(self, slot: int, wells, volume) -> None:
+        """Set the starting volume of *wells*; *volume* is a scalar or one value per well."""
+        labware = self[slot]
+        idx = labware.indices(wells)
+        volumes = np.broadcast_to(np.asarray(volume, dtype=float), idx.shape)
+        over = volumes > labware.max_volume + _EPSILON
+        if over.any():
+            raise DeckStateError(
+                f"Overflow in slot {slot}: {', '.join(labware.names(idx[over]))} "
+                f"cannot hold more than {labware.max_volume:g}µL"
+            )
+        labware.volumes[idx] = volumes
+
+    def __getitem__(self, slot: int) -> Labware:
+        try:
+            return self.labware[slot]
+        except KeyError:
+            raise DeckStateError(f"No labware in slot {slot}") from None
+
+    @property
+    def tip_capacity(self) -> int:
+        return sum(lw.rows * lw.columns for lw in self.labware.values() if lw.is_tip_rack)
+
+    # ------------------------------------------------------------------
+    # Liquid handling steps
+    # ------------------------------------------------------------------
+
+    def _use_tips(self, count: int) -> None:
+        if self.tips_used + count > self.tip_capacity:
+            raise DeckStateError(
+                f"Out of tips: step needs {count}, {self.tip_capacity - self.tips_used} left"
+            )
+        self.tips_used += count
+
+    def transfer(self, source_slot: int, source_wells, dest_slot: int, dest_wells,
+                 volume, new_tip: str = "always") -> None:
+        """Move *volume* µL from each source well to the paired destination well.
+
+        A single source well is paired with every destination (reservoir to
+        plate); otherwise sources and destinations pair up one to one.
+        *volume* is a scalar or one value per pair.
+        """
+        source = self[source_slot]
+        dest = self[dest_slot]
+        src = source.indices(source_wells)
+        dst = dest.indices(dest_wells)
+        if src.size == 1 and dst.size > 1:
+            src = np.broadcast_to(src, dst.shape)
+        elif src.size != dst.size:
+            raise DeckStateError(f"Cannot pair {src.size} source wells with {dst.size} destination wells")
+        volumes = np.broadcast_to(np.asarray(volume, dtype=float), dst.shape)
+        if (volumes < 0).any():
+            raise DeckStateError("Transfer volume must not be negative")
+
+        # Aggregate per well first so repeated wells (one reservoir column
+        # feeding a whole plate) are checked against their total.
+        withdrawn = np.bincount(src, weights=volumes, minlength=source.volumes.size)
+        remaining = source.volumes - withdrawn
+        short = remaining < -_EPSILON
+        if short.any():
+            wells = np.flatnonzero(short)
+            raise DeckStateError(
+                f"Underflow in slot {source_slot}: "
+                + ", ".join(f"{name} needs {need:g}µL, has {have:g}µL"
+                            for name, need, have in zip(source.names(wells), withdrawn[wells], source.volumes[wells]))
+            )
+
+        received = np.bincount(dst, weights=volumes, minlength=dest.volumes.size)
+        filled = (remaining if dest is source else dest.volumes) + received
+        over = filled > dest.max_volume + _EPSILON
+        if over.any():
+            wells = np.flatnonzero(over)
+            raise DeckStateError(
+                f"Overflow in slot {dest_slot}: "
+                + ", ".join(f"{name} would hold {vol:g}µL (max {dest.max_volume:g}µL)"
+                            for name, vol in zip(dest.names(wells), filled[wells]))
+            )
+
+        tips = {"always": dst.size, "once": 1, "never": 0}[new_tip]
+        self._use_tips(tips)
+        source.volumes = remaining
+        dest.volumes = filled
+        self.aspirated += float(volumes.sum())
+        self.steps += 1
+
+    def mix(self, slot: int, wells, volume: float, repetitions: int, new_tip: str = "never") -> None:
+        """Mix *volume* µL *repetitions* times in each well; the well must hold at least *volume*."""
+        labware = self[slot]
+        idx = labware.indices(wells)
+        short = labware.volumes[idx] < volume - _EPSILON
+        if short.any():
+            bad = idx[short]
+            raise DeckStateError(
+                f"Mix volume {volume:g}µL exceeds liquid in slot {slot}: "
+                + ", ".join(f"{name} has {vol:g}µL" for name, vol in zip(labware.names(bad), labware.volumes[bad]))
+            )
+        self._use_tips({"always": idx.size, "once": 1, "never": 0}[new_tip])
+        self.steps += 1
+
+    def apply(self, steps: Sequence[dict]) -> "DeckState":
+        """Apply protocol steps: ``{"op": "transfer" | "mix" | "fill", **kwargs}``."""
+        for step in steps:
+            kwargs = dict(step)
+            op = kwargs.pop("op")
+            if op not in _STEP_OPS:
+                raise DeckStateError(f"Unknown step: {op}")
+            getattr(self, op)(**kwargs)
+        return self
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> dict:
+        return {
+            "steps": self.steps,
+            "tips_used": self.tips_used,
+            "tip_capacity": self.tip_capacity,
+            "volume_moved_ul": round(self.aspirated, 3),
+            "labware": {
+                slot: {
+                    "load_name": lw.load_name,
+                    "total_ul": round(float(lw.volumes.sum()), 3),
+                    "empty_wells": int((lw.volumes <= _EPSILON).sum()),
+                }
+                for slot, lw in sorted(self.labware.items())
+                if not lw.is_tip_rack
+            },
+        }
+
+
+_STEP_OPS = frozenset({"transfer", "mix", "fill"})
@@ -0,0 +1,132 @@
+"""
+Stand-in for the ``byonoy_devices`` SDK (Absorbance 96 reader).
+
+Implements the calls the reader tools and the experiment scheduler use,
+with one simulated device.  Select it with ``BYONOY_MODULE=
+opentrons_agent.fake_reader``.  A measurement blocks for
+``FAKE_READER_SECONDS`` and returns 96 absorbance values.
+
+A real reader measures whatever plate is inserted; the fake needs to be
+told what is in the wells.  :func:`insert_plate` takes a plate map (well
+index -> concentration plus the liquid-handling condition that filled it)
+and measurements then follow a linear standard curve with noise that grows
+with pipetting speed and shrinks with mixing, so parameter sweeps have
+something to find.  Without a plate map the wells read as blank.
+"""
+from __future__ import annotations
+
+import enum
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+FAKE_READER_SECONDS = float(os.getenv("FAKE_READER_SECONDS", 5.0))
+FAKE_READER_SEED = os.getenv("FAKE_READER_SEED")
+
+WAVELENGTHS = [420, 450, 540, 570, 600, 650]
+ABSORBANCE_PER_UNIT = 0.0042  # absorbance per µg/mL of tartrazine at 450 nm
+BLANK = 0.045
+
+
+class ErrorCode(enum.Enum):
+    NO_ERROR = 0
+    DEVICE_NOT_FOUND = 1
+    NOT_INITIALIZED = 2
+    INVALID_WAVELENGTH = 3
+
+
+class DeviceSlotState(enum.Enum):
+    EMPTY = 0
+    OCCUPIED = 1
+
+
+class Abs96SingleMeasurementConfig:
+    def __init__(self):
+        self.sample_wavelength = 450
+
+
+class _Device:
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.lock = threading.Lock()
+        self.wavelength: Optional[int] = None
+        self.plate: Optional[dict[int, tuple]] = None
+        self.measurements = 0
+
+
+_DEVICES = {"fake-abs96-0001": _Device("fake-abs96-0001")}
+_rng = random.Random(int(FAKE_READER_SEED) if FAKE_READER_SEED else None)
+
+
+def available_devices_count() -> int:
+    return len(_DEVICES)
+
+
+def available_devices() -> list[str]:
+    return list(_DEVICES)
+
+
+def open_device(device: str):
+    if device not in _DEVICES:
+        return ErrorCode.DEVICE_NOT_FOUND, None
+    return ErrorCode.NO_ERROR, _DEVICES[device]
+
+
+def device_slot_status_supported(handle: _Device) -> bool:
+    return True
+
+
+def get_device_slot_status(handle: _Device):
+    return ErrorCode.NO_ERROR, DeviceSlotState.EMPTY if handle.plate is None else DeviceSlotState.OCCUPIED
+
+
+def abs96_available_wavelengths_supported(handle: _Device) -> bool:
+    return True
+
+
+def abs96_get_available_wavelengths(handle: _Device):
+    return ErrorCode.NO_ERROR, list(WAVELENGTHS)
+
+
+def abs96_initialize_single_measurement(handle: _Device, config: Abs96SingleMeasurementConfig) -> ErrorCode:
+    if config.sample_wavelength not in WAVELENGTHS:
+        return ErrorCode.INVALID_WAVELENGTH
+    handle.wavelength = config.sample_wavelength
+    return ErrorCode.NO_ERROR
+
+
+# ---------------------------------------------------------------------------
+# Fake-only: plate contents
+# ---------------------------------------------------------------------------
+
+
+def insert_plate(handle: _Device, plate_map: dict[int, tuple[float, float, float, int]]) -> None:
+    """Insert a plate: well index -> (concentration, aspiration speed, dispense speed, mix repetitions)."""
+    handle.plate = dict(plate_map)
+
+
+def remove_plate(handle: _Device) -> None:
+    handle.plate = None
+
+
+def _absorbance(concentration: float, aspiration_speed: float, dispense_speed: float, mix_repetitions: int) -> float:
+    # Fast pipetting and too little mixing both scatter the readings.
+    cv = 0.015 + 0.0004 * abs(aspiration_speed - 50) + 0.0002 * abs(dispense_speed - 50) + 0.03 / (1 + mix_repetitions)
+    signal = BLANK + ABSORBANCE_PER_UNIT * concentration
+    return max(0.0, _rng.gauss(signal, signal * cv))
+
+
+def abs96_single_measure(handle: _Device, config: Abs96SingleMeasurementConfig):
+    if handle.wavelength is None:
+        return ErrorCode.NOT_INITIALIZED, []
+    with handle.lock:
+        time.sleep(FAKE_READER_SECONDS)
+        plate = handle.plate or {}
+        values = [
+            round(_absorbance(*plate[i]) if i in plate else _rng.gauss(BLANK, 0.002), 4)
+            for i in range(96)
+        ]
+        handle.measurements += 1
+    return ErrorCode.NO_ERROR, values
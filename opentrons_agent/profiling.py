@@ -0,0 +1,322 @@
+"""
+On-demand profiling of MCP tools and backend routes.
+
+Every tool (through :func:`opentrons_agent.server.tool`) and every backend
+route is wrapped by :func:`profiled` under a target name such as
+``tool:suggest_optimal_deck_layout`` or ``route:GET /api/health``.  Nothing
+is measured until a target is armed with :func:`arm`: the next *calls*
+invocations of that target are then profiled and written to
+``PROFILE_DIR``:
+
+* ``cprofile`` – deterministic :mod:`cProfile`, saved as ``.pstats``
+  (``python -m pstats FILE``, snakeviz, ...),
+* ``sampling`` – a background thread samples the calling thread's stack
+  every *interval* seconds, saved as ``.speedscope.json``
+  (https://www.speedscope.app).  Its overhead does not grow with the number
+  of function calls, so it suits long tools such as parameter sweeps.
+
+Tools run in their own MCP server processes, so the armed targets live in
+``PROFILE_DIR/armed.json`` (updated under a file lock) where the backend
+arms them and any process claims them.  A process looks at that file at
+most every ``ARMED_CHECK_INTERVAL`` seconds, so while nothing is armed a
+wrapped call costs a clock read.  Async callables are profiled on the
+event loop thread, so concurrent tasks show up in their profiles too.
+
+Only the standard library is used, so the backend can import this module
+next to the MCP server.
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: arming is per process
+    fcntl = None
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path.home() / ".opentrons_agent" / "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 200))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))  # seconds
+
+MODES = {"cprofile": ".pstats", "sampling": ".speedscope.json"}
+_ARMED_FILE = "armed.json"
+ARMED_CHECK_INTERVAL = 0.25  # seconds between looks at armed.json
+_FILE_RE = re.compile(r"^[\w.:@+-]+\.(pstats|speedscope\.json)$")
+
+
+# ---------------------------------------------------------------------------
+# Arming – shared between processes through PROFILE_DIR/armed.json
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+# directory -> (next check, mtime, armed targets)
+_snapshots: dict[Path, tuple[float, Optional[int], dict[str, dict[str, Any]]]] = {}
+
+
+@contextmanager
+def _locked_state(directory: Path):
+    """Read-modify-write access to the armed targets."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with _lock, open(os.open(directory / _ARMED_FILE, os.O_RDWR | os.O_CREAT, 0o600), "r+") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            state = json.loads(fh.read() or "{}")
+        except ValueError:
+            state = {}
+        yield state
+        fh.seek(0)
+        fh.truncate()
+        fh.write(json.dumps(state))
+        _snapshots.pop(directory, None)  # changes made here apply at once
+
+
+def arm(target: str, calls: int = 1, mode: str = "cprofile", interval: float = PROFILE_SAMPLE_INTERVAL,
+        directory: Path = PROFILE_DIR) -> dict[str, Any]:
+    """Profile the next *calls* invocations of *target*."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {sorted(MODES)}")
+    if calls < 1:
+        raise ValueError("calls must be at least 1")
+    entry = {"remaining": calls, "mode": mode, "interval": interval, "armed_at": time.time()}
+    with _locked_state(directory) as state:
+        state[target] = entry
+    return {"target": target, **entry}
+
+
+def disarm(target: str, directory: Path = PROFILE_DIR) -> bool:
+    with _locked_state(directory) as state:
+        return state.pop(target, None) is not None
+
+
+def armed(directory: Path = PROFILE_DIR) -> dict[str, dict[str, Any]]:
+    """Armed targets, looked up at most every ``ARMED_CHECK_INTERVAL`` and re-read only when changed."""
+    now = time.monotonic()
+    next_check, mtime, state = _snapshots.get(directory, (0.0, None, {}))
+    if now < next_check:
+        return state
+    try:
+        current = os.stat(directory / _ARMED_FILE).st_mtime_ns
+    except FileNotFoundError:
+        current, state = None, {}
+    if current is not None and current != mtime:
+        try:
+            state = json.loads((directory / _ARMED_FILE).read_text() or "{}")
+        except (OSError, ValueError):
+            state = {}
+    _snapshots[directory] = (now + ARMED_CHECK_INTERVAL, current, state)
+    return state
+
+
+def claim(target: str, directory: Path = PROFILE_DIR) -> Optional[dict[str, Any]]:
+    """Take one armed call of *target*; None when it is not armed."""
+    if target not in armed(directory):
+        return None
+    with _locked_state(directory) as state:
+        entry = state.get(target)
+        if entry is None:
+            return None
+        entry["remaining"] -= 1
+        if entry["remaining"] <= 0:
+            del state[target]
+        return entry
+
+
+def unclaim(target: str, config: dict[str, Any], directory: Path = PROFILE_DIR) -> None:
+    """Give back a call taken with :func:`claim` that could not be profiled."""
+    with _locked_state(directory) as state:
+        entry = state.setdefault(target, {**config, "remaining": 0})
+        entry["remaining"] += 1
+
+
+# ---------------------------------------------------------------------------
+# Profilers
+# ---------------------------------------------------------------------------
+
+
+class Sampler:
+    """Samples one thread's Python stack on a timer thread."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: list[tuple[tuple[str, str, int], ...]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self.started = self.stopped = 0.0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(tuple(reversed(stack)))
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """The samples in speedscope's "sampled" file format."""
+        frames: dict[tuple[str, str, int], int] = {}
+        samples = [[frames.setdefault(frame, len(frames)) for frame in stack] for stack in self.samples]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "opentrons_agent.profiling",
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in frames]},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "seconds",
+                "startValue": 0, "endValue": round(self.stopped - self.started, 6),
+                "samples": samples, "weights": [self.interval] * len(samples),
+            }],
+        }
+
+
+def _output_path(target: str, mode: str, directory: Path) -> Path:
+    safe = re.sub(r"[^\w.:@+-]+", "_", target).strip("_")
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    return directory / f"{stamp}.{int(time.time() * 1000) % 1000:03d}_{safe}_{os.getpid()}{MODES[mode]}"
+
+
+def _prune(directory: Path) -> None:
+    files = sorted(list_profiles(directory), key=lambda p: p["created_at"])
+    for profile in files[:max(0, len(files) - PROFILE_MAX_FILES)]:
+        (directory / profile["file"]).unlink(missing_ok=True)
+
+
+# Since Python 3.12 an enabled cProfile.Profile is process-wide and a second one fails to enable
+_cprofile_lock = threading.Lock()
+
+
+def _start_cprofile() -> Optional[cProfile.Profile]:
+    """An enabled profiler holding ``_cprofile_lock``, or None while another profiler is active."""
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:  # another tool (a debugger, coverage, ...) owns the profiling hooks
+        _cprofile_lock.release()
+        return None
+    return profile
+
+
+def _save(directory: Path, write: Callable[[], None]) -> None:
+    # A profile that cannot be written must not fail the profiled call (stdout is the MCP channel)
+    try:
+        write()
+        _prune(directory)
+    except OSError as exc:
+        print(f"Profile not written: {exc}", file=sys.stderr)
+
+
+@contextmanager
+def capture(target: str, config: dict[str, Any], directory: Path = PROFILE_DIR):
+    """Profile the enclosed block per *config* (``mode``, ``interval``) and write the result.
+
+    While another cProfile run is active in the process (overlapping calls,
+    or a profiled tool calling another armed one) the block runs unprofiled
+    and the claimed call is given back.
+    """
+    path = _output_path(target, config["mode"], directory)
+    if config["mode"] == "sampling":
+        sampler = Sampler(threading.get_ident(), config.get("interval") or PROFILE_SAMPLE_INTERVAL)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            _save(directory, lambda: path.write_text(json.dumps(sampler.speedscope(target), separators=(",", ":"))))
+        return
+    profile = _start_cprofile()
+    if profile is None:
+        try:
+            unclaim(target, config, directory)
+        except OSError as exc:
+            print(f"Profile claim for {target} not returned: {exc}", file=sys.stderr)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        _cprofile_lock.release()
+        _save(directory, lambda: profile.dump_stats(path))
+
+
+def profiled(target: str, directory: Optional[Path] = None) -> Callable[[Callable], Callable]:
+    """Wrap a sync or async callable so armed calls of *target* are profiled."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                config = claim(target, directory or PROFILE_DIR)
+                if config is None:
+                    return await fn(*args, **kwargs)
+                with capture(target, config, directory or PROFILE_DIR):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                config = claim(target, directory or PROFILE_DIR)
+                if config is None:
+                    return fn(*args, **kwargs)
+                with capture(target, config, directory or PROFILE_DIR):
+                    return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Written profiles
+# ---------------------------------------------------------------------------
+
+
+def list_profiles(directory: Path = PROFILE_DIR) -> list[dict[str, Any]]:
+    """Profiles on disk, newest first."""
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.iterdir():
+        if not _FILE_RE.match(path.name):
+            continue
+        stat = path.stat()
+        # <stamp>_<target>_<pid><suffix>
+        stem = path.name[:-len(MODES["sampling"])] if path.name.endswith(MODES["sampling"]) else path.stem
+        _, _, rest = stem.partition("_")
+        target, _, pid = rest.rpartition("_")
+        profiles.append({
+            "file": path.name, "target": target, "pid": int(pid) if pid.isdigit() else None,
+            "format": "speedscope" if path.name.endswith(MODES["sampling"]) else "pstats",
+            "bytes": stat.st_size, "created_at": stat.st_mtime,
+        })
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def profile_path(name: str, directory: Path = PROFILE_DIR) -> Optional[Path]:
+    """Path of a written profile, or None for unknown (or unsafe) names."""
+    if not _FILE_RE.match(name):
+        return None
+    path = directory / name
+    return path if path.is_file() else None
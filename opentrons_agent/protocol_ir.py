@@ -0,0 +1,583 @@
+"""
+Protocol IR, generators and a caching compiler to Opentrons Python.
+
+A protocol is described as a typed plan – :class:`ProtocolIR` holding
+:class:`LabwareSpec`, :class:`PipetteSpec` and :class:`TransferStep` – built
+by generators (:func:`standard_curve`, :func:`serial_dilution`,
+:func:`plate_replication`, :func:`parameter_screen`) on top of the transfer
+planner.
+
+Numeric fields may be a :class:`Param` instead of a number.  The compiler
+validates the structure once (labware, slots, wells, mounts, tip racks
+and whether their tips fit, pipette and well capacities), tightens each
+parameter's bounds from the pipettes, tips and wells it feeds, and renders
+the code with placeholders.  The result is cached by IR and the generators
+are memoized on their (hashable) arguments, so a sweep producing thousands
+of variants plans and compiles one template and each variant only checks
+its values against the bounds and joins strings::
+
+    template = compile_protocol(standard_curve((0, 10, 20), volume=Param("transfer_volume")))
+    code = template.render(transfer_volume=150, aspiration_speed=50, ...)
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import NamedTuple, Union
+
+from .deck_state import LABWARE_GEOMETRY, well_index
+from .timing_model import get_timing_model, slot_distance
+from .transfer_planner import Transfer, plan_transfers
+
+API_LEVEL = "2.15"
+TEMPLATE_CACHE_SIZE = 256
+
+# Pipette load name -> (channels, min µL, max µL)
+PIPETTES = {
+    "flex_1channel_20": (1, 1.0, 20.0),
+    "flex_1channel_50": (1, 1.0, 50.0),
+    "flex_1channel_300": (1, 20.0, 300.0),
+    "flex_1channel_1000": (1, 5.0, 1000.0),
+    "flex_8channel_50": (8, 1.0, 50.0),
+    "flex_8channel_1000": (8, 5.0, 1000.0),
+    "flex_96channel_1000": (96, 5.0, 1000.0),
+}
+
+# Tip rack load name -> tip capacity µL, smallest first
+TIP_RACKS = {
+    "opentrons_flex_96_tiprack_50ul": 50.0,
+    "opentrons_flex_96_tiprack_200ul": 200.0,
+    "opentrons_flex_96_tiprack_1000ul": 1000.0,
+}
+TIPS_PER_RACK = 96
+
+
+class ProtocolError(ValueError):
+    """The IR is inconsistent, or a parameter value is out of bounds."""
+
+
+# ---------------------------------------------------------------------------
+# IR
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class Param:
+    """A value supplied at render time, checked against [minimum, maximum]."""
+
+    name: str
+    minimum: float = 0.0
+    maximum: float = float("inf")
+    integer: bool = False
+
+
+Value = Union[float, int, Param]
+
+
+@dataclass(frozen=True, slots=True)
+class LabwareSpec:
+    label: str
+    load_name: str
+    slot: int
+    note: str = ""  # shown in the operator's deck layout comment
+
+
+@dataclass(frozen=True, slots=True)
+class PipetteSpec:
+    label: str
+    load_name: str
+    mount: str
+    tip_racks: tuple[str, ...]
+    aspirate_rate: Value = 50.0
+    dispense_rate: Value = 50.0
+
+
+@dataclass(frozen=True, slots=True)
+class TransferStep:
+    pipette: str
+    volume: Value
+    source: str
+    source_well: str
+    dest: str
+    dest_well: str
+    new_tip: bool = True
+    mix: tuple[Value, Value] | None = None  # (repetitions, volume)
+    rates: tuple[Value, Value] | None = None  # (aspirate, dispense) overriding the pipette's
+
+
+@dataclass(frozen=True, slots=True)
+class ProtocolIR:
+    name: str
+    labware: tuple[LabwareSpec, ...]
+    pipettes: tuple[PipetteSpec, ...]
+    steps: tuple[TransferStep, ...]
+    transfers: int = 0  # well-to-well transfers the steps cover, for reporting
+    description: str = ""
+
+    def params(self) -> dict[str, Param]:
+        found: dict[str, Param] = {}
+        values = [v for p in self.pipettes for v in (p.aspirate_rate, p.dispense_rate)]
+        for step in self.steps:
+            values.append(step.volume)
+            values.extend(step.mix or ())
+            values.extend(step.rates or ())
+        for value in values:
+            if isinstance(value, Param):
+                found.setdefault(value.name, value)
+        return found
+
+
+# ---------------------------------------------------------------------------
+# Validation and compilation
+# ---------------------------------------------------------------------------
+
+
+def _validate(ir: ProtocolIR) -> dict[str, Param]:
+    """Check the structure; return every parameter with bounds tightened by what it feeds."""
+    errors = []
+    labware = {lw.label: lw for lw in ir.labware}
+    slots = [lw.slot for lw in ir.labware]
+    for lw in ir.labware:
+        if lw.load_name not in LABWARE_GEOMETRY:
+            errors.append(f"Unknown labware {lw.load_name}")
+        if not (1 <= lw.slot <= 12):
+            errors.append(f"Invalid deck position {lw.slot} for {lw.label}")
+        if slots.count(lw.slot) > 1:
+            errors.append(f"Position conflict: position {lw.slot} used twice")
+    if len(labware) != len(ir.labware):
+        errors.append("Duplicate labware labels")
+
+    pipettes = {p.label: p for p in ir.pipettes}
+    mounts = [m for p in ir.pipettes for m in (("left", "right") if PIPETTES.get(p.load_name, (0,))[0] == 96 else (p.mount,))]
+    if len(set(mounts)) != len(mounts):
+        errors.append(f"Mount conflict: {', '.join(mounts)}")
+    tip_capacity: dict[str, float] = {}
+    for p in ir.pipettes:
+        if p.load_name not in PIPETTES:
+            errors.append(f"Unknown pipette {p.load_name}")
+            continue
+        _, min_volume, max_volume = PIPETTES[p.load_name]
+        for rack in p.tip_racks:
+            if rack not in labware or LABWARE_GEOMETRY.get(labware[rack].load_name, (0, 0, 1))[2] != 0:
+                errors.append(f"Tip rack {rack} for {p.label} is not a loaded tip rack")
+                continue
+            capacity = TIP_RACKS.get(labware[rack].load_name)
+            # 50 µL pipettes only take 50 µL tips; larger pipettes take any tip above their minimum
+            if capacity is None or capacity < min_volume or (max_volume <= 50 and capacity > 50):
+                errors.append(f"Tip rack {rack} ({labware[rack].load_name}) does not fit {p.label} ({p.load_name})")
+                continue
+            tip_capacity[p.label] = min(tip_capacity.get(p.label, capacity), capacity)
+        needed = sum(PIPETTES[p.load_name][0] for step in ir.steps if step.pipette == p.label and step.new_tip)
+        if needed > len(p.tip_racks) * TIPS_PER_RACK:
+            errors.append(f"{p.label} picks up {needed} tips but has {len(p.tip_racks)} tip rack(s) "
+                          f"({len(p.tip_racks) * TIPS_PER_RACK} tips)")
+    if errors:
+        raise ProtocolError("; ".join(dict.fromkeys(errors)))
+
+    bounds = {name: [param.minimum, param.maximum] for name, param in ir.params().items()}
+
+    def limit(value, low, high, what):
+        if isinstance(value, Param):
+            bounds[value.name][0] = max(bounds[value.name][0], low)
+            bounds[value.name][1] = min(bounds[value.name][1], high)
+        elif not (low <= value <= high):
+            errors.append(f"{what} {value} outside {low:g}-{high:g}")
+
+    for p in ir.pipettes:
+        limit(p.aspirate_rate, 1, 1000, f"{p.label} aspirate rate")
+        limit(p.dispense_rate, 1, 1000, f"{p.label} dispense rate")
+
+    for i, step in enumerate(ir.steps):
+        where = f"step {i + 1}"
+        if step.pipette not in pipettes or step.source not in labware or step.dest not in labware:
+            errors.append(f"{where}: unknown pipette or labware")
+            continue
+        _, min_volume, max_volume = PIPETTES[pipettes[step.pipette].load_name]
+        max_volume = min(max_volume, tip_capacity.get(step.pipette, max_volume))
+        for label, well in ((step.source, step.source_well), (step.dest, step.dest_well)):
+            rows, columns, _ = LABWARE_GEOMETRY[labware[label].load_name]
+            if well not in well_index(rows, columns):
+                errors.append(f"{where}: no well {well} in {label}")
+        capacity = LABWARE_GEOMETRY[labware[step.dest].load_name][2]
+        limit(step.volume, min_volume, min(max_volume, capacity), f"{where} volume")
+        if step.mix:
+            limit(step.mix[0], 1, 20, f"{where} mix repetitions")
+            limit(step.mix[1], min_volume, min(max_volume, capacity), f"{where} mix volume")
+        if step.rates:
+            limit(step.rates[0], 1, 1000, f"{where} aspirate rate")
+            limit(step.rates[1], 1, 1000, f"{where} dispense rate")
+
+    for name, (low, high) in bounds.items():
+        if low > high:
+            errors.append(f"No valid value for {name}: needs {low:g}-{high:g}")
+    if errors:
+        raise ProtocolError("; ".join(dict.fromkeys(errors)))
+    params = ir.params()
+    return {name: Param(name, low, high, params[name].integer) for name, (low, high) in bounds.items()}
+
+
+class CompiledProtocol:
+    """Rendered protocol code with parameter holes, plus what is needed to fill them."""
+
+    __slots__ = ("ir", "params", "_segments")
+
+    def __init__(self, ir: ProtocolIR, params: dict[str, Param], segments: tuple):
+        self.ir = ir
+        self.params = params
+        self._segments = segments  # str literals and Param placeholders
+
+    def _values(self, values: dict) -> dict[str, str]:
+        missing = self.params.keys() - values.keys()
+        if missing:
+            raise ProtocolError(f"Missing parameters: {', '.join(sorted(missing))}")
+        rendered = {}
+        for name, param in self.params.items():
+            value = values[name]
+            if param.integer and value != int(value):
+                raise ProtocolError(f"{name} must be an integer")
+            if not (param.minimum <= value <= param.maximum):
+                raise ProtocolError(f"{name} {value} outside {param.minimum:g}-{param.maximum:g}")
+            rendered[name] = repr(int(value) if param.integer else float(value))
+        return rendered
+
+    def render(self, **values) -> str:
+        rendered = self._values(values)
+        return "".join(s if isinstance(s, str) else rendered[s.name] for s in self._segments)
+
+    def estimate_seconds(self, **values) -> float:
+        """Runtime from the timing model for these parameter values."""
+        model = get_timing_model()
+
+        def resolve(v):
+            return values[v.name] if isinstance(v, Param) else v
+
+        slots = {lw.label: lw.slot for lw in self.ir.labware}
+        pipettes = {p.label: p for p in self.ir.pipettes}
+        seconds = 0.0
+        for step in self.ir.steps:
+            pipette = pipettes[step.pipette]
+            asp, disp = map(resolve, step.rates or (pipette.aspirate_rate, pipette.dispense_rate))
+            seconds += model.transfer_seconds(resolve(step.volume), asp, disp,
+                                              slot_distance(slots[step.source], slots[step.dest]), step.new_tip)
+            if step.mix:
+                seconds += model.mix_seconds(resolve(step.mix[1]), resolve(step.mix[0]), asp, disp)
+        return seconds
+
+    def summary(self) -> str:
+        channels = {p.label: PIPETTES[p.load_name][0] for p in self.ir.pipettes}
+        counts: dict[int, int] = {}
+        for step in self.ir.steps:
+            counts[channels[step.pipette]] = counts.get(channels[step.pipette], 0) + 1
+        moves = ", ".join(f"{n}×{c}-channel" for c, n in sorted(counts.items()))
+        pickups = [step for step in self.ir.steps if step.new_tip]
+        tips = sum(channels[step.pipette] for step in pickups)
+        reused = len(self.ir.steps) - len(pickups)
+        return (f"{self.ir.transfers} transfers in {len(self.ir.steps)} moves ({moves}); "
+                f"{len(pickups)} tip pick-ups ({tips} tips, {reused} moves on a reused tip) "
+                f"vs {self.ir.transfers} one well at a time")
+
+
+def _emit(ir: ProtocolIR) -> tuple:
+    parts: list = []
+
+    def lit(value):
+        return value if isinstance(value, Param) else repr(value)
+
+    def line(*pieces):
+        parts.extend(pieces)
+        parts.append("\n")
+
+    line("from opentrons import protocol_api")
+    line()
+    line(f"metadata = {{'protocolName': {ir.name!r}}}")
+    line(f"requirements = {{'robotType': 'Flex', 'apiLevel': {API_LEVEL!r}}}")
+    line()
+    line("def run(protocol: protocol_api.ProtocolContext):")
+    if ir.description:
+        # "{name}" in the description is filled with that parameter's value at render time
+        params = ir.params()
+        pieces = re.split(r"\{(\w+)\}", ir.description)
+        line("    # ", *(params.get(piece, f"{{{piece}}}") if i % 2 else piece for i, piece in enumerate(pieces)))
+    line("    labware = {}")
+    for lw in ir.labware:
+        line(f"    labware[{lw.label!r}] = protocol.load_labware({lw.load_name!r}, {lw.slot})")
+    line()
+    line("    pipettes = {}")
+    for p in ir.pipettes:
+        racks = ", ".join(f"labware[{rack!r}]" for rack in p.tip_racks)
+        line(f"    pipettes[{p.label!r}] = protocol.load_instrument({p.load_name!r}, {p.mount!r}, tip_racks=[{racks}])")
+        line(f"    pipettes[{p.label!r}].flow_rate.aspirate = ", lit(p.aspirate_rate))
+        line(f"    pipettes[{p.label!r}].flow_rate.dispense = ", lit(p.dispense_rate))
+    line()
+    # The rates column is only emitted when some step overrides the pipette's flow rates.
+    step_rates = any(s.rates for s in ir.steps)
+    if step_rates:
+        line("    flow_rates = {name: (pip.flow_rate.aspirate, pip.flow_rate.dispense) for name, pip in pipettes.items()}")
+        line("    # (pipette, volume µL, source, source well, destination, destination well, new tip, mix, rates)")
+    else:
+        line("    # (pipette, volume µL, source, source well, destination, destination well, new tip, mix)")
+    line("    steps = [")
+    for s in ir.steps:
+        mix = ("(", lit(s.mix[0]), ", ", lit(s.mix[1]), ")") if s.mix else ("None",)
+        rates = ((", (", lit(s.rates[0]), ", ", lit(s.rates[1]), ")") if s.rates else (", None",)) if step_rates else ()
+        line(f"        ({s.pipette!r}, ", lit(s.volume),
+             f", {s.source!r}, {s.source_well!r}, {s.dest!r}, {s.dest_well!r}, {s.new_tip!r}, ", *mix, *rates, "),")
+    line("    ]")
+    if step_rates:
+        line("    for name, volume, source, source_well, dest, dest_well, new_tip, mix, rates in steps:")
+        line("        pip = pipettes[name]")
+        line("        pip.flow_rate.aspirate, pip.flow_rate.dispense = rates or flow_rates[name]")
+    else:
+        line("    for name, volume, source, source_well, dest, dest_well, new_tip, mix in steps:")
+        line("        pip = pipettes[name]")
+    line("        if new_tip and pip.has_tip:")
+    line("            pip.drop_tip()")
+    line("        if not pip.has_tip:")
+    line("            pip.pick_up_tip()")
+    line("        pip.aspirate(volume, labware[source][source_well])")
+    line("        pip.dispense(volume, labware[dest][dest_well])")
+    line("        if mix:")
+    line("            pip.mix(mix[0], mix[1], labware[dest][dest_well])")
+    line("    for pip in pipettes.values():")
+    line("        if pip.has_tip:")
+    line("            pip.drop_tip()")
+    line()
+    line("    # DECK LAYOUT for operator:")
+    for lw in sorted(ir.labware, key=lambda lw: lw.slot):
+        parts.append(f"    # Position {lw.slot}: {lw.note or lw.load_name}\n")
+
+    # Merge adjacent literals so rendering is a short join.
+    segments: list = []
+    for part in parts:
+        if isinstance(part, str) and segments and isinstance(segments[-1], str):
+            segments[-1] += part
+        else:
+            segments.append(part)
+    return tuple(segments)
+
+
+_TEMPLATES: OrderedDict[ProtocolIR, CompiledProtocol] = OrderedDict()
+_TEMPLATES_LOCK = threading.Lock()
+
+
+def compile_protocol(ir: ProtocolIR) -> CompiledProtocol:
+    """Validate and render *ir* once; later calls with an equal IR hit the cache."""
+    with _TEMPLATES_LOCK:
+        compiled = _TEMPLATES.get(ir)
+        if compiled is not None:
+            _TEMPLATES.move_to_end(ir)
+            return compiled
+    compiled = CompiledProtocol(ir, _validate(ir), _emit(ir))
+    with _TEMPLATES_LOCK:
+        _TEMPLATES[ir] = compiled
+        while len(_TEMPLATES) > TEMPLATE_CACHE_SIZE:
+            _TEMPLATES.popitem(last=False)
+    return compiled
+
+
+# ---------------------------------------------------------------------------
+# Generators
+# ---------------------------------------------------------------------------
+
+PLATE = "corning_96_wellplate_360ul_flat"
+RESERVOIR = "nest_12_reservoir_15ml"
+ROWS = "ABCDEFGH"
+MOUNTS = {1: "left", 8: "right", 96: "left"}
+
+
+def _describe(value: Value) -> str:
+    """*value* for a description; a parameter becomes a placeholder filled in when rendering."""
+    return f"{{{value.name}}}" if isinstance(value, Param) else f"{value:g}"
+
+
+@dataclass(slots=True)
+class _Builder:
+    """Collects labware and pipettes for a generator and turns planner moves into steps."""
+
+    labware: list[LabwareSpec] = field(default_factory=list)
+    pipettes: dict[int, PipetteSpec] = field(default_factory=dict)
+    aspirate_rate: Value = 50.0
+    dispense_rate: Value = 50.0
+
+    def add_labware(self, label: str, load_name: str, slot: int, note: str = "") -> None:
+        self.labware.append(LabwareSpec(label, load_name, slot, note))
+
+    def _free_slot(self) -> int:
+        used = {lw.slot for lw in self.labware}
+        slot = next((slot for slot in range(1, 13) if slot not in used), None)
+        if slot is None:
+            raise ProtocolError("No free deck position left for labware")
+        return slot
+
+    def pipette(self, channels: int, load_name: str | None = None) -> PipetteSpec:
+        if channels not in self.pipettes:
+            rack = f"tips_{channels}"
+            load_name = load_name or ("flex_96channel_1000" if channels == 96 else f"flex_{channels}channel_1000")
+            # The smallest tips that hold the pipette's full volume
+            max_volume = PIPETTES.get(load_name, (0, 0.0, 1000.0))[2]
+            tips = next((name for name, capacity in TIP_RACKS.items() if capacity >= max_volume),
+                        list(TIP_RACKS)[-1])
+            self.add_labware(rack, tips, self._free_slot(), f"Tip rack ({channels}-channel, {TIP_RACKS[tips]:g}µL)")
+            self.pipettes[channels] = PipetteSpec(
+                f"p{channels}", load_name, MOUNTS[channels], (rack,), self.aspirate_rate, self.dispense_rate
+            )
+        return self.pipettes[channels]
+
+    def build(self, name: str, transfers: list[Transfer], *, channels=(1, 8), mix=None, keep_order=False,
+              pipette_names: tuple[tuple[int, str], ...] = (), description: str = "") -> ProtocolIR:
+        layout = {lw.label: (lw.slot, lw.load_name) for lw in self.labware}
+        plan = plan_transfers(transfers, layout, channels=channels, mix=mix, keep_order=keep_order)
+        steps = []
+        for move in plan.moves:
+            pipette = self.pipette(move.channels, dict(pipette_names).get(move.channels))
+            steps.append(TransferStep(pipette.label, move.volume, move.source, move.source_well,
+                                      move.dest, move.dest_well, move.new_tip, move.mix))
+        return self.finish(name, tuple(steps), len(transfers), description)
+
+    def finish(self, name: str, steps: tuple[TransferStep, ...], transfers: int, description: str = "") -> ProtocolIR:
+        """The IR for *steps*, with as many tip racks per pipette as its pick-ups use."""
+        channels = {p.label: c for c, p in self.pipettes.items()}
+        tips = Counter()
+        for step in steps:
+            if step.new_tip:
+                tips[step.pipette] += channels[step.pipette]
+        load_names = {lw.label: lw.load_name for lw in self.labware}
+        for c, p in self.pipettes.items():
+            racks = list(p.tip_racks)
+            while len(racks) < math.ceil(tips[p.label] / TIPS_PER_RACK):
+                rack = f"tips_{c}_{len(racks) + 1}"
+                tip_load = load_names[racks[0]]
+                self.add_labware(rack, tip_load, self._free_slot(),
+                                 f"Tip rack {len(racks) + 1} ({c}-channel, {TIP_RACKS[tip_load]:g}µL)")
+                racks.append(rack)
+            self.pipettes[c] = replace(p, tip_racks=tuple(racks))
+        return ProtocolIR(name, tuple(self.labware), tuple(self.pipettes.values()), steps, transfers, description)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def standard_curve(concentrations: tuple[float, ...], *, volume: Value = 200.0, replicates: int = 1,
+                   mix: tuple[Value, Value] | None = None, aspirate_rate: Value = 50.0,
+                   dispense_rate: Value = 50.0, channels: tuple[int, ...] = (1, 8),
+                   pipette_names: tuple[tuple[int, str], ...] = (), unit: str = "µg/mL") -> ProtocolIR:
+    """Premixed standards in reservoir wells A1.. -> one plate column each, *replicates* rows deep."""
+    if not (1 <= replicates <= 8) or not (1 <= len(concentrations) <= 12):
+        raise ProtocolError("Standard curve needs 1-12 standards and 1-8 replicates")
+    builder = _Builder(aspirate_rate=aspirate_rate, dispense_rate=dispense_rate)
+    builder.add_labware("plate", PLATE, 1, "96-well assay plate")
+    standards = ", ".join(f"A{i + 1}={c:g}{unit}" for i, c in enumerate(concentrations))
+    builder.add_labware("reservoir", RESERVOIR, 2, f"12-well reagent reservoir ({standards})")
+    transfers = [
+        Transfer("reservoir", f"A{i + 1}", "plate", f"{row}{i + 1}", volume)
+        for i in range(len(concentrations))
+        for row in ROWS[:replicates]
+    ]
+    description = (f"Standard curve ({', '.join(f'{c:g}' for c in concentrations)} {unit}), "
+                   f"{replicates} replicate(s) per column")
+    return builder.build("Standard curve", transfers, channels=channels, mix=mix,
+                         pipette_names=pipette_names, description=description)
+
+
+def screen_wells(concentrations: int, replicates: int, conditions: int) -> list[list[list[str]]]:
+    """Plate wells per condition, per standard: blocks of *replicates* rows × one column per standard."""
+    blocks = [(row, column)
+              for column in range(0, 12 - concentrations + 1, concentrations)
+              for row in range(0, 8 - replicates + 1, replicates)]
+    if conditions > len(blocks):
+        raise ProtocolError(f"{conditions} conditions do not fit on one plate (max {len(blocks)})")
+    return [
+        [[f"{ROWS[row + r]}{column + i + 1}" for r in range(replicates)] for i in range(concentrations)]
+        for row, column in blocks[:conditions]
+    ]
+
+
+class ScreenCondition(NamedTuple):
+    aspiration_speed: float
+    dispense_speed: float
+    mix_repetitions: int
+    mix_volume: float = 100.0
+    transfer_volume: float = 200.0
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def parameter_screen(concentrations: tuple[float, ...], conditions: tuple[ScreenCondition, ...], *,
+                     replicates: int = 3, unit: str = "µg/mL") -> ProtocolIR:
+    """Several liquid-handling conditions on one plate, each running the standard curve in its own block.
+
+    Standards come premixed from reservoir A1, A2, ...; see :func:`screen_wells`
+    for the layout.  Every step carries its condition's flow rates.
+    """
+    layout = screen_wells(len(concentrations), replicates, len(conditions))
+    builder = _Builder()
+    builder.add_labware("plate", PLATE, 1, f"96-well screening plate ({len(conditions)} conditions)")
+    standards = ", ".join(f"A{i + 1}={c:g}{unit}" for i, c in enumerate(concentrations))
+    builder.add_labware("reservoir", RESERVOIR, 2, f"12-well reagent reservoir ({standards})")
+    steps: tuple[TransferStep, ...] = ()
+    transfers = 0
+    for condition, wells in zip(conditions, layout):
+        requests = [Transfer("reservoir", f"A{i + 1}", "plate", well, condition.transfer_volume)
+                    for i, standard in enumerate(wells) for well in standard]
+        part = builder.build("Parameter screen", requests, channels=(1, 8),
+                             mix=(condition.mix_repetitions, condition.mix_volume))
+        rates = (condition.aspiration_speed, condition.dispense_speed)
+        steps += tuple(TransferStep(s.pipette, s.volume, s.source, s.source_well, s.dest, s.dest_well,
+                                    s.new_tip, s.mix, rates) for s in part.steps)
+        transfers += len(requests)
+    return builder.finish("Parameter screen", steps, transfers,
+                          f"{len(conditions)} liquid-handling conditions × {replicates} replicates")
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def serial_dilution(dilution_factor: float, dilutions: int, *, final_volume: float = 100.0, rows: int = 8,
+                    mix: tuple[Value, Value] | None = (3, 50.0), aspirate_rate: Value = 50.0,
+                    dispense_rate: Value = 50.0, channels: tuple[int, ...] = (1, 8)) -> ProtocolIR:
+    """Stock (reservoir A1) diluted *dilutions* times across plate columns with diluent from A2.
+
+    Every column ends with *final_volume*; the excess of the last column is
+    discarded into reservoir A12.
+    """
+    if dilution_factor <= 1 or not (1 <= dilutions <= 11) or not (1 <= rows <= 8):
+        raise ProtocolError("Serial dilution needs a factor > 1, 1-11 dilutions and 1-8 rows")
+    step_volume = final_volume / (dilution_factor - 1)
+    builder = _Builder(aspirate_rate=aspirate_rate, dispense_rate=dispense_rate)
+    builder.add_labware("plate", PLATE, 1, "96-well dilution plate")
+    builder.add_labware("reservoir", RESERVOIR, 2, "12-well reservoir (A1=stock, A2=diluent, A12=waste)")
+    used_rows = ROWS[:rows]
+    transfers = [Transfer("reservoir", "A2", "plate", f"{r}{c}", final_volume)
+                 for c in range(2, dilutions + 2) for r in used_rows]
+    transfers += [Transfer("reservoir", "A1", "plate", f"{r}1", final_volume + step_volume) for r in used_rows]
+    for c in range(1, dilutions + 1):
+        transfers += [Transfer("plate", f"{r}{c}", "plate", f"{r}{c + 1}", step_volume) for r in used_rows]
+    transfers += [Transfer("plate", f"{r}{dilutions + 1}", "reservoir", "A12", step_volume) for r in used_rows]
+    # Mixing only follows the dilution transfers; diluent and stock go into
+    # empty wells and the excess into waste.
+    fill, waste = len(used_rows) * (dilutions + 1), len(transfers) - len(used_rows)
+    steps = ()
+    for segment, segment_mix in ((transfers[:fill], None), (transfers[fill:waste], mix), (transfers[waste:], None)):
+        steps += builder.build("Serial dilution", segment, channels=channels, mix=segment_mix, keep_order=True).steps
+    return builder.finish(
+        "Serial dilution", steps, len(transfers),
+        f"1:{dilution_factor:g} serial dilution, {dilutions} steps, {final_volume:g}µL per well",
+    )
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def plate_replication(copies: int, *, volume: Value = 50.0, source: str = PLATE, dest: str = PLATE,
+                      aspirate_rate: Value = 50.0, dispense_rate: Value = 50.0,
+                      channels: tuple[int, ...] = (96,)) -> ProtocolIR:
+    """Stamp a source plate (slot 1) onto *copies* destination plates (slots 2..)."""
+    if not (1 <= copies <= 8):
+        raise ProtocolError("Plate replication needs 1-8 copies")
+    builder = _Builder(aspirate_rate=aspirate_rate, dispense_rate=dispense_rate)
+    builder.add_labware("source", source, 1, "Source plate")
+    wells = [f"{r}{c}" for r in ROWS for c in range(1, 13)]
+    transfers = []
+    for n in range(copies):
+        label = f"copy_{n + 1}"
+        builder.add_labware(label, dest, n + 2, f"Replica plate {n + 1}")
+        transfers += [Transfer("source", w, label, w, volume) for w in wells]
+    return builder.build("Plate replication", transfers, channels=channels,
+                         description=f"{copies} replica(s) of the source plate, {_describe(volume)}µL per well")
@@ -0,0 +1,295 @@
+"""
+Pipelined multi-plate experiment scheduler.
+
+Liquid-handling conditions are batched into full screening plates (see
+:func:`~opentrons_agent.protocol_ir.parameter_screen`).  Each plate goes
+through two resources, the robot (pipetting) and the plate reader
+(measurement), each guarded by a FIFO lock, so while plate *N* is being
+read the robot is already pipetting plate *N + 1*::
+
+    robot   | plate 1 | plate 2 | plate 3 |
+    reader            | plate 1 | plate 2 | plate 3 |
+
+At most ``SCHEDULER_MAX_IN_FLIGHT`` plates are between the start of
+pipetting and the end of reading, which bounds how many filled plates wait
+for the reader.  Results are analysed and yielded plate by plate as soon as
+each read finishes, and :meth:`ExperimentScheduler.report` gives throughput
+(plates per hour) and resource utilisation.
+
+The robot is driven over the Opentrons HTTP API (upload, create run, play,
+poll), so it works against ``backend/app/fake_robot.py``; the reader is any
+module with the ``byonoy_devices`` API, e.g. :mod:`opentrons_agent.fake_reader`.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional, Sequence
+
+import httpx
+
+from . import traffic
+from .protocol_ir import ProtocolError, ScreenCondition, compile_protocol, parameter_screen, screen_wells
+
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", 1.0))
+SCHEDULER_RUN_TIMEOUT = float(os.getenv("SCHEDULER_RUN_TIMEOUT", 2 * 60 * 60))
+SCHEDULER_MAX_IN_FLIGHT = int(os.getenv("SCHEDULER_MAX_IN_FLIGHT", 2))
+
+TERMINAL_RUN_STATUSES = {"succeeded", "failed", "stopped"}
+
+
+# ---------------------------------------------------------------------------
+# Resources
+# ---------------------------------------------------------------------------
+
+
+class RobotRunner:
+    """Runs a protocol to completion over the Opentrons HTTP API."""
+
+    def __init__(self, host: str, headers: Optional[dict] = None, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = host if host.startswith("http") else f"http://{host}"
+        self.headers = headers or {"opentrons-version": "2"}
+        self._client = client
+
+    async def run(self, protocol: str, filename: str) -> str:
+        client = self._client or httpx.AsyncClient(timeout=30.0, transport=traffic.httpx_async_transport("robot"))
+        try:
+            resp = await client.post(f"{self.base_url}/protocols", headers=self.headers,
+                                     files={"files": (filename, protocol.encode(), "text/x-python")})
+            resp.raise_for_status()
+            protocol_id = resp.json()["data"]["id"]
+            resp = await client.post(f"{self.base_url}/runs", headers=self.headers,
+                                     json={"data": {"protocolId": protocol_id}})
+            resp.raise_for_status()
+            run_id = resp.json()["data"]["id"]
+            resp = await client.post(f"{self.base_url}/runs/{run_id}/actions", headers=self.headers,
+                                     json={"data": {"actionType": "play"}})
+            resp.raise_for_status()
+
+            deadline = time.monotonic() + SCHEDULER_RUN_TIMEOUT
+            while True:
+                await asyncio.sleep(SCHEDULER_POLL_SECONDS)
+                resp = await client.get(f"{self.base_url}/runs/{run_id}", headers=self.headers)
+                resp.raise_for_status()
+                status = resp.json()["data"]["status"]
+                if status in TERMINAL_RUN_STATUSES:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Run {run_id} still {status} after {SCHEDULER_RUN_TIMEOUT:.0f}s")
+            if status != "succeeded":
+                raise RuntimeError(f"Run {run_id} {status}")
+            return run_id
+        finally:
+            if self._client is None:
+                await client.aclose()
+
+
+class PlateReader:
+    """Absorbance reads through a ``byonoy_devices``-compatible module, off the event loop."""
+
+    def __init__(self, module_name: str = "byonoy_devices", wavelength: int = 450):
+        self.module_name = module_name
+        self.wavelength = wavelength
+        self._sdk = None
+        self._handle = None
+
+    def _connect(self):
+        if self._handle is None:
+            sdk = traffic.load_module(self.module_name)
+            devices = sdk.available_devices()
+            if not devices:
+                raise RuntimeError("No Byonoy devices found")
+            result_code, handle = sdk.open_device(devices[0])
+            if result_code != sdk.ErrorCode.NO_ERROR:
+                raise RuntimeError(f"Failed to connect: {result_code}")
+            self._sdk, self._handle = sdk, handle
+        return self._sdk, self._handle
+
+    def _read(self, plate_map: dict[int, tuple]) -> list[float]:
+        sdk, handle = self._connect()
+        config = sdk.Abs96SingleMeasurementConfig()
+        config.sample_wavelength = self.wavelength
+        result_code = sdk.abs96_initialize_single_measurement(handle, config)
+        if result_code != sdk.ErrorCode.NO_ERROR:
+            raise RuntimeError(f"Initialize failed: {result_code}")
+        # Only the simulator needs to be told what is on the plate
+        if hasattr(sdk, "insert_plate"):
+            sdk.insert_plate(handle, plate_map)
+        try:
+            result_code, values = sdk.abs96_single_measure(handle, config)
+        finally:
+            if hasattr(sdk, "remove_plate"):
+                sdk.remove_plate(handle)
+        if result_code != sdk.ErrorCode.NO_ERROR:
+            raise RuntimeError(f"Measurement failed: {result_code}")
+        return list(values)
+
+    async def read(self, plate_map: dict[int, tuple]) -> list[float]:
+        return await asyncio.to_thread(self._read, plate_map)
+
+
+# ---------------------------------------------------------------------------
+# Plates and results
+# ---------------------------------------------------------------------------
+
+
+def _well_index(well: str) -> int:
+    return "ABCDEFGH".index(well[0]) * 12 + int(well[1:]) - 1
+
+
+@dataclass(slots=True)
+class Plate:
+    index: int
+    conditions: tuple[ScreenCondition, ...]
+    wells: list[list[list[str]]]  # condition -> standard -> replicate wells
+    protocol: str = ""
+    run_id: Optional[str] = None
+    robot_started: float = 0.0
+    robot_finished: float = 0.0
+    read_started: float = 0.0
+    read_finished: float = 0.0
+
+    def plate_map(self, concentrations: Sequence[float]) -> dict[int, tuple]:
+        """Well index -> (concentration, aspiration speed, dispense speed, mix repetitions)."""
+        return {
+            _well_index(well): (conc, c.aspiration_speed, c.dispense_speed, c.mix_repetitions)
+            for c, standards in zip(self.conditions, self.wells)
+            for conc, replicates in zip(concentrations, standards)
+            for well in replicates
+        }
+
+
+@dataclass(slots=True)
+class ConditionResult:
+    condition: ScreenCondition
+    plate: int
+    r_squared: float
+    cv: float
+
+    @property
+    def score(self) -> float:
+        return self.r_squared - self.cv / 100
+
+    def as_dict(self) -> dict:
+        return {
+            "asp_speed": self.condition.aspiration_speed,
+            "disp_speed": self.condition.dispense_speed,
+            "mix_rep": self.condition.mix_repetitions,
+            "plate": self.plate,
+            "r_squared": round(self.r_squared, 4),
+            "cv": round(self.cv, 2),
+            "score": round(self.score, 4),
+        }
+
+
+@dataclass(slots=True)
+class PlateResult:
+    plate: Plate
+    conditions: list[ConditionResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def curve_metrics(concentrations: Sequence[float], readings: Sequence[Sequence[float]]) -> tuple[float, float]:
+    """R² of mean reading vs concentration, and mean CV (%) across replicate groups."""
+    means = [statistics.mean(r) for r in readings]
+    r_squared = statistics.correlation(concentrations, means) ** 2 if len(set(means)) > 1 else 0.0
+    cvs = [statistics.stdev(r) / statistics.mean(r) * 100 for r in readings if len(r) > 1 and statistics.mean(r)]
+    return r_squared, statistics.mean(cvs) if cvs else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+
+class ExperimentScheduler:
+    def __init__(self, robot: RobotRunner, reader: PlateReader,
+                 concentrations: Sequence[float] = (0, 10, 20, 50, 100, 200), replicates: int = 3,
+                 max_in_flight: int = SCHEDULER_MAX_IN_FLIGHT):
+        if not (1 <= replicates <= 8) or not (1 <= len(concentrations) <= 12):
+            raise ProtocolError("Screening plates need 1-8 replicates and 1-12 concentrations")
+        if max_in_flight < 1:
+            raise ProtocolError("max_in_flight must be at least 1")
+        self.robot = robot
+        self.reader = reader
+        self.concentrations = tuple(concentrations)
+        self.replicates = replicates
+        self.max_in_flight = max_in_flight
+        self.plates: list[Plate] = []
+        self.started = 0.0
+        self.finished = 0.0
+
+    @property
+    def conditions_per_plate(self) -> int:
+        return (12 // len(self.concentrations)) * (8 // self.replicates)
+
+    def batch(self, conditions: Sequence[ScreenCondition]) -> list[Plate]:
+        """Split *conditions* into full plates and compile each plate's protocol."""
+        per_plate = self.conditions_per_plate
+        plates = []
+        for index, start in enumerate(range(0, len(conditions), per_plate)):
+            chunk = tuple(conditions[start:start + per_plate])
+            template = compile_protocol(parameter_screen(self.concentrations, chunk, replicates=self.replicates))
+            plates.append(Plate(index, chunk, screen_wells(len(self.concentrations), self.replicates, len(chunk)),
+                                template.render()))
+        return plates
+
+    def _analyse(self, plate: Plate, readings: list[float]) -> PlateResult:
+        result = PlateResult(plate)
+        for condition, standards in zip(plate.conditions, plate.wells):
+            values = [[readings[_well_index(w)] for w in replicates] for replicates in standards]
+            r_squared, cv = curve_metrics(self.concentrations, values)
+            result.conditions.append(ConditionResult(condition, plate.index, r_squared, cv))
+        return result
+
+    async def run(self, conditions: Sequence[ScreenCondition]) -> AsyncIterator[PlateResult]:
+        """Pipette and read all plates, yielding each plate's results as its read completes."""
+        self.plates = self.batch(conditions)
+        robot_lock, reader_lock = asyncio.Lock(), asyncio.Lock()
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        finished: asyncio.Queue[PlateResult] = asyncio.Queue()
+        self.started = time.monotonic()
+
+        async def process(plate: Plate) -> None:
+            async with in_flight:
+                try:
+                    async with robot_lock:
+                        plate.robot_started = time.monotonic()
+                        plate.run_id = await self.robot.run(plate.protocol, f"screen_plate_{plate.index + 1}.py")
+                        plate.robot_finished = time.monotonic()
+                    async with reader_lock:
+                        plate.read_started = time.monotonic()
+                        readings = await self.reader.read(plate.plate_map(self.concentrations))
+                        plate.read_finished = time.monotonic()
+                    result = self._analyse(plate, readings)
+                except Exception as e:
+                    result = PlateResult(plate, error=str(e))
+                await finished.put(result)
+
+        tasks = [asyncio.create_task(process(plate)) for plate in self.plates]
+        try:
+            for _ in tasks:
+                yield await finished.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.finished = time.monotonic()
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        done = [p for p in self.plates if p.read_finished]
+        robot_busy = sum(p.robot_finished - p.robot_started for p in self.plates if p.robot_finished)
+        reader_busy = sum(p.read_finished - p.read_started for p in done)
+        return {
+            "plates": len(done),
+            "conditions": sum(len(p.conditions) for p in done),
+            "elapsed_s": round(elapsed, 2),
+            "plates_per_hour": round(len(done) / elapsed * 3600, 2) if elapsed else 0.0,
+            "robot_utilization": round(robot_busy / elapsed, 3) if elapsed else 0.0,
+            "reader_utilization": round(reader_busy / elapsed, 3) if elapsed else 0.0,
+            "sequential_s": round(robot_busy + reader_busy, 2),
+            "speedup": round((robot_busy + reader_busy) / elapsed, 2) if elapsed else 0.0,
+        }
@@ -0,0 +1,162 @@
+"""
+Shared MCP server instance, tool registration and lazy imports.
+
+Tool modules in ``opentrons_agent.tools`` register themselves on the
+``mcp`` instance defined here through :func:`tool`.  They must keep module
+level imports light: heavy or optional dependencies (the Byonoy reader SDK,
+NumPy, ``requests``) are loaded with :func:`lazy_import` the first time a tool
+actually needs them, so starting the server – and trivial tools such as
+``get_available_labware`` – never pays for them, and a missing SDK only
+breaks the tools that use it.
+"""
+import functools
+import importlib
+import inspect
+import json
+import os
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+
+from mcp.server.fastmcp import FastMCP
+
+from . import profiling
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:  # orjson is optional; stdlib json gives the same output, slower
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), default=str)
+
+# Initialize the FastMCP server
+mcp = FastMCP("Opentrons Agent")
+
+# Opentrons robot configuration
+ROBOT_IP = os.getenv("OPENTRONS_ROBOT_HOST", "192.168.0.83:31950")
+HEADERS = {"opentrons-version": "2"}
+# Bounded so an unreachable robot cannot hold the tool call until the backend's 30 s kill
+ROBOT_REQUEST_TIMEOUT = float(os.getenv("ROBOT_REQUEST_TIMEOUT", 10.0))
+# Read-only robot state is shared between server processes for this long (0 = always fetch)
+ROBOT_STATE_TTL = float(os.getenv("ROBOT_STATE_TTL", 2.0))
+
+# Plate reader SDK; "opentrons_agent.fake_reader" simulates one
+BYONOY_MODULE = os.getenv("BYONOY_MODULE", "byonoy_devices")
+
+# ---------------------------------------------------------------------------
+# Lazy imports – module name -> seconds spent importing it, for the profile
+# report printed by ``opentrons_mcp.py --profile-imports``.
+# ---------------------------------------------------------------------------
+
+IMPORT_TIMINGS: dict[str, float] = {}
+
+
+def lazy_import(module_name: str):
+    """Import *module_name* on first use and remember how long it took."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMINGS[module_name] = time.perf_counter() - started
+    return module
+
+# ---------------------------------------------------------------------------
+# Tracing – the backend passes its active span as TRACEPARENT; tool and robot
+# spans are appended to TRACE_EXPORT_PATH next to the backend's own spans.
+# ---------------------------------------------------------------------------
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+_TRACE_STACK: list[tuple[str, str]] = []
+if os.getenv("TRACEPARENT", "").count("-") == 3:
+    _, _trace_id, _parent_span_id, _ = os.environ["TRACEPARENT"].split("-")
+    _TRACE_STACK.append((_trace_id, _parent_span_id))
+
+
+@contextmanager
+def _span(name: str, **attributes):
+    trace_id, parent_id = _TRACE_STACK[-1] if _TRACE_STACK else (secrets.token_hex(16), None)
+    span_id = secrets.token_hex(8)
+    _TRACE_STACK.append((trace_id, span_id))
+    start, started = time.time(), time.perf_counter()
+    try:
+        yield
+    except BaseException as exc:
+        attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        _TRACE_STACK.pop()
+        if TRACE_EXPORT_PATH:
+            record = {
+                "trace_id": trace_id, "span_id": span_id, "parent_id": parent_id, "name": name,
+                "start": start, "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "process": "mcp", "attributes": attributes,
+            }
+            with open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, default=str) + "\n")
+
+
+def tool():
+    """``mcp.tool()`` plus a timing span around every invocation.
+
+    Tools can also be profiled on demand as ``tool:<name>`` (see
+    :mod:`opentrons_agent.profiling`).
+    """
+    def decorator(fn):
+        call = profiling.profiled(f"tool:{fn.__name__}")(fn)
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with _span(f"tool.{fn.__name__}", tool=fn.__name__):
+                    return await call(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _span(f"tool.{fn.__name__}", tool=fn.__name__):
+                    return call(*args, **kwargs)
+        mcp.tool()(wrapper)
+        return wrapper
+    return decorator
+
+
+_HTTP_SESSION = None
+
+
+def _http():
+    """``requests``, or a session that records/replays robot traffic when ``TRAFFIC_MODE`` is set."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        _HTTP_SESSION = lazy_import("opentrons_agent.traffic").requests_session("robot") or lazy_import("requests")
+    return _HTTP_SESSION
+
+
+def _robot_get(path: str) -> "requests.Response":
+    with _span("robot.request", robot=ROBOT_IP, method="GET", endpoint=path):
+        return _http().get(f"http://{ROBOT_IP}{path}", headers=HEADERS, timeout=ROBOT_REQUEST_TIMEOUT)
+
+
+def reader_sdk():
+    """The plate reader SDK (``BYONOY_MODULE``), recorded or replayed when ``TRAFFIC_MODE`` is set."""
+    return lazy_import("opentrons_agent.traffic").load_module(BYONOY_MODULE, importer=lazy_import)
+
+
+_ROBOT_STATE_CACHE = None
+
+
+def _robot_state(path: str):
+    """JSON of a read-only robot endpoint, fetched once per ``ROBOT_STATE_TTL`` across all server processes."""
+    global _ROBOT_STATE_CACHE
+
+    def fetch():
+        response = _robot_get(path)
+        response.raise_for_status()
+        return response.json()
+
+    if ROBOT_STATE_TTL <= 0:
+        return fetch()
+    if _ROBOT_STATE_CACHE is None:
+        _ROBOT_STATE_CACHE = lazy_import("opentrons_agent.shared_cache").SharedCache(f"robot:{ROBOT_IP}")
+    return _ROBOT_STATE_CACHE.get_or_compute(path, fetch, ttl=ROBOT_STATE_TTL)
@@ -0,0 +1,213 @@
+"""
+Cross-process cache on local disk.
+
+The backend runs several uvicorn workers and every MCP tool call is its own
+server process, so an in-memory cache is duplicated (and cold) in each of
+them.  :class:`SharedCache` keeps entries in one SQLite database in WAL mode
+(``SHARED_CACHE_PATH``), which any number of processes on the host can read
+concurrently while one writes, without an external service:
+
+* entries are JSON values under a ``(namespace, key)`` with a TTL; expired
+  entries read as missing and are removed by :meth:`SharedCache.evict`,
+* ``SHARED_CACHE_MAX_ENTRIES`` caps the table; beyond it the least recently
+  read entries are evicted (reads refresh their timestamp at most once a
+  second, so hits stay read-only),
+* :meth:`SharedCache.get_or_compute` is atomic across processes: one caller
+  computes while the others wait for its result, coordinated through a lock
+  row with a lease (``SHARED_CACHE_LOCK_LEASE``).  The owner renews the
+  lease while it computes, so a long computation is never joined by a
+  second one, and a crashed owner cannot block a key for ever.
+
+Only the standard library is used, so the backend can import this module
+next to the MCP server.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+SHARED_CACHE_PATH = Path(os.getenv("SHARED_CACHE_PATH", Path.home() / ".opentrons_agent" / "shared_cache.sqlite3"))
+SHARED_CACHE_TTL = float(os.getenv("SHARED_CACHE_TTL", 300))  # seconds
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", 10000))
+SHARED_CACHE_LOCK_LEASE = float(os.getenv("SHARED_CACHE_LOCK_LEASE", 30))  # seconds
+LOCK_POLL_SECONDS = 0.01
+TOUCH_INTERVAL = 1.0  # refresh an entry's access time at most this often
+EVICT_EVERY = 100  # writes between eviction passes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS locks (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+_MISSING = object()
+
+
+class SharedCache:
+    """One namespace of the on-disk cache; safe to share between threads."""
+
+    def __init__(self, namespace: str = "default", path: Optional[Path] = None, *,
+                 ttl: float = SHARED_CACHE_TTL, max_entries: int = SHARED_CACHE_MAX_ENTRIES):
+        self.namespace = namespace
+        self.path = Path(path or SHARED_CACHE_PATH)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit: every statement is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # -- basic operations -----------------------------------------------
+
+    def _lookup(self, key: str) -> Any:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return _MISSING
+        if now - row[2] > TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                         (now, self.namespace, key))
+        return json.loads(row[0])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value, separators=(",", ":"), default=str),
+             now + (self.ttl if ttl is None else ttl), now),
+        )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def delete(self, key: str) -> bool:
+        cur = self._conn().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+        return cur.rowcount > 0
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+
+    def evict(self) -> int:
+        """Drop expired entries and stale locks, then the least recently read entries over the cap."""
+        now = time.time()
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+        conn.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+        excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += conn.execute(
+                "DELETE FROM entries WHERE (namespace, key) IN "
+                "(SELECT namespace, key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+        return removed
+
+    # -- get-or-compute ---------------------------------------------------
+
+    def _acquire(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM locks WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                     (self.namespace, key, now))
+        owner = uuid.uuid4().hex
+        cur = conn.execute("INSERT OR IGNORE INTO locks (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                           (self.namespace, key, owner, now + SHARED_CACHE_LOCK_LEASE))
+        return owner if cur.rowcount == 1 else None
+
+    def _heartbeat(self, key: str, owner: str, stop: threading.Event) -> None:
+        """Renew the lock lease of *owner* until *stop* is set."""
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        try:
+            while not stop.wait(SHARED_CACHE_LOCK_LEASE / 3):
+                try:
+                    conn.execute("UPDATE locks SET expires_at = ? WHERE namespace = ? AND key = ? AND owner = ?",
+                                 (time.time() + SHARED_CACHE_LOCK_LEASE, self.namespace, key, owner))
+                except sqlite3.Error:
+                    pass  # retried on the next beat, well within the lease
+        finally:
+            conn.close()
+
+    def _release(self, key: str, owner: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE namespace = ? AND key = ? AND owner = ?",
+                             (self.namespace, key, owner))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value, computing it once across all processes when missing.
+
+        Waiters poll until the owner stores the value.  If the owner fails
+        nothing is stored and the next waiter computes instead.  While
+        *compute* runs the owner renews its lease every third of
+        ``SHARED_CACHE_LOCK_LEASE``, so waiters only take over once the
+        owner's process is gone.
+        """
+        value = self.get(key, _MISSING)
+        while value is _MISSING:
+            owner = self._acquire(key)
+            if owner is not None:
+                stop = threading.Event()
+                heartbeat = threading.Thread(target=self._heartbeat, args=(key, owner, stop),
+                                             name="shared-cache-lease", daemon=True)
+                heartbeat.start()
+                try:
+                    value = self._lookup(key)  # stored while we waited for the lock
+                    if value is _MISSING:
+                        value = compute()
+                        self.set(key, value, ttl)
+                finally:
+                    stop.set()
+                    heartbeat.join()
+                    self._release(key, owner)
+                return value
+            time.sleep(LOCK_POLL_SECONDS)
+            value = self._lookup(key)
+        return value
+
+    def stats(self) -> dict:
+        entries = self._conn().execute("SELECT COUNT(*) FROM entries WHERE namespace = ? AND expires_at > ?",
+                                       (self.namespace, time.time())).fetchone()[0]
+        return {"namespace": self.namespace, "path": str(self.path), "entries": entries,
+                "hits": self.hits, "misses": self.misses}
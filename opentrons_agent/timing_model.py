@@ -0,0 +1,318 @@
+"""
+Command timing model calibrated from real robot runs.
+
+Each command type (``aspirate``, ``dispense``, ``moveToWell``, ...) gets a
+linear model of its duration over four features::
+
+    seconds = b0 + b1 * volume / flowRate + b2 * volume + b3 * slot_distance
+
+fitted by least squares to the ``startedAt``/``completedAt`` timestamps of
+``/runs/{id}/commands``.  Slot distance is the distance in deck slots
+between the labware of consecutive commands, resolved through the run's
+``loadLabware`` commands.  Command types with too few samples fall back to
+their mean duration.
+
+Calibrated models are saved as numbered JSON files in ``TIMING_MODEL_DIR``
+(``timing_model_v0001.json``, ``v0002``, ...) together with the runs they were
+fitted on and their prediction error.  :func:`get_timing_model` loads the
+newest version (or ``TIMING_MODEL_VERSION``) once per process; until a model
+has been calibrated the built-in defaults approximate the old hand-written
+estimate.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+TIMING_MODEL_DIR = Path(os.getenv("TIMING_MODEL_DIR", Path.home() / ".opentrons_agent" / "timing_models"))
+TIMING_MODEL_VERSION = os.getenv("TIMING_MODEL_VERSION")  # pin a version; newest when unset
+MIN_SAMPLES = 3  # below this a command type is fitted as its mean duration
+HOLDOUT_EVERY = 5  # every 5th sample is held out to measure prediction error
+
+FEATURES = ("intercept", "volume_over_flow_rate", "volume", "slot_distance")
+
+# Built-in coefficients: liquid handling takes volume / flow rate and each
+# move between labware costs a flat 2.5 s (the former "+5 per transfer").
+DEFAULT_COEFFICIENTS = {
+    "aspirate": [0.0, 1.0, 0.0, 0.0],
+    "dispense": [0.0, 1.0, 0.0, 0.0],
+    "moveToWell": [2.5, 0.0, 0.0, 0.0],
+    "pickUpTip": [0.0, 0.0, 0.0, 0.0],
+    "dropTip": [0.0, 0.0, 0.0, 0.0],
+}
+
+
+# ---------------------------------------------------------------------------
+# Feature extraction
+# ---------------------------------------------------------------------------
+
+
+def slot_position(slot) -> tuple[int, int] | None:
+    """Deck grid position of an OT-2 style ("1".."12") or Flex style ("A1".."D4") slot."""
+    slot = str(slot)
+    if slot.isdigit():
+        n = int(slot) - 1
+        return n % 3, n // 3
+    if len(slot) == 2 and slot[0] in "ABCD" and slot[1].isdigit():
+        return int(slot[1]) - 1, "DCBA".index(slot[0])
+    return None
+
+
+def slot_distance(a, b) -> float:
+    """Distance between two deck slots in slot pitches; 0 when either is unknown."""
+    pa, pb = slot_position(a), slot_position(b)
+    if pa is None or pb is None:
+        return 0.0
+    return math.hypot(pa[0] - pb[0], pa[1] - pb[1])
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def features(volume: float = 0.0, flow_rate: float | None = None, distance: float = 0.0) -> list[float]:
+    return [1.0, volume / flow_rate if flow_rate else 0.0, volume, distance]
+
+
+def command_samples(commands: Iterable[dict]) -> Iterator[tuple[str, list[float], float]]:
+    """Yield ``(command_type, features, seconds)`` for every completed command of one run."""
+    labware_slots = {}
+    previous_slot = None
+    for command in commands:
+        params = command.get("params") or {}
+        if command.get("commandType") == "loadLabware":
+            labware_id = (command.get("result") or {}).get("labwareId") or params.get("labwareId")
+            slot = (params.get("location") or {}).get("slotName")
+            if labware_id and slot:
+                labware_slots[labware_id] = slot
+        slot = labware_slots.get(params.get("labwareId"))
+        distance = slot_distance(previous_slot, slot) if previous_slot and slot else 0.0
+        if slot:
+            previous_slot = slot
+        if command.get("status") != "succeeded" or not command.get("startedAt") or not command.get("completedAt"):
+            continue
+        seconds = _parse_time(command["completedAt"]) - _parse_time(command["startedAt"])
+        yield (
+            command["commandType"],
+            features(float(params.get("volume") or 0.0), params.get("flowRate"), distance),
+            seconds,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+
+class TimingModel:
+    """Per-command-type duration regressions and the composite estimates built on them."""
+
+    __slots__ = ("coefficients", "version", "created_at", "runs", "errors")
+
+    def __init__(self, coefficients: dict[str, list[float]], version: int = 0, created_at: str | None = None,
+                 runs: list[str] | None = None, errors: dict | None = None):
+        self.coefficients = {name: np.asarray(c, dtype=float) for name, c in coefficients.items()}
+        self.version = version
+        self.created_at = created_at
+        self.runs = runs or []
+        self.errors = errors or {}
+
+    @classmethod
+    def default(cls) -> "TimingModel":
+        return cls(DEFAULT_COEFFICIENTS)
+
+    @property
+    def label(self) -> str:
+        if not self.version:
+            return "built-in defaults (uncalibrated)"
+        overall = (self.errors.get("holdout") or self.errors.get("training") or {}).get("overall")
+        error = f", MAE {overall['mae_s']:.2f}s / {overall['mape_pct']:.0f}%" if overall else ""
+        return f"v{self.version} from {len(self.runs)} run(s){error}"
+
+    # -- predictions ---------------------------------------------------
+
+    def predict(self, command_type: str, volume: float = 0.0, flow_rate: float | None = None,
+                distance: float = 0.0) -> float:
+        return self.predict_row(command_type, features(volume, flow_rate, distance))
+
+    def predict_row(self, command_type: str, row: list[float]) -> float:
+        coefficients = self.coefficients.get(command_type)
+        if coefficients is None:
+            if command_type not in DEFAULT_COEFFICIENTS:
+                return 0.0
+            coefficients = np.asarray(DEFAULT_COEFFICIENTS[command_type])
+        return max(0.0, float(coefficients @ row))
+
+    def move_seconds(self, distance: float = 0.0) -> float:
+        return self.predict("moveToWell", distance=distance)
+
+    def transfer_seconds(self, volume: float, aspiration_speed: float, dispense_speed: float,
+                         distance: float = 0.0, new_tip: bool = True) -> float:
+        """One transfer: (tip pickup), move, aspirate, move, dispense, (tip drop)."""
+        seconds = (
+            2 * self.move_seconds(distance)
+            + self.predict("aspirate", volume, aspiration_speed)
+            + self.predict("dispense", volume, dispense_speed)
+        )
+        if new_tip:
+            seconds += self.predict("pickUpTip") + self.predict("dropTip")
+        return seconds
+
+    def mix_seconds(self, volume: float, repetitions: int, aspiration_speed: float, dispense_speed: float) -> float:
+        """Mix in the current well: one positioning move, then aspirate/dispense cycles."""
+        cycle = self.predict("aspirate", volume, aspiration_speed) + self.predict("dispense", volume, dispense_speed)
+        return self.move_seconds(0.0) + repetitions * cycle
+
+    # -- persistence ---------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "features": list(FEATURES),
+            "runs": self.runs,
+            "coefficients": {name: c.round(6).tolist() for name, c in self.coefficients.items()},
+            "errors": self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TimingModel":
+        return cls(data["coefficients"], data.get("version", 0), data.get("created_at"),
+                   data.get("runs"), data.get("errors"))
+
+
+def _fit_type(rows: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    if len(durations) < MIN_SAMPLES:
+        return np.array([durations.mean(), 0.0, 0.0, 0.0])
+    coefficients, *_ = np.linalg.lstsq(rows, durations, rcond=None)
+    return coefficients
+
+
+def _error_report(model: TimingModel, samples: list[tuple[str, list[float], float]]) -> dict:
+    by_type: dict[str, list[tuple[float, float]]] = {}
+    for command_type, row, seconds in samples:
+        by_type.setdefault(command_type, []).append((model.predict_row(command_type, row), seconds))
+
+    def summary(pairs):
+        predicted, actual = np.array(pairs).T
+        abs_error = np.abs(predicted - actual)
+        nonzero = actual > 0
+        mape = float((abs_error[nonzero] / actual[nonzero]).mean() * 100) if nonzero.any() else 0.0
+        return {"n": len(pairs), "mae_s": round(float(abs_error.mean()), 4), "mape_pct": round(mape, 2)}
+
+    report = {name: summary(pairs) for name, pairs in sorted(by_type.items())}
+    if by_type:
+        report["overall"] = summary([pair for pairs in by_type.values() for pair in pairs])
+    return report
+
+
+def fit(runs: dict[str, list[dict]]) -> TimingModel:
+    """Fit a model to ``{run_id: commands}``.
+
+    Prediction error is measured on every ``HOLDOUT_EVERY``-th sample of each
+    command type with a model fitted to the rest, then the final coefficients are refitted on
+    all samples.
+    """
+    samples = [s for commands in runs.values() for s in command_samples(commands)]
+    if not samples:
+        raise ValueError("No completed commands with timestamps to calibrate from")
+
+    def fit_samples(subset):
+        grouped: dict[str, tuple[list, list]] = {}
+        for command_type, row, seconds in subset:
+            rows, durations = grouped.setdefault(command_type, ([], []))
+            rows.append(row)
+            durations.append(seconds)
+        return TimingModel({
+            name: _fit_type(np.array(rows), np.array(durations)) for name, (rows, durations) in grouped.items()
+        })
+
+    errors = {}
+    if len(samples) >= 2 * HOLDOUT_EVERY:
+        # Hold out per command type so every type is both trained and scored
+        seen: dict[str, int] = {}
+        train, holdout = [], []
+        for sample in samples:
+            seen[sample[0]] = n = seen.get(sample[0], 0) + 1
+            (holdout if n % HOLDOUT_EVERY == 0 else train).append(sample)
+        errors["holdout"] = _error_report(fit_samples(train), holdout)
+    model = fit_samples(samples)
+    errors["training"] = _error_report(model, samples)
+    model.errors = errors
+    model.runs = sorted(runs)
+    return model
+
+
+def evaluate(model: TimingModel, commands: list[dict]) -> dict:
+    """Prediction error of *model* on the commands of a run it was not fitted on."""
+    return _error_report(model, list(command_samples(commands)))
+
+
+# ---------------------------------------------------------------------------
+# Versioned storage
+# ---------------------------------------------------------------------------
+
+
+def _versions() -> list[int]:
+    if not TIMING_MODEL_DIR.is_dir():
+        return []
+    return sorted(
+        int(path.stem.rsplit("_v", 1)[1]) for path in TIMING_MODEL_DIR.glob("timing_model_v*.json")
+        if path.stem.rsplit("_v", 1)[1].isdigit()
+    )
+
+
+def _path(version: int) -> Path:
+    return TIMING_MODEL_DIR / f"timing_model_v{version:04d}.json"
+
+
+def save(model: TimingModel) -> Path:
+    """Store *model* as the next version and make it this process's active model."""
+    global _MODEL
+    TIMING_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    with _LOCK:
+        model.version = (_versions() or [0])[-1] + 1
+        model.created_at = datetime.now(timezone.utc).isoformat()
+        path = _path(model.version)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(model.to_dict(), indent=2))
+        tmp.replace(path)
+        _MODEL = model
+    return path
+
+
+def load(version: int | None = None) -> TimingModel:
+    """Load a stored version (newest when *version* is None); built-in defaults if none exist."""
+    if version is None:
+        versions = _versions()
+        if not versions:
+            return TimingModel.default()
+        version = versions[-1]
+    try:
+        return TimingModel.from_dict(json.loads(_path(version).read_text()))
+    except (OSError, ValueError, KeyError) as e:
+        # stdout is the MCP JSON-RPC channel
+        print(f"Failed to load timing model v{version}: {e}", file=sys.stderr)
+        return TimingModel.default()
+
+
+_MODEL: TimingModel | None = None
+_LOCK = threading.Lock()
+
+
+def get_timing_model() -> TimingModel:
+    """The process-wide model, loaded on first use."""
+    global _MODEL
+    if _MODEL is None:
+        with _LOCK:
+            if _MODEL is None:
+                _MODEL = load(int(TIMING_MODEL_VERSION) if TIMING_MODEL_VERSION else None)
+    return _MODEL
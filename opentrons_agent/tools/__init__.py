@@ -0,0 +1,31 @@
+"""MCP tool modules.
+
+Each module registers its tools on import.  Modules are imported one by one
+by :func:`load_tool_modules` so the import cost of each can be reported.
+"""
+import importlib
+import time
+
+TOOL_MODULES = (
+    "robot",
+    "labware",
+    "protocols",
+    "simulation",
+    "optimization",
+    "reader",
+    "analytics",
+    "timing",
+)
+
+# Optional / heavy dependencies that tools import on first use.
+LAZY_DEPENDENCIES = ("requests", "byonoy_devices")
+
+
+def load_tool_modules() -> dict[str, float]:
+    """Import every tool module and return seconds spent per module."""
+    timings = {}
+    for name in TOOL_MODULES:
+        started = time.perf_counter()
+        importlib.import_module(f"{__name__}.{name}")
+        timings[name] = time.perf_counter() - started
+    return timings
@@ -0,0 +1,40 @@
+"""Assay analytics tools."""
+import statistics
+
+from ..server import tool
+
+@tool()
+def calculate_assay_metrics(absorbance_values: str, concentrations: str = "0,10,20,50,100,200") -> str:
+    """Calculate R² and CV from tartrazine standard curve data"""
+    try:
+        # Parse inputs
+        abs_list = [float(x.strip()) for x in absorbance_values.split(',')]
+        conc_list = [float(x.strip()) for x in concentrations.split(',')]
+        
+        # Take first 6 values for standard curve
+        abs_curve = abs_list[:6]
+        
+        # Calculate R² (simplified linear regression)
+        n = len(abs_curve)
+        mean_conc = statistics.mean(conc_list)
+        mean_abs = statistics.mean(abs_curve)
+        
+        numerator = sum((conc_list[i] - mean_conc) * (abs_curve[i] - mean_abs) for i in range(n))
+        denom_conc = sum((conc_list[i] - mean_conc) ** 2 for i in range(n))
+        denom_abs = sum((abs_curve[i] - mean_abs) ** 2 for i in range(n))
+        
+        r_squared = (numerator ** 2) / (denom_conc * denom_abs) if denom_conc * denom_abs > 0 else 0
+        
+        # Calculate CV for replicates (assuming triplicates)
+        cv_values = []
+        for i in range(0, min(len(abs_list), 18), 3):  # Every 3 values
+            replicate_group = abs_list[i:i+3]
+            if len(replicate_group) == 3:
+                cv = (statistics.stdev(replicate_group) / statistics.mean(replicate_group)) * 100
+                cv_values.append(cv)
+        
+        avg_cv = statistics.mean(cv_values) if cv_values else 0
+        
+        return f"R²: {r_squared:.4f}, Average CV: {avg_cv:.2f}%"
+    except Exception as e:
+        return f"Error calculating metrics: {str(e)}"
@@ -0,0 +1,200 @@
+"""Labware catalog and deck layout tools (no robot access)."""
+from ..server import lazy_import, tool
+
+@tool()
+def validate_labware_exists(labware_name: str) -> str:
+    """Check if labware type exists in OpenTrons library"""
+    # Common OpenTrons labware (this would ideally query the robot's API)
+    valid_labware = {
+        # Plates
+        'corning_96_wellplate_360ul_flat': '96-well flat bottom plate',
+        'nest_96_wellplate_200ul_flat': '96-well NEST plate',
+        'biorad_96_wellplate_200ul_pcr': '96-well PCR plate',
+        
+        # Reservoirs  
+        'nest_12_reservoir_15ml': '12-channel reservoir',
+        'nest_1_reservoir_195ml': 'Single reservoir',
+        'agilent_1_reservoir_290ml': 'Agilent reservoir',
+        
+        # Tip racks
+        'opentrons_flex_96_tiprack_1000ul': '1000µL tip rack',
+        'opentrons_flex_96_tiprack_200ul': '200µL tip rack', 
+        'opentrons_flex_96_tiprack_50ul': '50µL tip rack',
+        
+        # Tubes
+        'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap': '24-tube rack',
+        'nest_15_tuberack_15000ul': '15mL tube rack'
+    }
+    
+    if labware_name in valid_labware:
+        return f"✅ Valid labware: {labware_name} ({valid_labware[labware_name]})"
+    else:
+        suggestions = [name for name in valid_labware.keys() if labware_name.lower() in name.lower()]
+        if suggestions:
+            return f"❌ Invalid labware: {labware_name}. Did you mean: {', '.join(suggestions[:3])}?"
+        else:
+            return f"❌ Invalid labware: {labware_name}. Available options: {', '.join(list(valid_labware.keys())[:5])}..."
+
+@tool()
+def find_labware_by_description(description: str) -> str:
+    """Find labware by human-friendly description (e.g., '96 well plate', 'tip rack')"""
+    description_lower = description.lower()
+    
+    labware_map = {
+        "96 well": ["corning_96_wellplate_360ul_flat", "nest_96_wellplate_200ul_flat"],
+        "plate": ["corning_96_wellplate_360ul_flat", "nest_96_wellplate_200ul_flat"],
+        "reservoir": ["nest_12_reservoir_15ml", "nest_1_reservoir_195ml"],
+        "tip": ["opentrons_flex_96_tiprack_1000ul", "opentrons_flex_96_tiprack_200ul","opentrons_flex_96_tiprack_50ul"],
+        "1000": ["opentrons_flex_96_tiprack_1000ul"],
+        "200": ["opentrons_flex_96_tiprack_200ul", "nest_96_wellplate_200ul_flat"],
+        "50":["opentrons_flex_96_tiprack_50ul"],
+        "tube": ["opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap"]
+    }
+    
+    matches = []
+    for keyword, labware_list in labware_map.items():
+        if keyword in description_lower:
+            matches.extend(labware_list)
+    
+    if matches:
+        unique_matches = list(set(matches))
+        return f"Found labware: {', '.join(unique_matches)}"
+    else:
+        return f"No labware found for '{description}'. Try: '96 well', 'reservoir', 'tip rack', 'tube rack'"
+
+@tool()
+def check_deck_layout(positions_and_labware: str) -> str:
+    """Validate deck layout doesn't have conflicts. Format: 'position:labware_type,position:labware_type'"""
+    try:
+        # Parse input like "1:corning_96_wellplate_360ul_flat,2:nest_12_reservoir_15ml"
+        layout = {}
+        pairs = positions_and_labware.split(',')
+        
+        for pair in pairs:
+            position, labware = pair.strip().split(':')
+            position = int(position)
+            
+            # Validate position range (OT-3 Flex has positions 1-12)
+            if not (1 <= position <= 12):
+                return f"❌ Invalid deck position: {position}. Must be 1-12"
+            
+            # Check for duplicate positions
+            if position in layout:
+                return f"❌ Position conflict: Position {position} used twice"
+            
+            layout[position] = labware.strip()
+        
+        # Check labware compatibility and spacing
+        conflicts = []
+        
+        # Check for height conflicts (tall items need space)
+        tall_labware = ['nest_15_tuberack_15000ul', 'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap']
+        for pos, labware in layout.items():
+            if any(tall in labware for tall in tall_labware):
+                # Check adjacent positions for conflicts
+                adjacent = [pos-3, pos+3, pos-1, pos+1]  # Up, down, left, right
+                for adj_pos in adjacent:
+                    if adj_pos in layout and adj_pos != pos:
+                        conflicts.append(f"Tall labware at position {pos} may interfere with position {adj_pos}")
+        
+        if conflicts:
+            return f"⚠️ Potential conflicts: {'; '.join(conflicts)}"
+        
+        # Generate layout visualization
+        result = "✅ Deck layout valid!\n\nLayout:\n"
+        for pos in sorted(layout.keys()):
+            result += f"Position {pos}: {layout[pos]}\n"
+        
+        return result
+        
+    except Exception as e:
+        return f"❌ Error parsing layout: {str(e)}. Use format: '1:labware_name,2:labware_name'"
+
+@tool()
+def suggest_optimal_deck_layout(required_labware: str) -> str:
+    """Suggest optimal deck positions for given labware. Format: 'labware1,labware2,labware3'"""
+    try:
+        labware_list = [item.strip() for item in required_labware.split(',')]
+        
+        # Positioning strategy: 
+        # - Plates in front row (1-3) for easy access
+        # - Reservoirs in middle (4-6) 
+        # - Tips in back (7-9)
+        # - Tall items spread out (10-12)
+        
+        suggestions = {}
+        position = 1
+        
+        # Sort by priority: plates first, then reservoirs, then tips, then everything else
+        priority_order = ['plate', 'reservoir', 'tip', 'tube']
+        
+        for priority in priority_order:
+            for labware in labware_list[:]:  # Copy to avoid modification during iteration
+                if priority in labware.lower():
+                    if priority == 'plate':
+                        suggestions[position] = labware
+                        position = min(position + 1, 3)
+                    elif priority == 'reservoir':
+                        if position <= 3:
+                            position = 4
+                        suggestions[position] = labware
+                        position = min(position + 1, 6)
+                    elif priority == 'tip':
+                        if position <= 6:
+                            position = 7
+                        suggestions[position] = labware
+                        position = min(position + 1, 9)
+                    else:  # tubes and other tall items
+                        if position <= 9:
+                            position = 10
+                        suggestions[position] = labware
+                        position = min(position + 1, 12)
+                    
+                    labware_list.remove(labware)
+        
+        # Place remaining items
+        for labware in labware_list:
+            if position <= 12:
+                suggestions[position] = labware
+                position += 1
+        
+        result = "Suggested deck layout:\n\n"
+        for pos in sorted(suggestions.keys()):
+            result += f"Position {pos}: {suggestions[pos]}\n"
+        
+        # Movement cost of one transfer cycle: tips -> reservoir -> plate -> tips
+        slots = {kind: next((pos for pos, lw in suggestions.items() if kind in lw.lower()), None)
+                 for kind in ('tip', 'reservoir', 'plate')}
+        if all(slots.values()):
+            timing_model = lazy_import("opentrons_agent.timing_model")
+            model = timing_model.get_timing_model()
+            path = [slots['tip'], slots['reservoir'], slots['plate'], slots['tip']]
+            cycle = sum(model.move_seconds(timing_model.slot_distance(a, b)) for a, b in zip(path, path[1:]))
+            result += f"\n⏱️ Movement per transfer cycle (tips → reservoir → plate): {cycle:.1f}s ({model.label})\n"
+        
+        if position > 12:
+            result += f"\n⚠️ Warning: Too many items for deck (need {len(required_labware.split(','))} positions, only 12 available)"
+        
+        return result
+        
+    except Exception as e:
+        return f"❌ Error: {str(e)}. Use format: 'labware1,labware2,labware3'"
+
+@tool()
+def get_available_labware() -> str:
+    """List all available labware types"""
+    labware_categories = {
+        "Plates": ["corning_96_wellplate_360ul_flat", "nest_96_wellplate_200ul_flat", "biorad_96_wellplate_200ul_pcr"],
+        "Reservoirs": ["nest_12_reservoir_15ml", "nest_1_reservoir_195ml", "agilent_1_reservoir_290ml"],
+        "Tip Racks": ["opentrons_flex_96_tiprack_1000ul", "opentrons_flex_96_tiprack_200ul", "opentrons_flex_96_tiprack_50ul"],
+        "Tube Racks": ["opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap", "nest_15_tuberack_15000ul"]
+    }
+    
+    result = "Available Labware:\n\n"
+    for category, items in labware_categories.items():
+        result += f"{category}:\n"
+        for item in items:
+            result += f"  - {item}\n"
+        result += "\n"
+    
+    return result
@@ -0,0 +1,163 @@
+"""Protocol generation tools."""
+from ..server import lazy_import, tool
+
+STANDARD_CONCENTRATIONS = [0, 10, 20, 50, 100, 200]  # µg/mL, one plate column each
+
+@tool()
+def create_tartrazine_assay_protocol(
+    aspiration_speed: float = 50.0,
+    dispense_speed: float = 50.0, 
+    mix_volume: int = 100,
+    mix_repetitions: int = 3,
+    transfer_volume: int = 200,
+    replicates: int = 1
+) -> str:
+    """Generate tartrazine standard curve protocol with liquid handling parameters for optimization.
+
+    replicates (1-8) fills that many rows of each standard's column; full
+    columns are pipetted with an 8-channel pipette in one move.  The protocol
+    is compiled once per layout and re-rendered with new parameters.
+    """
+    
+    # VALIDATION FIRST
+    errors = []
+    
+    # Speed validation (typical OT-3 ranges)
+    if not (1 <= aspiration_speed <= 1000):
+        errors.append(f"Aspiration speed {aspiration_speed} outside range 1-1000 µL/s")
+    if not (1 <= dispense_speed <= 1000):
+        errors.append(f"Dispense speed {dispense_speed} outside range 1-1000 µL/s")
+    
+    # Volume validation
+    if not (1 <= mix_volume <= 1000):
+        errors.append(f"Mix volume {mix_volume} outside range 1-1000 µL")
+    if not (1 <= transfer_volume <= 1000):
+        errors.append(f"Transfer volume {transfer_volume} outside range 1-1000 µL")
+    
+    # Repetition validation
+    if not (1 <= mix_repetitions <= 20):
+        errors.append(f"Mix repetitions {mix_repetitions} outside range 1-20")
+    if not (1 <= replicates <= 8):
+        errors.append(f"Replicates {replicates} outside range 1-8")
+    
+    # Return errors if validation fails
+    if errors:
+        return f"❌ VALIDATION ERRORS: {'; '.join(errors)}"
+    
+    # AUTO-SELECT PIPETTE based on volume
+    if transfer_volume <= 20:
+        pipette_name = "flex_1channel_20"
+    elif transfer_volume <= 300:
+        pipette_name = "flex_1channel_300"  
+    else:
+        pipette_name = "flex_1channel_1000"
+    
+    # COMPILE once per plate layout; parameters are substituted into the cached template
+    protocol_ir = lazy_import("opentrons_agent.protocol_ir")
+    multi_name = "flex_8channel_50" if transfer_volume <= 50 else "flex_8channel_1000"
+    template = protocol_ir.compile_protocol(protocol_ir.standard_curve(
+        tuple(STANDARD_CONCENTRATIONS),
+        volume=protocol_ir.Param("transfer_volume"),
+        replicates=replicates,
+        mix=(protocol_ir.Param("mix_repetitions", integer=True), protocol_ir.Param("mix_volume")),
+        aspirate_rate=protocol_ir.Param("aspiration_speed"),
+        dispense_rate=protocol_ir.Param("dispense_speed"),
+        pipette_names=((1, pipette_name), (8, multi_name)),
+    ))
+    values = dict(transfer_volume=transfer_volume, mix_repetitions=mix_repetitions, mix_volume=mix_volume,
+                  aspiration_speed=aspiration_speed, dispense_speed=dispense_speed)
+    try:
+        protocol_code = template.render(**values)
+    except protocol_ir.ProtocolError as e:
+        return f"❌ VALIDATION ERRORS: {e}"
+    
+    pipettes = " + ".join(p.load_name for p in template.ir.pipettes)
+    estimate = template.estimate_seconds(**values)
+    return f"✅ PROTOCOL GENERATED using {pipettes}\n📦 {template.summary()}; est. {estimate:.0f}s\n\n{protocol_code}"
+
+
+def _generated(template, values: dict) -> str:
+    """Render a compiled template for a tool response."""
+    protocol_ir = lazy_import("opentrons_agent.protocol_ir")
+    try:
+        protocol_code = template.render(**values)
+    except protocol_ir.ProtocolError as e:
+        return f"❌ VALIDATION ERRORS: {e}"
+    estimate = template.estimate_seconds(**values)
+    return f"✅ PROTOCOL GENERATED: {template.ir.name}\n📦 {template.summary()}; est. {estimate:.0f}s\n\n{protocol_code}"
+
+
+@tool()
+def create_serial_dilution_protocol(
+    dilution_factor: float = 2.0,
+    dilutions: int = 7,
+    final_volume: float = 100.0,
+    rows: int = 8,
+    mix_repetitions: int = 3,
+    mix_volume: float = 50.0,
+    aspiration_speed: float = 50.0,
+    dispense_speed: float = 50.0
+) -> str:
+    """Generate a serial dilution across plate columns (stock in reservoir A1, diluent in A2)"""
+    protocol_ir = lazy_import("opentrons_agent.protocol_ir")
+    try:
+        template = protocol_ir.compile_protocol(protocol_ir.serial_dilution(
+            dilution_factor, dilutions, final_volume=final_volume, rows=rows,
+            mix=(protocol_ir.Param("mix_repetitions", integer=True), protocol_ir.Param("mix_volume")),
+            aspirate_rate=protocol_ir.Param("aspiration_speed"),
+            dispense_rate=protocol_ir.Param("dispense_speed"),
+        ))
+    except protocol_ir.ProtocolError as e:
+        return f"❌ VALIDATION ERRORS: {e}"
+    return _generated(template, dict(mix_repetitions=mix_repetitions, mix_volume=mix_volume,
+                                     aspiration_speed=aspiration_speed, dispense_speed=dispense_speed))
+
+
+@tool()
+def create_standard_curve_protocol(
+    concentrations: str = "0,10,20,50,100,200",
+    transfer_volume: float = 200.0,
+    replicates: int = 3,
+    mix_repetitions: int = 3,
+    mix_volume: float = 100.0,
+    aspiration_speed: float = 50.0,
+    dispense_speed: float = 50.0
+) -> str:
+    """Generate a standard curve from premixed standards in reservoir A1, A2, ... Format: 'c1,c2,c3'"""
+    protocol_ir = lazy_import("opentrons_agent.protocol_ir")
+    try:
+        template = protocol_ir.compile_protocol(protocol_ir.standard_curve(
+            tuple(float(c) for c in concentrations.split(",")),
+            volume=protocol_ir.Param("transfer_volume"),
+            replicates=replicates,
+            mix=(protocol_ir.Param("mix_repetitions", integer=True), protocol_ir.Param("mix_volume")),
+            aspirate_rate=protocol_ir.Param("aspiration_speed"),
+            dispense_rate=protocol_ir.Param("dispense_speed"),
+        ))
+    except (protocol_ir.ProtocolError, ValueError) as e:
+        return f"❌ VALIDATION ERRORS: {e}"
+    return _generated(template, dict(transfer_volume=transfer_volume, mix_repetitions=mix_repetitions,
+                                     mix_volume=mix_volume, aspiration_speed=aspiration_speed,
+                                     dispense_speed=dispense_speed))
+
+
+@tool()
+def create_plate_replication_protocol(
+    copies: int = 2,
+    volume: float = 50.0,
+    use_96_channel: bool = True,
+    aspiration_speed: float = 50.0,
+    dispense_speed: float = 50.0
+) -> str:
+    """Generate a protocol stamping the plate in slot 1 onto 'copies' new plates"""
+    protocol_ir = lazy_import("opentrons_agent.protocol_ir")
+    try:
+        template = protocol_ir.compile_protocol(protocol_ir.plate_replication(
+            copies, volume=protocol_ir.Param("volume"),
+            aspirate_rate=protocol_ir.Param("aspiration_speed"),
+            dispense_rate=protocol_ir.Param("dispense_speed"),
+            channels=(96,) if use_96_channel else (8,),
+        ))
+    except protocol_ir.ProtocolError as e:
+        return f"❌ VALIDATION ERRORS: {e}"
+    return _generated(template, dict(volume=volume, aspiration_speed=aspiration_speed, dispense_speed=dispense_speed))
@@ -0,0 +1,98 @@
+"""Byonoy absorbance plate reader tools.
+
+The reader SDK (``byonoy_devices``, or ``BYONOY_MODULE``) is native and
+optional: it is imported on the first reader tool call (through
+:func:`~opentrons_agent.server.reader_sdk`, which can record or replay it),
+so the rest of the server starts without it.
+"""
+from ..server import reader_sdk, tool
+
+# Global variable to store device handle
+byonoy_device_handle = None
+
+@tool()
+def connect_byonoy_reader() -> str:
+    """Connect to the Byonoy plate reader"""
+    global byonoy_device_handle
+    try:
+        byonoy = reader_sdk()
+        num_devices = byonoy.available_devices_count()
+        if num_devices == 0:
+            return "No Byonoy devices found"
+        
+        devices = byonoy.available_devices()
+        result_code, device_handle = byonoy.open_device(devices[0])
+        
+        if result_code == byonoy.ErrorCode.NO_ERROR:
+            byonoy_device_handle = device_handle
+            return f"Connected to Byonoy device successfully. Handle: {device_handle}"
+        else:
+            return f"Failed to connect: {result_code}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@tool()
+def read_tartrazine_absorbance(wavelength: int = 450, step: str = "initialize") -> str:
+    """Read absorbance values. Use step='initialize' first, then step='measure' after inserting plate"""
+    global byonoy_device_handle
+    try:
+        if byonoy_device_handle is None:
+            return "Please connect to Byonoy reader first"
+        byonoy = reader_sdk()
+        
+        if step == "initialize":
+            # Check slot is empty for initialization
+            if byonoy.device_slot_status_supported(byonoy_device_handle):
+                result_code, slot_status = byonoy.get_device_slot_status(byonoy_device_handle)
+                if result_code == byonoy.ErrorCode.NO_ERROR and slot_status != byonoy.DeviceSlotState.EMPTY:
+                    return f"❌ Remove plate first - slot status: {slot_status}"
+            
+            # Initialize measurement
+            if byonoy.abs96_available_wavelengths_supported(byonoy_device_handle):
+                result_code, abs_wavelengths = byonoy.abs96_get_available_wavelengths(byonoy_device_handle)
+                if wavelength not in abs_wavelengths:
+                    return f"Wavelength {wavelength} not available. Available: {abs_wavelengths}"
+                
+                config = byonoy.Abs96SingleMeasurementConfig()
+                config.sample_wavelength = wavelength
+                
+                result_code = byonoy.abs96_initialize_single_measurement(byonoy_device_handle, config)
+                if result_code == byonoy.ErrorCode.NO_ERROR:
+                    return f"✅ Measurement initialized at {wavelength}nm. INSERT PLATE NOW, then run with step='measure'"
+                else:
+                    return f"❌ Initialize failed: {result_code}"
+            
+        elif step == "measure":
+            # Check if plate is inserted
+            if byonoy.device_slot_status_supported(byonoy_device_handle):
+                result_code, slot_status = byonoy.get_device_slot_status(byonoy_device_handle)
+                if result_code == byonoy.ErrorCode.NO_ERROR and slot_status == byonoy.DeviceSlotState.EMPTY:
+                    return "❌ No plate detected. Please insert plate first."
+            
+            # Take actual measurement
+            config = byonoy.Abs96SingleMeasurementConfig()
+            config.sample_wavelength = wavelength
+
+            result_code, values = byonoy.abs96_single_measure(byonoy_device_handle, config)
+            if result_code == byonoy.ErrorCode.NO_ERROR:
+                return f"📊 Absorbance values at {wavelength}nm: {values}"
+            else:
+                return f"❌ Measurement failed: {result_code}. Check plate positioning."
+        
+        else:
+            return "Invalid step. Use step='initialize' or step='measure'"
+            
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+@tool()
+def get_reader_status() -> str:
+    """Check whether a Byonoy plate reader is attached, without connecting to it or starting a measurement"""
+    try:
+        byonoy = reader_sdk()
+        num_devices = byonoy.available_devices_count()
+        if num_devices == 0:
+            return "No Byonoy devices found"
+        return f"Byonoy reader available: {num_devices} device(s) {byonoy.available_devices()}"
+    except Exception as e:
+        return f"Error: {str(e)}"
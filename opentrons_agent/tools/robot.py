@@ -0,0 +1,93 @@
+"""Robot state tools: health, instruments and protocols on the Flex."""
+import os
+
+from ..server import _dumps, _robot_state, tool
+
+# ---------------------------------------------------------------------------
+# Result shaping – robot payloads are projected to the fields the model needs
+# and capped in size instead of being passed through as a Python repr.
+# ---------------------------------------------------------------------------
+
+RESULT_MAX_ITEMS = int(os.getenv("MCP_RESULT_MAX_ITEMS", 20))
+
+# Fields kept per tool.  Dotted paths reach into nested objects; the output
+# key is the last path segment.
+RESULT_PROJECTIONS = {
+    "get_robot_health": ("name", "robot_model", "robot_serial", "api_version", "fw_version", "system_version"),
+    "get_instruments": ("mount", "instrumentType", "instrumentModel", "serialNumber", "ok"),
+    "list_protocols": ("id", "createdAt", "protocolType", "robotType", "metadata.protocolName"),
+}
+
+
+def _project(item: dict, fields) -> dict:
+    projected = {}
+    for path in fields:
+        value = item
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value is not None:
+            projected[path.rsplit(".", 1)[-1]] = value
+    return projected
+
+
+def _shape_result(tool_name: str, label: str, payload, cursor: int = 0, limit: int = RESULT_MAX_ITEMS) -> list[str]:
+    """Return ``[summary, json]`` for a robot payload.
+
+    List payloads (``{"data": [...]}``) are paginated with *cursor*/*limit*;
+    the JSON part carries ``meta.next_cursor`` when more items are available
+    so the caller can ask for the next page; a negative *cursor* or a *limit*
+    below 1 raises ``ValueError``.  ``meta.bytes`` records the size of the
+    old repr-style result next to that of the JSON part as returned.
+    """
+    if cursor < 0 or limit < 1:
+        raise ValueError(f"cursor must be >= 0 and limit >= 1 (got cursor={cursor}, limit={limit})")
+    fields = RESULT_PROJECTIONS.get(tool_name)
+    raw_bytes = len(f"{label}: {payload}".encode())
+
+    if isinstance(payload, dict) and isinstance(payload.get("data"), list):
+        items = payload["data"]
+        page = items[cursor:cursor + limit]
+        data = [_project(item, fields) if fields else item for item in page]
+        next_cursor = cursor + limit if cursor + limit < len(items) else None
+        meta = {"total": len(items), "cursor": cursor, "next_cursor": next_cursor}
+        summary = f"{label}: {len(items)} total, showing {len(data)}"
+        if next_cursor is not None:
+            summary += f" (call again with cursor={next_cursor} for more)"
+    else:
+        data = _project(payload, fields) if fields and isinstance(payload, dict) else payload
+        meta = {}
+        summary = f"{label}: " + ", ".join(f"{k}={v}" for k, v in data.items()) if isinstance(data, dict) else label
+
+    body = {"data": data, "meta": meta}
+    meta["bytes"] = {"raw": raw_bytes, "shaped": 0}
+    # The size is part of the payload it measures: repeat until the digits stop changing
+    encoded = _dumps(body)
+    while meta["bytes"]["shaped"] != len(encoded.encode()):
+        meta["bytes"]["shaped"] = len(encoded.encode())
+        encoded = _dumps(body)
+    return [summary, encoded]
+
+
+@tool()
+def get_robot_health() -> list[str]:
+    """Get the current health status of the Opentrons robot"""
+    try:
+        return _shape_result("get_robot_health", "Robot Status", _robot_state("/health"))
+    except Exception as e:
+        return [f"Error: {str(e)}"]
+
+@tool()
+def get_instruments(cursor: int = 0, limit: int = RESULT_MAX_ITEMS) -> list[str]:
+    """Get available instruments (pipettes) on the robot"""
+    try:
+        return _shape_result("get_instruments", "Available Instruments", _robot_state("/instruments"), cursor, limit)
+    except Exception as e:
+        return [f"Error: {str(e)}"]
+
+@tool()
+def list_protocols(cursor: int = 0, limit: int = RESULT_MAX_ITEMS) -> list[str]:
+    """List all protocols available on the robot. Large lists are paginated: pass the returned next_cursor as cursor."""
+    try:
+        return _shape_result("list_protocols", "Available Protocols", _robot_state("/protocols"), cursor, limit)
+    except Exception as e:
+        return [f"Error: {str(e)}"]
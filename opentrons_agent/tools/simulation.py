@@ -0,0 +1,139 @@
+"""Protocol simulation tools."""
+from ..server import lazy_import, tool
+
+# Starting volume in each standard's reservoir well (nest_12_reservoir_15ml).
+RESERVOIR_FILL_UL = 10000.0
+
+# Deck slots of the generated tartrazine protocol.
+PLATE_SLOT, RESERVOIR_SLOT = 1, 2
+STANDARD_CURVE_POINTS = 6
+
+
+def estimate_runtime(aspiration_speed: float, dispense_speed: float, mix_volume: float,
+                     mix_repetitions: int, transfer_volume: float, wells: int = STANDARD_CURVE_POINTS) -> float:
+    """Seconds to transfer and mix *wells* standards, from the calibrated timing model."""
+    timing_model = lazy_import("opentrons_agent.timing_model")
+    model = timing_model.get_timing_model()
+    distance = timing_model.slot_distance(RESERVOIR_SLOT, PLATE_SLOT)
+    per_well = (
+        model.transfer_seconds(transfer_volume, aspiration_speed, dispense_speed, distance)
+        + model.mix_seconds(mix_volume, mix_repetitions, aspiration_speed, dispense_speed)
+    )
+    return wells * per_well
+
+
+@tool()
+def simulate_protocol_execution(
+    aspiration_speed: float,
+    dispense_speed: float,
+    mix_volume: int,
+    mix_repetitions: int,
+    transfer_volume: int,
+    reservoir_fill_ul: float = RESERVOIR_FILL_UL
+) -> str:
+    """Simulate protocol execution to catch potential runtime errors before sending to robot"""
+    
+    simulation_log = []
+    errors = []
+    warnings = []
+    
+    # Step 1: Validate all parameters (reuse existing validation)
+    param_errors = []
+    if not (1 <= aspiration_speed <= 1000):
+        param_errors.append(f"Aspiration speed {aspiration_speed} outside range")
+    if not (1 <= dispense_speed <= 1000):
+        param_errors.append(f"Dispense speed {dispense_speed} outside range")
+    if not (1 <= mix_volume <= 1000):
+        param_errors.append(f"Mix volume {mix_volume} outside range")
+    if not (1 <= transfer_volume <= 1000):
+        param_errors.append(f"Transfer volume {transfer_volume} outside range")
+    if not (1 <= mix_repetitions <= 20):
+        param_errors.append(f"Mix repetitions {mix_repetitions} outside range")
+    
+    if param_errors:
+        errors.extend(param_errors)
+        return f"❌ SIMULATION FAILED: {'; '.join(errors)}"
+    
+    simulation_log.append("✅ Parameter validation passed")
+    
+    # Step 2: Check pipette selection
+    if transfer_volume <= 20:
+        pipette = "flex_1channel_20"
+        if mix_volume > 20:
+            warnings.append("Mix volume exceeds pipette capacity for selected transfer volume")
+    elif transfer_volume <= 300:
+        pipette = "flex_1channel_300"
+    else:
+        pipette = "flex_1channel_1000"
+    
+    simulation_log.append(f"✅ Selected pipette: {pipette}")
+    
+    # Step 3: Simulate labware loading
+    # deck_state pulls in NumPy, so it is imported on first simulation only.
+    deck_state = lazy_import("opentrons_agent.deck_state")
+    deck = deck_state.DeckState()
+    assay_plate = deck.load(PLATE_SLOT, "corning_96_wellplate_360ul_flat")
+    reagent_reservoir = deck.load(RESERVOIR_SLOT, "nest_12_reservoir_15ml")
+    deck.load(3, "opentrons_flex_96_tiprack_1000ul")
+    
+    simulation_log.append("✅ Labware loading simulation passed")
+    
+    # Step 4: Simulate liquid handling operations
+    total_operations = STANDARD_CURVE_POINTS
+    wells = [f"A{i+1}" for i in range(total_operations)]
+    try:
+        deck.fill(RESERVOIR_SLOT, wells, reservoir_fill_ul)
+        # One step per standard, as the generated protocol does
+        for well in wells:
+            deck.transfer(RESERVOIR_SLOT, well, PLATE_SLOT, well, transfer_volume)
+            deck.mix(PLATE_SLOT, well, mix_volume, mix_repetitions)
+    except deck_state.DeckStateError as e:
+        errors.append(str(e))
+    
+    completed_wells = deck.steps // 2
+    estimated_time = estimate_runtime(
+        aspiration_speed, dispense_speed, mix_volume, mix_repetitions, transfer_volume, completed_wells
+    )
+    for i in range(completed_wells):
+        simulation_log.append(
+            f"  Well A{i+1}: Transfer {transfer_volume}µL + Mix {mix_repetitions}x{mix_volume}µL "
+            f"→ {assay_plate.volume(f'A{i+1}'):g}µL in well, {reagent_reservoir.volume(f'A{i+1}'):g}µL left in reservoir"
+        )
+    
+    # Step 5: Check for potential issues
+    if transfer_volume > 950:
+        warnings.append("Transfer volume near pipette maximum - consider smaller volume")
+    
+    if aspiration_speed > 300 and transfer_volume < 50:
+        warnings.append("High aspiration speed with small volume may cause air bubbles")
+    
+    # Step 6: Generate simulation report
+    result = "🧪 PROTOCOL SIMULATION RESULTS\n\n"
+    
+    if errors:
+        result += f"❌ ERRORS (will prevent execution):\n"
+        for error in errors:
+            result += f"  - {error}\n"
+        result += "\n"
+    
+    if warnings:
+        result += f"⚠️ WARNINGS (may affect performance):\n"
+        for warning in warnings:
+            result += f"  - {warning}\n"
+        result += "\n"
+    
+    result += f"📋 Simulation Log:\n"
+    for log in simulation_log:
+        result += f"  {log}\n"
+    
+    result += f"\n⏱️ Estimated runtime: {estimated_time:.1f} seconds ({estimated_time/60:.1f} minutes)"
+    result += f"\n📐 Timing model: {lazy_import('opentrons_agent.timing_model').get_timing_model().label}"
+    result += f"\n💧 Total volume handled: {deck.aspirated:g}µL"
+    result += f"\n🧰 Tips used: {deck.tips_used}/{deck.tip_capacity}"
+    
+    if not errors:
+        result += f"\n\n✅ SIMULATION PASSED - Protocol ready for execution!"
+    else:
+        result += f"\n\n❌ SIMULATION FAILED - Fix errors before execution"
+    
+    return result
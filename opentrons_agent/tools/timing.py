@@ -0,0 +1,48 @@
+"""Timing model calibration tools."""
+from ..server import _dumps, _robot_get, lazy_import, tool
+
+COMMAND_PAGE_LENGTH = 200
+
+
+def _run_commands(run_id: str) -> list[dict]:
+    """All commands of a run, following the robot's cursor pagination."""
+    commands = []
+    while True:
+        response = _robot_get(f"/runs/{run_id}/commands?cursor={len(commands)}&pageLength={COMMAND_PAGE_LENGTH}")
+        response.raise_for_status()
+        page = response.json()
+        commands.extend(page.get("data", []))
+        total = (page.get("meta") or {}).get("totalLength", len(commands))
+        if not page.get("data") or len(commands) >= total:
+            return commands
+
+
+@tool()
+def calibrate_timing_model(run_ids: str, save: bool = True) -> list[str]:
+    """Fit the command timing model to finished runs. Format: 'run_id1,run_id2'. Saves a new model version unless save is false."""
+    timing_model = lazy_import("opentrons_agent.timing_model")
+    try:
+        runs = {run_id.strip(): _run_commands(run_id.strip()) for run_id in run_ids.split(",") if run_id.strip()}
+        model = timing_model.fit(runs)
+    except Exception as e:
+        return [f"Error: {str(e)}"]
+
+    summary = f"Timing model fitted on {len(runs)} run(s)"
+    if save:
+        try:
+            path = timing_model.save(model)
+        except OSError as e:
+            return [f"Error: timing model fitted but not saved: {str(e)}"]
+        summary += f", saved as v{model.version} ({path})"
+    errors = model.errors.get("holdout") or model.errors["training"]
+    summary += "\nPrediction error:\n" + "\n".join(
+        f"  {name}: MAE {e['mae_s']:.3f}s, MAPE {e['mape_pct']:.1f}% (n={e['n']})" for name, e in errors.items()
+    )
+    return [summary, _dumps(model.to_dict())]
+
+
+@tool()
+def get_timing_model_info() -> list[str]:
+    """Show the active timing model version, its coefficients and prediction error"""
+    model = lazy_import("opentrons_agent.timing_model").get_timing_model()
+    return [f"Timing model: {model.label}", _dumps(model.to_dict())]
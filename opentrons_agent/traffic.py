@@ -0,0 +1,562 @@
+"""
+Record/replay transport for robot, plate reader and OpenAI traffic.
+
+Performance problems seen in production depend on the exact sequence and
+timing of the robot's (and reader's) answers.  With ``TRAFFIC_MODE=record``
+every exchange on the instrumented paths is appended to ``TRAFFIC_FILE``;
+with ``TRAFFIC_MODE=replay`` the same paths answer from that file without
+touching the network or the reader, so a session can be benchmarked and
+profiled offline:
+
+* HTTP through httpx (backend robot calls, realtime session minting, the
+  experiment scheduler) via :func:`httpx_transport` / :func:`httpx_async_transport`,
+* HTTP through ``requests`` (MCP robot tools) via :func:`requests_session`,
+* the Byonoy SDK via :func:`load_module`, which records each SDK call.
+
+The file is JSON lines, one compact record per exchange, appended with a
+single ``write`` so the backend and any number of MCP server processes can
+record into it at once.  Request headers are never stored; response headers
+are reduced to :data:`KEPT_HEADERS`; OpenAI ``client_secret`` values are
+redacted.
+
+Replay is deterministic: responses are matched on channel + method + URL
+(reader: function name) and handed out in recorded order, the last one
+repeating once a key is exhausted.  The position per key lives in
+``TRAFFIC_FILE.cursor`` so it advances across processes; ``reset`` it
+(``python -m opentrons_agent.traffic reset``) before replaying a session
+again.  ``TRAFFIC_REPLAY_TIMING=original`` waits the recorded duration before
+each answer, ``fast`` answers immediately.
+
+Only the standard library is needed; httpx and ``requests`` are imported by
+the functions that use them.
+"""
+from __future__ import annotations
+
+import base64
+import collections
+import enum
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: the replay cursor stays per process
+    fcntl = None
+
+TRAFFIC_MODE = os.getenv("TRAFFIC_MODE", "off")  # off | record | replay
+TRAFFIC_FILE = Path(os.getenv("TRAFFIC_FILE", Path.home() / ".opentrons_agent" / "traffic.jsonl"))
+TRAFFIC_REPLAY_TIMING = os.getenv("TRAFFIC_REPLAY_TIMING", "original")  # original | fast
+
+KEPT_HEADERS = ("content-type", "location")
+REDACTED = "redacted"
+
+
+class ReplayMiss(LookupError):
+    """No recorded exchange matches the request being replayed."""
+
+
+def enabled() -> bool:
+    return TRAFFIC_MODE in {"record", "replay"}
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+class Recorder:
+    """Appends records to the traffic file; safe across threads and processes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def write(self, record: dict[str, Any]) -> None:
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode()
+        with self._lock:
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            os.write(self._fd, line)
+
+
+def _body(content: bytes) -> dict[str, str]:
+    try:
+        return {"b": content.decode()}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(content).decode()}
+
+
+def _redact(channel: str, content: bytes) -> bytes:
+    """Drop ephemeral OpenAI keys from a recorded body."""
+    if channel != "openai" or b"client_secret" not in content:
+        return content
+    try:
+        data = json.loads(content)
+        data["client_secret"]["value"] = REDACTED
+    except (ValueError, KeyError, TypeError):
+        return content
+    return json.dumps(data).encode()
+
+
+def record_http(channel: str, method: str, url: str, started: float, duration: float, *,
+                status: Optional[int] = None, headers: Any = None, content: bytes = b"",
+                request_bytes: int = 0, error: Optional[str] = None) -> None:
+    record: dict[str, Any] = {"ts": round(started, 6), "ch": channel, "m": method, "u": url,
+                              "d": round(duration, 6), "n": request_bytes}
+    if error is not None:
+        record["x"] = error
+    else:
+        record["s"] = status
+        record["h"] = {k: headers[k] for k in KEPT_HEADERS if k in headers}
+        record.update(_body(_redact(channel, content)))
+    _recorder().write(record)
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+def _http_key(channel: str, method: str, url: str, with_host: bool = True) -> str:
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    return f"{channel} {method.upper()} {parts.netloc if with_host else ''}{target}"
+
+
+class Replayer:
+    """Recorded exchanges indexed by key, handed out in recorded order."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.cursor_path = path.with_name(path.name + ".cursor")
+        self._entries: dict[str, list[dict[str, Any]]] = collections.defaultdict(list)
+        self._local_cursor: collections.Counter = collections.Counter()
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a torn last line from an interrupted recording
+                    for key in self.keys(record):
+                        self._entries[key].append(record)
+
+    @staticmethod
+    def keys(record: dict[str, Any]) -> list[str]:
+        if "f" in record:
+            return [f"{record['ch']} {record['f']}"]
+        # Also indexed without the host, so a recording replays against another address
+        return [_http_key(record["ch"], record["m"], record["u"]),
+                _http_key(record["ch"], record["m"], record["u"], with_host=False)]
+
+    def names(self, channel: str) -> set[str]:
+        """Functions recorded on a module channel."""
+        prefix = f"{channel} "
+        return {key[len(prefix):] for key in self._entries if key.startswith(prefix) and " " not in key[len(prefix):]}
+
+    def _claim(self, key: str) -> int:
+        """Position of the next answer for *key*, shared by every replaying process."""
+        if fcntl is None:
+            with self._lock:
+                self._local_cursor[key] += 1
+                return self._local_cursor[key] - 1
+        with self._lock, open(os.open(self.cursor_path, os.O_RDWR | os.O_CREAT, 0o600), "r+") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                cursor = json.loads(fh.read() or "{}")
+            except ValueError:
+                cursor = {}
+            position = cursor.get(key, 0)
+            cursor[key] = position + 1
+            fh.seek(0)
+            fh.truncate()
+            fh.write(json.dumps(cursor))
+            return position
+
+    def next(self, *keys: str) -> dict[str, Any]:
+        for key in keys:
+            entries = self._entries.get(key)
+            if entries:
+                record = entries[min(self._claim(key), len(entries) - 1)]
+                if TRAFFIC_REPLAY_TIMING == "original":
+                    time.sleep(record.get("d", 0))
+                return record
+        raise ReplayMiss(f"No recorded traffic for {keys[0]!r} in {self.path}")
+
+    def next_http(self, channel: str, method: str, url: str) -> dict[str, Any]:
+        return self.next(_http_key(channel, method, url), _http_key(channel, method, url, with_host=False))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._local_cursor.clear()
+            self.cursor_path.unlink(missing_ok=True)
+
+
+def _content(record: dict[str, Any]) -> bytes:
+    if "b64" in record:
+        return base64.b64decode(record["b64"])
+    return record.get("b", "").encode()
+
+
+_RECORDER: Optional[Recorder] = None
+_REPLAYER: Optional[Replayer] = None
+
+
+def _recorder() -> Recorder:
+    global _RECORDER
+    if _RECORDER is None:
+        _RECORDER = Recorder(TRAFFIC_FILE)
+    return _RECORDER
+
+
+def replayer() -> Replayer:
+    global _REPLAYER
+    if _REPLAYER is None:
+        _REPLAYER = Replayer(TRAFFIC_FILE)
+    return _REPLAYER
+
+
+# ---------------------------------------------------------------------------
+# httpx
+# ---------------------------------------------------------------------------
+
+
+def _httpx_response(httpx, request, status: int, headers: dict, content: bytes):
+    return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+def httpx_transport(channel: str):
+    """A transport for ``httpx.Client(transport=...)``; None (the default) when traffic is off."""
+    if not enabled():
+        return None
+    import httpx
+
+    class TrafficTransport(httpx.BaseTransport):
+        def __init__(self):
+            self._inner = httpx.HTTPTransport() if TRAFFIC_MODE == "record" else None
+
+        def handle_request(self, request):
+            if self._inner is None:
+                return _replay_httpx(httpx, channel, request)
+            started, clock = time.time(), time.perf_counter()
+            try:
+                response = self._inner.handle_request(request)
+                content = response.read()
+            except httpx.TransportError as exc:
+                record_http(channel, request.method, str(request.url), started, time.perf_counter() - clock,
+                            request_bytes=_request_bytes(request), error=f"{type(exc).__name__}: {exc}")
+                raise
+            record_http(channel, request.method, str(request.url), started, time.perf_counter() - clock,
+                        status=response.status_code, headers=response.headers, content=content,
+                        request_bytes=_request_bytes(request))
+            return _httpx_response(httpx, request, response.status_code, _plain_headers(response.headers), content)
+
+        def close(self):
+            if self._inner is not None:
+                self._inner.close()
+
+    return TrafficTransport()
+
+
+def httpx_async_transport(channel: str):
+    """Async counterpart of :func:`httpx_transport` for ``httpx.AsyncClient``."""
+    if not enabled():
+        return None
+    import asyncio
+
+    import httpx
+
+    class AsyncTrafficTransport(httpx.AsyncBaseTransport):
+        def __init__(self):
+            self._inner = httpx.AsyncHTTPTransport() if TRAFFIC_MODE == "record" else None
+
+        async def handle_async_request(self, request):
+            if self._inner is None:
+                # Blocking only for the cursor lock and the optional original-timing sleep
+                return await asyncio.to_thread(_replay_httpx, httpx, channel, request)
+            started, clock = time.time(), time.perf_counter()
+            try:
+                response = await self._inner.handle_async_request(request)
+                content = await response.aread()
+            except httpx.TransportError as exc:
+                record_http(channel, request.method, str(request.url), started, time.perf_counter() - clock,
+                            request_bytes=_request_bytes(request), error=f"{type(exc).__name__}: {exc}")
+                raise
+            record_http(channel, request.method, str(request.url), started, time.perf_counter() - clock,
+                        status=response.status_code, headers=response.headers, content=content,
+                        request_bytes=_request_bytes(request))
+            return _httpx_response(httpx, request, response.status_code, _plain_headers(response.headers), content)
+
+        async def aclose(self):
+            if self._inner is not None:
+                await self._inner.aclose()
+
+    return AsyncTrafficTransport()
+
+
+def _request_bytes(request) -> int:
+    return int(request.headers.get("content-length") or 0)
+
+
+def _plain_headers(headers) -> dict[str, str]:
+    """Headers for a response whose content is already decoded."""
+    return {k: v for k, v in headers.items() if k.lower() not in {"content-encoding", "content-length",
+                                                                  "transfer-encoding"}}
+
+
+def _replay_httpx(httpx, channel: str, request):
+    try:
+        record = replayer().next_http(channel, request.method, str(request.url))
+    except ReplayMiss as exc:
+        raise httpx.ConnectError(str(exc), request=request)
+    if "x" in record:
+        raise httpx.ConnectError(f"Replayed failure: {record['x']}", request=request)
+    return _httpx_response(httpx, request, record["s"], record.get("h", {}), _content(record))
+
+
+# ---------------------------------------------------------------------------
+# requests
+# ---------------------------------------------------------------------------
+
+
+def requests_session(channel: str):
+    """A ``requests.Session`` that records or replays; None when traffic is off."""
+    if not enabled():
+        return None
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    class TrafficAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            if TRAFFIC_MODE == "replay":
+                try:
+                    record = replayer().next_http(channel, request.method, request.url)
+                except ReplayMiss as exc:
+                    raise requests.ConnectionError(str(exc), request=request)
+                if "x" in record:
+                    raise requests.ConnectionError(f"Replayed failure: {record['x']}", request=request)
+                response = requests.Response()
+                response.status_code = record["s"]
+                response.headers = CaseInsensitiveDict(record.get("h", {}))
+                response._content = _content(record)
+                response.encoding = get_encoding_from_headers(response.headers)
+                response.url = request.url
+                response.request = request
+                return response
+            started, clock = time.time(), time.perf_counter()
+            size = len(request.body or b"") if isinstance(request.body, (bytes, str)) else 0
+            try:
+                response = super().send(request, **kwargs)
+            except requests.RequestException as exc:
+                record_http(channel, request.method, request.url, started, time.perf_counter() - clock,
+                            request_bytes=size, error=f"{type(exc).__name__}: {exc}")
+                raise
+            record_http(channel, request.method, request.url, started, time.perf_counter() - clock,
+                        status=response.status_code, headers=response.headers, content=response.content,
+                        request_bytes=size)
+            return response
+
+    session = requests.Session()
+    adapter = TrafficAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# ---------------------------------------------------------------------------
+# SDK modules (plate reader)
+# ---------------------------------------------------------------------------
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, enum.Enum):
+        return {"__enum__": f"{type(value).__name__}.{value.name}"}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if hasattr(value, "tolist"):  # NumPy arrays from the SDK
+        return _encode(value.tolist())
+    return {"__obj__": type(value).__name__, "repr": repr(value)[:200]}
+
+
+class ReplayEnum:
+    """Stands in for an SDK enum member; equal to members of the same name."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ReplayEnum):
+            return self.name == other.name
+        if isinstance(other, enum.Enum):
+            return self.name == f"{type(other).__name__}.{other.name}"
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class ReplayObject:
+    """Stands in for an opaque SDK object (device handle, config)."""
+
+    def __init__(self, type_name: str, text: str = ""):
+        self._type_name = type_name
+        self._repr = text or f"<{type_name}>"
+
+    def __repr__(self) -> str:
+        return self._repr
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if "__enum__" in value:
+            return ReplayEnum(value["__enum__"])
+        if "__obj__" in value:
+            return ReplayObject(value["__obj__"], value.get("repr", ""))
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+class RecordingModule:
+    """Proxy that records every call into the wrapped SDK module."""
+
+    def __init__(self, module, channel: str):
+        self._module = module
+        self._channel = channel
+        self._wrappers: dict[str, Callable] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._module, name)
+        if not callable(attr) or (isinstance(attr, type) and issubclass(attr, enum.Enum)):
+            return attr
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            def wrapper(*args, **kwargs):
+                started, clock = time.time(), time.perf_counter()
+                record = {"ts": round(started, 6), "ch": self._channel, "f": name, "a": _encode(args)}
+                try:
+                    result = attr(*args, **kwargs)
+                except Exception as exc:
+                    record.update(d=round(time.perf_counter() - clock, 6), x=f"{type(exc).__name__}: {exc}")
+                    _recorder().write(record)
+                    raise
+                record.update(d=round(time.perf_counter() - clock, 6), r=_encode(result))
+                _recorder().write(record)
+                return result
+            self._wrappers[name] = wrapper
+        return wrapper
+
+
+class _ReplayNamespace:
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, member: str) -> ReplayEnum:
+        return ReplayEnum(f"{self._name}.{member}")
+
+
+class ReplayModule:
+    """Answers SDK calls from the recording; exposes only what was recorded."""
+
+    def __init__(self, channel: str):
+        self._channel = channel
+        self._functions = replayer().names(channel)
+        self._namespaces = {
+            record_value.split(".")[0]
+            for entries in replayer()._entries.values() for entry in entries if entry.get("ch") == channel
+            for record_value in _enum_names(entry.get("r"))
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._functions:
+            def replay(*args, **kwargs):
+                record = replayer().next(f"{self._channel} {name}")
+                if "x" in record:
+                    raise RuntimeError(f"Replayed failure: {record['x']}")
+                return _decode(record.get("r"))
+            return replay
+        if name in self._namespaces:
+            return _ReplayNamespace(name)
+        raise AttributeError(name)
+
+
+def _enum_names(value: Any):
+    if isinstance(value, list):
+        for v in value:
+            yield from _enum_names(v)
+    elif isinstance(value, dict):
+        if "__enum__" in value:
+            yield value["__enum__"]
+        else:
+            for v in value.values():
+                yield from _enum_names(v)
+
+
+def load_module(module_name: str, channel: str = "reader", importer: Callable = importlib.import_module):
+    """Import an SDK module, wrapped for recording or replaced by the recording in replay mode."""
+    if TRAFFIC_MODE == "replay":
+        return ReplayModule(channel)
+    module = importer(module_name)
+    return RecordingModule(module, channel) if TRAFFIC_MODE == "record" else module
+
+
+# ---------------------------------------------------------------------------
+# Command line: summarise or rewind a recording
+# ---------------------------------------------------------------------------
+
+
+def summarize(path: Path) -> dict[str, Any]:
+    channels: dict[str, dict[str, Any]] = {}
+    first = last = None
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            stats = channels.setdefault(record["ch"], {"exchanges": 0, "errors": 0, "seconds": 0.0, "bytes": 0})
+            stats["exchanges"] += 1
+            stats["errors"] += "x" in record
+            stats["seconds"] = round(stats["seconds"] + record.get("d", 0), 6)
+            stats["bytes"] += len(record.get("b", "")) + len(record.get("b64", ""))
+            first = record["ts"] if first is None else min(first, record["ts"])
+            last = record["ts"] + record.get("d", 0) if last is None else max(last, record["ts"] + record.get("d", 0))
+    return {"file": str(path), "span_s": round((last or 0) - (first or 0), 3), "channels": channels}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in {"stats", "reset"}:
+        print("usage: python -m opentrons_agent.traffic {stats|reset} [TRAFFIC_FILE]", file=sys.stderr)
+        return 2
+    path = Path(argv[1]) if len(argv) > 1 else TRAFFIC_FILE
+    if argv[0] == "reset":
+        Replayer(path).reset()
+        print(f"Replay position of {path} reset")
+    else:
+        print(json.dumps(summarize(path), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Transfer planning: group well-to-well transfers into multi-channel moves.
+
+Input is a list of :class:`Transfer` requests (source well -> destination
+well, volume) over labware identified by a short label.  The planner
+
+1. replaces full-plate work with one 96-channel move when a 96-well
+   destination is filled from a single trough or from a plate in the same
+   layout;
+2. replaces full columns with one 8-channel move when all eight rows of a
+   column move the same volume to or from a trough well, or column to
+   column in row order;
+3. leaves whatever is left to the single-channel pipette.
+
+Moves are ordered so that work from the same source is done together
+(nearest source next, destinations column by column) and a tip is reused
+while that is safe: same pipette, same source wells, no mix in the previous
+move and the previous destination wells were empty before dispensing (so
+the tip never touched another liquid).
+
+The resulting :class:`TransferPlan` is compact (one row per move), reports
+tip pick-ups and estimated time against the one-well-at-a-time baseline
+using the calibrated timing model, and can be checked against
+:class:`~opentrons_agent.deck_state.DeckState`.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import NamedTuple, Sequence
+
+from .deck_state import LABWARE_GEOMETRY, ROW_NAMES, DeckState
+from .timing_model import get_timing_model, slot_distance, slot_position
+
+# Distance between adjacent wells (9 mm) in deck slot pitches (~128 mm).
+WELL_PITCH_SLOTS = 9 / 128
+
+TIP_POLICIES = ("always", "reuse")
+
+
+class Transfer(NamedTuple):
+    source: str
+    source_well: str
+    dest: str
+    dest_well: str
+    volume: float
+
+
+class Move:
+    """One pipette operation: 1, 8 or 96 channels aspirating and dispensing once."""
+
+    __slots__ = ("channels", "source", "source_wells", "dest", "dest_wells", "volume", "new_tip", "mix", "index")
+
+    def __init__(self, channels: int, source: str, source_wells: tuple[str, ...], dest: str,
+                 dest_wells: tuple[str, ...], volume: float, index: int = 0):
+        self.channels = channels
+        self.source = source
+        self.source_wells = source_wells
+        self.dest = dest
+        self.dest_wells = dest_wells
+        self.volume = volume
+        self.new_tip = True
+        self.mix: tuple[int, float] | None = None
+        self.index = index  # position of the first request it covers
+
+    @property
+    def source_well(self) -> str:
+        """Well the pipette's A1 channel (first nozzle) goes to."""
+        return self.source_wells[0]
+
+    @property
+    def dest_well(self) -> str:
+        return self.dest_wells[0]
+
+    def as_row(self) -> tuple:
+        return (self.channels, self.volume, self.source, self.source_well, self.dest, self.dest_well, self.new_tip)
+
+
+def _well(name: str) -> tuple[int, int]:
+    """Well name -> (row, column), both 0-based."""
+    return ROW_NAMES.index(name[0]), int(name[1:]) - 1
+
+
+def _well_name(row: int, column: int) -> str:
+    return f"{ROW_NAMES[row]}{column + 1}"
+
+
+def _column_pair(group: list[Transfer], source_rows: int, dest_rows: int):
+    """(source wells, dest wells) for eight transfers an 8-channel head can do at once, else None."""
+    if len(group) != 8:
+        return None
+    key = (lambda t: _well(t.dest_well)[0]) if dest_rows == 8 else (lambda t: _well(t.source_well)[0])
+    ordered = sorted(group, key=key)
+
+    def side(wells: list[str], rows: int):
+        if rows == 1:
+            return (wells[0],) if len(set(wells)) == 1 else None
+        cells = [_well(w) for w in wells]
+        if rows == 8 and [r for r, _ in cells] == list(range(8)) and len({c for _, c in cells}) == 1:
+            return tuple(wells)
+        return None
+
+    source_wells = side([t.source_well for t in ordered], source_rows)
+    dest_wells = side([t.dest_well for t in ordered], dest_rows)
+    if source_wells is None or dest_wells is None:
+        return None
+    return source_wells, dest_wells
+
+
+class TransferPlan:
+    __slots__ = ("moves", "transfers", "labware", "aspiration_speed", "dispense_speed")
+
+    def __init__(self, moves: list[Move], transfers: Sequence[Transfer], labware: dict[str, tuple[int, str]],
+                 aspiration_speed: float, dispense_speed: float):
+        self.moves = moves
+        self.transfers = transfers
+        self.labware = labware
+        self.aspiration_speed = aspiration_speed
+        self.dispense_speed = dispense_speed
+
+    def _distance(self, a: str, b: str) -> float:
+        return slot_distance(self.labware[a][0], self.labware[b][0])
+
+    def summary(self) -> dict:
+        model = get_timing_model()
+        asp, disp = self.aspiration_speed, self.dispense_speed
+        mix = self.moves[0].mix if self.moves else None
+
+        estimated = 0.0
+        for move in self.moves:
+            estimated += model.transfer_seconds(move.volume, asp, disp, self._distance(move.source, move.dest),
+                                                new_tip=move.new_tip)
+            if move.mix:
+                estimated += model.mix_seconds(move.mix[1], move.mix[0], asp, disp)
+        baseline = 0.0
+        for t in self.transfers:
+            baseline += model.transfer_seconds(t.volume, asp, disp, self._distance(t.source, t.dest))
+            if mix:
+                baseline += model.mix_seconds(mix[1], mix[0], asp, disp)
+
+        pickups = [move for move in self.moves if move.new_tip]
+        return {
+            "transfers": len(self.transfers),
+            "moves": {channels: sum(1 for m in self.moves if m.channels == channels) for channels in (1, 8, 96)},
+            "tip_pickups": len(pickups),
+            "tips": sum(move.channels for move in pickups),
+            "baseline_tip_pickups": len(self.transfers),
+            "estimated_s": round(estimated, 1),
+            "baseline_s": round(baseline, 1),
+            "timing_model": model.label,
+        }
+
+    def report(self) -> str:
+        s = self.summary()
+        moves = ", ".join(f"{n}×{channels}-channel" for channels, n in s["moves"].items() if n)
+        saved_tips = s["baseline_tip_pickups"] - s["tip_pickups"]
+        saved_time = s["baseline_s"] - s["estimated_s"]
+        return (
+            f"{s['transfers']} transfers in {len(self.moves)} moves ({moves}); "
+            f"{s['tip_pickups']} tip pick-ups ({s['tips']} tips) vs {s['baseline_tip_pickups']} one well at a time "
+            f"(-{saved_tips}); est. {s['estimated_s']:.0f}s vs {s['baseline_s']:.0f}s (-{saved_time:.0f}s)"
+        )
+
+    def apply(self, deck: DeckState) -> DeckState:
+        """Replay the plan on a deck model; raises DeckStateError on under/overflow."""
+        slots = {label: slot for label, (slot, _) in self.labware.items()}
+        for move in self.moves:
+            # dest_wells has one entry per channel, so "always" picks up `channels` tips
+            deck.transfer(slots[move.source], move.source_wells, slots[move.dest], move.dest_wells,
+                          move.volume, new_tip="always" if move.new_tip else "never")
+        return deck
+
+
+def plan_transfers(transfers: Sequence[Transfer], labware: dict[str, tuple[int, str]], *,
+                   channels: Sequence[int] = (1, 8, 96), mix: tuple[int, float] | None = None,
+                   tip_policy: str = "reuse", aspiration_speed: float = 50.0,
+                   dispense_speed: float = 50.0, keep_order: bool = False) -> TransferPlan:
+    """Plan *transfers* over *labware* (``label -> (deck slot, load name)``).
+
+    *channels* lists the pipettes available; *mix* is ``(repetitions,
+    volume)`` applied in every destination after dispensing.  With
+    *keep_order* moves stay in request order (serial dilutions, where a
+    well is a source only after it was filled).
+    """
+    if tip_policy not in TIP_POLICIES:
+        raise ValueError(f"tip_policy must be one of {TIP_POLICIES}")
+    geometry = {label: LABWARE_GEOMETRY[load_name][:2] for label, (_, load_name) in labware.items()}
+    remaining = list(transfers)
+    request_index = {id(t): i for i, t in enumerate(transfers)}
+    moves: list[Move] = []
+
+    # -- 96-channel: whole destination plate, one source trough or same-layout plate
+    if 96 in channels:
+        groups = defaultdict(list)
+        for t in remaining:
+            groups[(t.source, t.dest, t.volume)].append(t)
+        used = set()
+        for (source, dest, volume), group in groups.items():
+            if geometry[dest] != (8, 12) or len({t.dest_well for t in group}) != 96 or len(group) != 96:
+                continue
+            if geometry[source] == (1, 1) or (geometry[source] == (8, 12) and all(t.source_well == t.dest_well for t in group)):
+                wells = tuple(_well_name(r, c) for r in range(8) for c in range(12))
+                source_wells = (group[0].source_well,) if geometry[source] == (1, 1) else wells
+                moves.append(Move(96, source, source_wells, dest, wells, volume,
+                                  min(request_index[id(t)] for t in group)))
+                used.update(map(id, group))
+        remaining = [t for t in remaining if id(t) not in used]
+
+    # -- 8-channel: a full column on one side, the same column or one trough well on the other
+    if 8 in channels:
+        groups = defaultdict(list)
+        for t in remaining:
+            if geometry[t.dest][0] == 8:
+                groups[(t.source, t.dest, t.volume, None, _well(t.dest_well)[1])].append(t)
+            elif geometry[t.dest][0] == 1 and geometry[t.source][0] == 8:
+                groups[(t.source, t.dest, t.volume, t.dest_well, _well(t.source_well)[1])].append(t)
+        used = set()
+        for (source, dest, volume, *_), group in groups.items():
+            wells = _column_pair(group, geometry[source][0], geometry[dest][0])
+            if wells is None:
+                continue
+            moves.append(Move(8, source, wells[0], dest, wells[1], volume,
+                              min(request_index[id(t)] for t in group)))
+            used.update(map(id, group))
+        remaining = [t for t in remaining if id(t) not in used]
+
+    moves.extend(Move(1, t.source, (t.source_well,), t.dest, (t.dest_well,), t.volume, request_index[id(t)])
+                 for t in remaining)
+    if keep_order:
+        moves.sort(key=lambda m: m.index)
+    else:
+        moves = _order(moves, labware)
+
+    # -- tips and mixing
+    filled: set[tuple[str, str]] = set()
+    previous: Move | None = None
+    previous_dest_was_empty = True
+    for move in moves:
+        move.mix = mix
+        move.new_tip = not (
+            tip_policy == "reuse"
+            and previous is not None
+            and previous.channels == move.channels
+            and previous.source == move.source
+            and previous.source_wells == move.source_wells
+            and previous.mix is None
+            and previous_dest_was_empty
+        )
+        previous_dest_was_empty = not any((move.dest, w) in filled for w in move.dest_wells)
+        filled.update((move.dest, w) for w in move.dest_wells)
+        previous = move
+
+    return TransferPlan(moves, transfers, labware, aspiration_speed, dispense_speed)
+
+
+def _position(labware: dict[str, tuple[int, str]], label: str, well: str) -> tuple[float, float]:
+    x, y = slot_position(labware[label][0]) or (0, 0)
+    row, column = _well(well)
+    return x + column * WELL_PITCH_SLOTS, y - row * WELL_PITCH_SLOTS
+
+
+def _order(moves: list[Move], labware: dict[str, tuple[int, str]]) -> list[Move]:
+    """Group moves by source; visit the nearest source group next, destinations column by column."""
+    groups: dict[tuple, list[Move]] = defaultdict(list)
+    for move in moves:
+        groups[(move.channels, move.source, move.source_wells)].append(move)
+    for group in groups.values():
+        group.sort(key=lambda m: (m.dest, _well(m.dest_well)[1], _well(m.dest_well)[0]))
+
+    ordered: list[Move] = []
+    pending = list(groups.values())
+    here = (0.0, 0.0)
+    while pending:
+        def cost(group):
+            x, y = _position(labware, group[0].source, group[0].source_well)
+            return abs(x - here[0]) + abs(y - here[1])
+        group = min(pending, key=cost)
+        pending.remove(group)
+        ordered.extend(group)
+        here = _position(labware, group[-1].dest, group[-1].dest_well)
+    return ordered
@@ -0,0 +1,35 @@
+"""Protocol IR compiler checks."""
+
+import dataclasses
+
+import pytest
+
+from opentrons_agent import protocol_ir
+
+
+def test_serial_dilution_loads_enough_tip_racks():
+    ir = protocol_ir.serial_dilution(2.0, 11)
+    template = protocol_ir.compile_protocol(ir)
+
+    (pipette,) = ir.pipettes
+    pickups = sum(8 for step in ir.steps if step.new_tip)
+    assert pickups > protocol_ir.TIPS_PER_RACK
+    assert len(pipette.tip_racks) * protocol_ir.TIPS_PER_RACK >= pickups
+    code = template.render(**{name: 50 for name in template.params})
+    assert all(f"labware[{rack!r}] = protocol.load_labware(" in code for rack in pipette.tip_racks)
+
+
+def test_too_few_tips_is_rejected():
+    ir = protocol_ir.serial_dilution(2.0, 11)
+    one_rack = tuple(dataclasses.replace(p, tip_racks=p.tip_racks[:1]) for p in ir.pipettes)
+
+    with pytest.raises(protocol_ir.ProtocolError, match="picks up 112 tips"):
+        protocol_ir.compile_protocol(dataclasses.replace(ir, pipettes=one_rack))
+
+
+def test_description_renders_parameter_values():
+    template = protocol_ir.compile_protocol(protocol_ir.plate_replication(2, volume=protocol_ir.Param("volume")))
+
+    code = template.render(volume=40)
+    assert "# 2 replica(s) of the source plate, 40.0µL per well" in code
+    assert "{volume}" not in code